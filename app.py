@@ -264,6 +264,7 @@ class ModbusGradioApp:
         metadata_config: str,
         parse_mode: str,
         api_url: str,
+        use_llm_cache: bool = True,
         progress=gr.Progress()
     ):
         """
@@ -276,7 +277,8 @@ class ModbusGradioApp:
             dev_mapping_config: 设备映射配置（JSON字符串）
             metadata_config: 点位元数据配置（JSON字符串）
             parse_mode: 解析模式（local_api/official_api）
-            api_url: Web API服务地址
+            api_url: Web API服务地址，多个节点以逗号分隔
+            use_llm_cache: 是否使用模型响应缓存
             progress: Gradio进度条对象
             
         Yields:
@@ -310,7 +312,8 @@ class ModbusGradioApp:
             # 解析模式名称映射
             mode_names = {
                 "local_api": "本地Web API",
-                "official_api": "MinerU官方API"
+                "official_api": "MinerU官方API",
+                "text_layer": "本地文本层快速解析"
             }
             mode_name = mode_names.get(parse_mode, parse_mode)
             yield f"🔄 正在初始化处理流程... (解析方式: {mode_name})\n", None, None
@@ -319,7 +322,6 @@ class ModbusGradioApp:
             official_api_token = None
             file_server_url = None
             if parse_mode == "official_api":
-                from src.config import config
                 official_api_token = config.MINERU_API_TOKEN
                 file_server_url = config.FILE_SERVER_URL
                 
@@ -329,9 +331,13 @@ class ModbusGradioApp:
                     return
                 
                 if not file_server_url:
-                    logger.warning("未配置 FILE_SERVER_URL，将使用本地文件路径（可能无法正常工作）")
+                    logger.info("未配置 FILE_SERVER_URL，将直接上传PDF文件到MinerU官方API")
                 
                 logger.info(f"使用官方API配置 - Token: {'已配置' if official_api_token else '未配置'}, 文件服务器: {file_server_url or '未配置'}")
+            elif parse_mode == "text_layer":
+                # 无文本层页面可能回退到官方API
+                official_api_token = config.MINERU_API_TOKEN or None
+                file_server_url = config.FILE_SERVER_URL or None
             
             # 创建Pipeline实例（使用当前会话的配置，不写入文件）
             pipeline = ModbusPipeline(
@@ -343,7 +349,8 @@ class ModbusGradioApp:
                 api_url=api_url,
                 parse_mode=parse_mode,
                 official_api_token=official_api_token,
-                file_server_url=file_server_url
+                file_server_url=file_server_url,
+                use_llm_cache=use_llm_cache
             )
             
             pdf_file = Path(pdf_path)
@@ -352,39 +359,31 @@ class ModbusGradioApp:
             progress(0.1, desc="正在解析PDF...")
             yield "🔄 [步骤 1/3] 正在解析PDF文件...\n", None, None
             
-            # 查找已有的Markdown文件
-            markdown_path = pipeline._find_existing_markdown(pdf_file)
-            if markdown_path and markdown_path.exists():
-                markdown_content = markdown_path.read_text(encoding='utf-8')
-                status = f"✅ 读取已有的Markdown文件: {markdown_path.name}\n"
-                status += f"📄 文本长度: {len(markdown_content)} 字符\n\n"
-            else:
-                markdown_content = pipeline.pdf_parser.parse(pdf_file)
-                status = f"✅ PDF解析完成\n"
-                status += f"📄 文本长度: {len(markdown_content)} 字符\n\n"
+            # 相同内容的PDF会直接命中Markdown缓存
+            markdown_content = pipeline.pdf_parser.parse(pdf_file)
+            status = f"✅ PDF解析完成\n"
+            status += f"📄 文本长度: {len(markdown_content)} 字符\n\n"
             
             yield status, None, None
             
-            # 步骤2: AI提取
+            # 步骤2+3: 流式AI提取，点位边生成边写入CSV并刷新预览
             progress(0.4, desc="正在使用AI提取点位信息...")
-            yield status + "🔄 [步骤 2/3] 正在使用AI提取点位信息...\n", None, None
-            
-            data_points = pipeline.ai_extractor.extract(markdown_content)
-            
-            status += f"✅ 成功提取 {len(data_points)} 个点位信息\n\n"
+            status += "🔄 [步骤 2/3] 正在使用AI提取点位信息（逐个写入CSV）...\n"
             yield status, None, None
             
-            # 步骤3: 导出CSV
-            progress(0.7, desc="正在生成CSV文件...")
-            yield status + "🔄 [步骤 3/3] 正在生成CSV文件...\n", None, None
-            
             # 生成输出文件路径
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_csv_path = config.OUTPUT_DIR / f"{timestamp}.csv"
             
-            pipeline.csv_exporter.export(data_points, output_csv_path)
+            rows = []
+            for row in pipeline.extract_to_csv_stream(markdown_content, output_csv_path):
+                rows.append(row)
+                progress(min(0.4 + 0.05 * len(rows), 0.9), desc=f"已提取 {len(rows)} 个点位...")
+                status += f"   ➕ {row['MeasuringPointName']}  {row['Address']}\n"
+                yield status, pd.DataFrame(rows), None
             
-            status += f"✅ CSV文件已保存: {output_csv_path}\n\n"
+            status += f"\n✅ 成功提取 {len(rows)} 个点位信息\n\n"
+            status += f"✅ [步骤 3/3] CSV文件已保存: {output_csv_path}\n\n"
             status += "=" * 60 + "\n"
             status += "🎉 处理完成！\n"
             status += "=" * 60 + "\n"
@@ -490,7 +489,8 @@ class ModbusGradioApp:
                             label="解析方式",
                             choices=[
                                 ("MinerU官方API", "official_api"),
-                                ("本地Web API（需启动本地服务）", "local_api")
+                                ("本地Web API（需启动本地服务）", "local_api"),
+                                ("本地文本层快速解析（电子版PDF）", "text_layer")
                             ],
                             value="official_api",
                             info="选择PDF解析的方式"
@@ -500,15 +500,15 @@ class ModbusGradioApp:
                         gr.Markdown("""
                         **配置说明:**
                         - **本地Web API**: 需要在下方配置本地服务地址
-                        - **MinerU官方API**: 自动从 `.env` 文件读取 `MINERU_API_TOKEN` 和 `FILE_SERVER_URL`
+                        - **MinerU官方API**: 自动从 `.env` 文件读取 `MINERU_API_TOKEN`（`FILE_SERVER_URL` 可选，未配置时直接上传文件）
                         """)
                         
                         with gr.Row():
                             api_url = gr.Textbox(
                                 label="本地Web API 地址",
                                 value="http://127.0.0.1:8000",
-                                placeholder="请输入本地Web API服务地址",
-                                info="仅在使用本地Web API方式时有效"
+                                placeholder="请输入本地Web API服务地址，多个节点以逗号分隔",
+                                info="仅在使用本地Web API方式时有效；配置多个节点时自动负载均衡"
                             )
                     
                     # 高级配置（可折叠）
@@ -555,6 +555,13 @@ class ModbusGradioApp:
                                     lines=8
                                 )
                     
+                    # 模型响应缓存开关
+                    use_llm_cache = gr.Checkbox(
+                        label="使用模型响应缓存",
+                        value=True,
+                        info="相同文档与配置直接复用上次的模型响应；取消勾选则重新调用模型"
+                    )
+                    
                     # 提取按钮
                     extract_btn = gr.Button(
                         "🚀 开始提取",
@@ -628,7 +635,8 @@ class ModbusGradioApp:
                     dev_mapping_config,
                     metadata_config,
                     parse_mode,
-                    api_url
+                    api_url,
+                    use_llm_cache
                 ],
                 outputs=[
                     process_output,
@@ -664,14 +672,20 @@ class ModbusGradioApp:
                   - 默认地址: http://127.0.0.1:8000
                   - 适合本地有GPU的情况
                 
+                - **本地文本层快速解析**: 
+                  - 直接读取电子版PDF自带的文本层和表格，无需调用MinerU，通常1秒内完成
+                  - 扫描页等没有文本层的页面会自动回退到 `TEXT_LAYER_FALLBACK` 指定的方式（默认本地Web API）
+                  - 需要安装 PyMuPDF: `pip install pymupdf`
+                
                 - **MinerU官方API方式**（新增）: 
                   - 使用MinerU官方云端服务进行解析
                   - **配置方式**: 在项目根目录的 `.env` 文件中配置
                     ```bash
                     MINERU_API_TOKEN=your_token_here
-                    FILE_SERVER_URL=http://localhost:8080
+                    # 可选：已有公网可访问的文件服务器时配置
+                    # FILE_SERVER_URL=http://localhost:8080
                     ```
-                  - 需要先启动文件服务器: `uv run python start_file_server.py`
+                  - 未配置 `FILE_SERVER_URL` 时，PDF会直接上传到官方API，无需启动文件服务器
                   - 在 https://mineru.net 申请API Token
                   - 每天享有2000页免费额度
                   - 适合没有GPU或需要快速解析的情况
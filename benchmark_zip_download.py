@@ -0,0 +1,117 @@
+"""基准测试：官方API结果压缩包下载与解压的峰值内存（RSS）对比
+
+在本地启动一个HTTP服务提供模拟的MinerU结果压缩包（一个Markdown文件 + 大量不可压缩的图片数据），
+分别在独立子进程中运行：
+  - buffered: 旧实现，response.content 整包读入内存后再用 io.BytesIO 解压
+  - streaming: 新实现，PDFParser._download_zip 流式写入临时文件后只解压 .md 成员
+并输出各自的峰值RSS。
+
+用法:
+    python benchmark_zip_download.py --size-mb 200
+"""
+
+import argparse
+import functools
+import http.server
+import io
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import zipfile
+from pathlib import Path
+
+
+def build_archive(path: Path, size_mb: int) -> None:
+    """生成模拟结果压缩包：图片数据不可压缩，保证压缩包体积接近size_mb"""
+    with zipfile.ZipFile(path, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("result/full.md", "# 寄存器表\n\n| 地址 | 名称 |\n| --- | --- |\n| 40001 | 出水温度 |\n" * 200)
+        chunk = 16 * 1024 * 1024
+        remaining = size_mb * 1024 * 1024
+        index = 0
+        while remaining > 0:
+            n = min(chunk, remaining)
+            zf.writestr(f"result/images/{index:04d}.jpg", os.urandom(n), compress_type=zipfile.ZIP_STORED)
+            remaining -= n
+            index += 1
+
+
+class QuietHandler(http.server.SimpleHTTPRequestHandler):
+    """不输出访问日志的静态文件处理器"""
+
+    def log_message(self, format, *args):
+        pass
+
+
+def peak_rss_mb() -> float:
+    """当前进程的峰值RSS（MB）"""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux单位为KB，macOS为字节
+    return rss / 1024 if sys.platform != "darwin" else rss / 1024 / 1024
+
+
+def run_child(mode: str, url: str) -> None:
+    """子进程：按指定方式下载并提取Markdown，输出峰值RSS"""
+    baseline = peak_rss_mb()
+
+    if mode == "buffered":
+        import requests
+
+        response = requests.get(url, timeout=120)
+        response.raise_for_status()
+        with zipfile.ZipFile(io.BytesIO(response.content)) as zf:
+            md_name = next(name for name in zf.namelist() if name.endswith(".md"))
+            md_content = zf.read(md_name).decode("utf-8")
+    else:
+        from src.pdf_parser import PDFParser
+
+        parser = PDFParser(use_cache=False, parse_mode="official_api")
+        zip_path = parser._download_zip(url)
+        try:
+            md_content = parser._extract_markdown_from_zip(zip_path, Path("bench.pdf"))
+        finally:
+            zip_path.unlink(missing_ok=True)
+
+    print(f"{mode}\t{baseline:.1f}\t{peak_rss_mb():.1f}\t{len(md_content)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="官方API结果压缩包下载峰值内存基准测试")
+    parser.add_argument("--size-mb", type=int, default=200, help="模拟压缩包大小（MB），默认200")
+    parser.add_argument("--child", choices=["buffered", "streaming"], help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        from loguru import logger
+
+        logger.remove()
+        run_child(args.child, args.url)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        archive = Path(tmp_dir) / "result.zip"
+        build_archive(archive, args.size_mb)
+
+        handler = functools.partial(QuietHandler, directory=tmp_dir)
+        server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://127.0.0.1:{server.server_port}/result.zip"
+
+        print(f"压缩包大小: {archive.stat().st_size / 1024 / 1024:.1f} MB")
+        print(f"{'模式':<10}{'启动RSS(MB)':>14}{'峰值RSS(MB)':>14}{'增量(MB)':>12}")
+        for mode in ("buffered", "streaming"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--child", mode, "--url", url],
+                capture_output=True, text=True, check=True, cwd=Path(__file__).parent
+            ).stdout.strip().splitlines()[-1]
+            _, baseline, peak, _ = output.split("\t")
+            print(f"{mode:<10}{float(baseline):>14.1f}{float(peak):>14.1f}{float(peak) - float(baseline):>12.1f}")
+
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
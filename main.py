@@ -45,7 +45,30 @@ def main():
     parser.add_argument(
         "--parse-pdf",
         action="store_true",
-        help="重新解析PDF文件（默认使用已有的Markdown文件）"
+        help="强制重新解析PDF文件（默认优先使用Markdown缓存）"
+    )
+    parser.add_argument(
+        "--parse-mode",
+        type=str,
+        choices=["local_api", "official_api", "text_layer"],
+        default="local_api",
+        help="PDF解析方式：local_api（本地Web API）、official_api（MinerU官方API）、text_layer（本地文本层快速解析）"
+    )
+    parser.add_argument(
+        "--api-url",
+        type=str,
+        default=config.MINERU_API_URLS,
+        help="本地MinerU Web API地址，多个节点以逗号分隔（默认：环境变量 MINERU_API_URLS 或 http://127.0.0.1:8000）"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="流式提取，点位边生成边写入CSV（仅单文件模式）"
+    )
+    parser.add_argument(
+        "--no-llm-cache",
+        action="store_true",
+        help="不使用模型响应缓存与点位结果存储，总是重新调用模型"
     )
     parser.add_argument(
         "--address-offset",
@@ -77,7 +100,12 @@ def main():
         pipeline = ModbusPipeline(
             output_dir=output_dir,
             controller_name=args.controller,
-            address_offset=args.address_offset
+            address_offset=args.address_offset,
+            api_url=args.api_url,
+            parse_mode=args.parse_mode,
+            official_api_token=config.MINERU_API_TOKEN or None,
+            file_server_url=config.FILE_SERVER_URL or None,
+            use_llm_cache=not args.no_llm_cache
         )
         
         if args.batch:
@@ -98,7 +126,7 @@ def main():
             pdf_path = Path(args.pdf_path)
             output_csv_path = Path(args.output) if args.output else None
             
-            pipeline.process(pdf_path, output_csv_path, parse_pdf=args.parse_pdf)
+            pipeline.process(pdf_path, output_csv_path, parse_pdf=args.parse_pdf, stream=args.stream)
         
         logger.info("程序执行完成！")
         
@@ -1,26 +1,171 @@
 """AI提取模块 - 使用Gemini API提取Modbus点位信息"""
 
+import asyncio
+import copy
+import hashlib
 import json
+import os
+import random
+import re
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
 
 import json_repair
 from langfuse.openai import openai
 from loguru import logger
 
 from src.config import config
+from src.disk_cache import DiskCache
+from src.json_stream import JsonArrayStreamParser
+from src.near_duplicate import DocumentIndex, DocumentSignature, changed_sections, get_document_index
+from src.point_confidence import address_in_document, score_point, score_points
+from src.point_derivation import COMPACT_FIELDS, derive_point, derive_points
+from src.point_merger import is_confident, merge_followup, merge_points
+from src.point_store import PointStore, content_hash, get_point_store
+from src.rate_limiter import RateLimiter, get_rate_limiter, parse_retry_after
+from src.register_tables import RegisterRow, extract_register_rows, parse_scale
+from src.section_index import SectionIndex, estimate_tokens, mapping_queries, split_chunks, tokenize, trim_markdown
+
+
+# 模型响应中的JSON代码块（```json ... ``` 或 ``` ... ```）
+_CODE_BLOCK_PATTERN = re.compile(r"```(?:json)?\s*\n?(.*?)\n?```", re.DOTALL)
+
+# 完整输出模式下point_metadata以外允许出现的字段
+_EXTRA_OUTPUT_FIELDS = {"MeasuringPointName", "thinking", "exist", "address_range"}
+
+# 寄存器表预提取模式的输出字段
+_TABLE_OUTPUT_FIELDS = {"code", "row"}
+
+
+def _flatten_mapping(dev_mapping: Dict) -> Dict[str, str]:
+    """将按设备类型分组的映射配置展开为 {点位描述: MeasuringPointName}"""
+    flat: Dict[str, str] = {}
+    for desc, code in dev_mapping.items():
+        if isinstance(code, dict):
+            flat.update(_flatten_mapping(code))
+        else:
+            flat[desc] = code
+    return flat
+
+
+def _dedupe_objects(objects: List[Dict]) -> List[Dict]:
+    """按点位名称（MeasuringPointName，精简/寄存器表模式为code）去重，保留第一次出现的对象"""
+    seen = set()
+    unique = []
+    for obj in objects:
+        name = str(obj.get("MeasuringPointName") or obj.get("code") or "").strip() if isinstance(obj, dict) else ""
+        if name and name in seen:
+            continue
+        seen.add(name)
+        unique.append(obj)
+    return unique
+
+
+class ResponseCache(DiskCache):
+    """
+    模型响应的磁盘缓存
+    
+    以模型、API地址、系统提示词哈希、用户提示词哈希、temperature、max_tokens作为键，
+    相同输入（如仅修改控制器名称后重新导出、界面重复点击）直接返回上次的模型响应。
+    条目超过有效期或总大小超过上限时淘汰。
+    """
+    
+    SUFFIX = ".txt"
+    NAME = "模型响应缓存"
+    
+    def __init__(self, cache_dir: Path, max_size_bytes: int = 256 * 1024 * 1024, max_age_seconds: float = 30 * 24 * 3600):
+        """
+        初始化响应缓存
+        
+        Args:
+            cache_dir: 缓存目录
+            max_size_bytes: 缓存总大小上限（字节），超出后按最近最少使用（LRU）淘汰
+            max_age_seconds: 条目有效期（秒），0表示不过期
+        """
+        super().__init__(cache_dir, max_size_bytes, max_age_seconds)
+    
+    @staticmethod
+    def make_key(
+        model: str,
+        base_url: str,
+        system_prompt: str,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int
+    ) -> str:
+        """
+        生成缓存键
+        
+        Args:
+            model: 模型名称
+            base_url: API基础URL
+            system_prompt: 系统提示词
+            user_prompt: 用户提示词
+            temperature: 温度参数
+            max_tokens: 最大token数
+            
+        Returns:
+            缓存键
+        """
+        payload = json.dumps({
+            "model": model,
+            "base_url": base_url,
+            "system_prompt": hashlib.sha256(system_prompt.encode('utf-8')).hexdigest(),
+            "user_prompt": hashlib.sha256(user_prompt.encode('utf-8')).hexdigest(),
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+# 每个事件循环共享一组异步客户端（httpx异步连接绑定事件循环，不能跨循环复用）
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, str], openai.AsyncOpenAI]]" = weakref.WeakKeyDictionary()
+_async_clients_lock = threading.Lock()
+
+
+def _get_async_client(api_key: str, base_url: str) -> "openai.AsyncOpenAI":
+    """获取当前事件循环内共享的AsyncOpenAI客户端（重试交给限流器处理）"""
+    loop = asyncio.get_running_loop()
+    with _async_clients_lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get((api_key, base_url))
+        if client is None:
+            client = openai.AsyncOpenAI(api_key=api_key, base_url=base_url, max_retries=0)
+            clients[(api_key, base_url)] = client
+        return client
 
 
 class AIExtractor:
     """使用AI大模型提取Modbus点位信息"""
     
+    # 可重试的模型调用错误：限流、连接失败、服务端5xx
+    RETRYABLE_ERRORS = (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError)
+    
     def __init__(
         self,
         api_key: Optional[str] = None,
         model: Optional[str] = None,
         base_url: Optional[str] = None,
         dev_mapping: Optional[Dict[str, str]] = None,
-        point_metadata: Optional[Dict[str, str]] = None
+        point_metadata: Optional[Dict[str, str]] = None,
+        retrieval_token_budget: Optional[int] = None,
+        chunk_tokens: Optional[int] = None,
+        chunk_overlap_tokens: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        use_cache: bool = True,
+        cache: Optional[ResponseCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        table_mode: Optional[bool] = None,
+        compact_output: Optional[bool] = None,
+        followup_rounds: Optional[int] = None,
+        fast_model: Optional[str] = None,
+        shard_size: Optional[int] = None,
+        point_store: Optional[PointStore] = None,
+        document_index: Optional[DocumentIndex] = None
     ):
         """
         初始化AI提取器
@@ -30,6 +175,22 @@ class AIExtractor:
             model: 模型名称，默认从配置读取
             base_url: API基础URL，默认从配置读取
             dev_mapping: 设备映射配置，默认从配置文件读取
+            point_metadata: 点位元数据配置，默认从配置文件读取
+            retrieval_token_budget: 发送给模型的文档token上限，超过时只保留与点位相关的章节，0表示不裁剪，默认从配置读取
+            chunk_tokens: 分块提取时每块的token上限，文档超过该值时切分为重叠分块并行提取，0表示不分块，默认从配置读取
+            chunk_overlap_tokens: 相邻分块重叠的token数，默认从配置读取
+            max_workers: 分块提取的最大并发数，默认从配置读取
+            use_cache: 是否使用模型响应缓存，False时总是重新调用模型
+            cache: 自定义响应缓存实例，默认使用配置中的缓存目录
+            rate_limiter: 自定义限流器，默认使用同一API地址共享的限流器（RPM/TPM/并发数从配置读取）
+            table_mode: 是否先用规则解析寄存器表，只让模型把点位映射到候选行，默认从配置读取
+            compact_output: 是否让模型只输出精简字段（点位、地址、系数、单位等），其余字段在本地推导，默认从配置读取
+            followup_rounds: 缺失或不可信点位的补充提取轮数，0表示不补充，默认从配置读取
+            fast_model: 级联模式的快速模型，设置后先用快速模型提取全部点位，置信度低的点位再用model复核；
+                        空字符串表示不启用级联，默认从配置读取
+            shard_size: 点位分组提取时每组的点位数，点位数超过该值时分组并发提取，0表示不分组，默认从配置读取
+            point_store: 自定义点位结果存储，默认使用配置中的数据库（use_cache为False时不使用）
+            document_index: 自定义近似重复文档索引，默认使用配置中的数据库（不使用点位结果存储时不使用）
         """
         self.api_key = api_key or config.OPENAI_API_KEY
         self.model = model or config.MODEL_NAME
@@ -40,8 +201,6 @@ class AIExtractor:
         
         # 配置Langfuse监控
         if config.LANGFUSE_SECRET_KEY and config.LANGFUSE_PUBLIC_KEY:
-            import os
-            from langfuse.openai import openai
             os.environ["LANGFUSE_SECRET_KEY"] = config.LANGFUSE_SECRET_KEY
             os.environ["LANGFUSE_PUBLIC_KEY"] = config.LANGFUSE_PUBLIC_KEY
             os.environ["LANGFUSE_HOST"] = config.LANGFUSE_HOST
@@ -50,18 +209,169 @@ class AIExtractor:
             logger.warning("Langfuse配置未完整设置，监控功能未启用")
         
         # 初始化OpenAI客户端（通过OpenRouter访问Gemini，使用Langfuse包装）
+        # 429/5xx由限流器统一重试，避免客户端内部重试绕过并发控制
         self.client = openai.OpenAI(
             api_key=self.api_key,
-            base_url=self.base_url
+            base_url=self.base_url,
+            max_retries=0
+        )
+        
+        # 同一API地址的所有提取器共享RPM/TPM配额与并发上限
+        self.rate_limiter = rate_limiter or get_rate_limiter(
+            self.base_url,
+            rpm=config.LLM_RPM,
+            tpm=config.LLM_TPM,
+            max_concurrency=config.LLM_MAX_CONCURRENCY
         )
+        self.max_retries = config.LLM_MAX_RETRIES
         
         # 加载设备映射配置（如果提供了运行时配置则使用，否则从文件加载）
         self.dev_mapping = dev_mapping if dev_mapping is not None else self._load_dev_mapping()
         
         self.point_metadata = point_metadata if point_metadata is not None else self._load_point_metadata()
         
-        # 加载提示词
+        # 精简输出模式：模型只输出 COMPACT_FIELDS，其余字段按地址功能区在本地推导
+        self.compact_output = config.EXTRACT_COMPACT_OUTPUT if compact_output is None else compact_output
+        
+        # 加载提示词，并构建静态前缀（系统提示词、元数据、点位映射、规则），文档内容接在其后
         self.system_prompt = self._load_system_prompt()
+        self.static_prompt = self._build_static_prompt()
+        self.prefix_tokens = estimate_tokens(self.system_prompt) + estimate_tokens(self.static_prompt)
+        self.cache_control = self._supports_cache_control()
+        
+        # 寄存器表预提取模式：模型只需把点位映射到候选行ID
+        self.table_mode = config.EXTRACT_TABLE_MODE if table_mode is None else table_mode
+        self.table_prompt = self._build_table_prompt() if self.table_mode else ""
+        self.usage_stats = {"calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0}
+        # 响应解析统计：strict/repaired为各层级解析成功的次数，failed为解析失败次数，
+        # invalid为不符合输出字段的元素数（已丢弃），unknown_fields为输出中未定义的字段数
+        self.decode_stats = {"strict": 0, "repaired": 0, "failed": 0, "invalid": 0, "unknown_fields": 0}
+        self._usage_lock = threading.Lock()
+        # 本次提取中可能导致结果不完整的问题（分块/分组失败、补充提取失败、输出截断），只在_subset创建的提取器上记录
+        self.extract_issues: Optional[List[str]] = None
+        
+        # 文档检索裁剪
+        self.retrieval_token_budget = (
+            config.RETRIEVAL_TOKEN_BUDGET if retrieval_token_budget is None else retrieval_token_budget
+        )
+        self.last_retrieval_report: Optional[Dict] = None
+        
+        # 分块并行提取
+        self.chunk_tokens = config.EXTRACT_CHUNK_TOKENS if chunk_tokens is None else chunk_tokens
+        self.chunk_overlap_tokens = (
+            config.EXTRACT_CHUNK_OVERLAP_TOKENS if chunk_overlap_tokens is None else chunk_overlap_tokens
+        )
+        self.max_workers = max_workers or config.EXTRACT_MAX_WORKERS
+        
+        # 点位分组提取：点位过多时按组并发请求，每次输出长度有上限
+        self.shard_size = config.EXTRACT_SHARD_SIZE if shard_size is None else shard_size
+        self.point_shards = self._build_point_shards()
+        self.point_count = len(set(_flatten_mapping(self.dev_mapping).values()))
+        
+        # 补充提取：只针对缺失/不可信的点位检索相关章节
+        self.followup_rounds = config.EXTRACT_FOLLOWUP_ROUNDS if followup_rounds is None else followup_rounds
+        self.followup_token_budget = config.EXTRACT_FOLLOWUP_TOKEN_BUDGET
+        
+        # 模型响应缓存
+        if use_cache and cache is None:
+            cache = ResponseCache(
+                config.LLM_CACHE_DIR,
+                max_size_bytes=config.LLM_CACHE_MAX_MB * 1024 * 1024,
+                max_age_seconds=config.LLM_CACHE_MAX_AGE_DAYS * 24 * 3600
+            )
+        self.cache = cache if use_cache else None
+        
+        # 点位结果存储：输入（文档、点位描述、元数据、提示词版本）未变化的点位直接复用
+        if use_cache and point_store is None and config.POINT_STORE_ENABLED:
+            point_store = get_point_store(config.POINT_STORE_PATH)
+        self.point_store = point_store if use_cache else None
+        
+        # 近似重复文档检测：新文档与已处理文档近似重复时复用其点位结果，只核对有差异的章节
+        if self.point_store is not None and document_index is None and config.NEAR_DUPLICATE_ENABLED:
+            document_index = get_document_index(config.DOCUMENT_INDEX_PATH)
+        self.document_index = document_index if self.point_store is not None else None
+        
+        # 模型级联：快速模型提取全部点位（共享缓存与限流器，不做补充提取），低置信度点位由本提取器的模型复核
+        fast_model = config.FAST_MODEL_NAME if fast_model is None else fast_model
+        self.fast_extractor: Optional["AIExtractor"] = None
+        if fast_model and fast_model != self.model:
+            self.fast_extractor = AIExtractor(
+                api_key=self.api_key,
+                model=fast_model,
+                base_url=self.base_url,
+                dev_mapping=self.dev_mapping,
+                point_metadata=self.point_metadata,
+                retrieval_token_budget=self.retrieval_token_budget,
+                chunk_tokens=self.chunk_tokens,
+                chunk_overlap_tokens=self.chunk_overlap_tokens,
+                max_workers=self.max_workers,
+                use_cache=use_cache,
+                cache=self.cache,
+                rate_limiter=self.rate_limiter,
+                table_mode=self.table_mode,
+                compact_output=self.compact_output,
+                followup_rounds=0,
+                fast_model="",
+                shard_size=self.shard_size,
+                point_store=self.point_store,
+                document_index=self.document_index
+            )
+            # 点位结果只按级联后的最终结果存储
+            self.fast_extractor.point_store = None
+        self.last_cascade_report: Optional[Dict] = None
+        
+        # 点位结果存储的键：point_metadata哈希与提示词版本（提示词规则、输出格式或模型变化时已存储的结果失效）
+        self.metadata_hash = content_hash(self.point_metadata)
+        self.prompt_version = content_hash({
+            "version": config.PROMPT_VERSION,
+            "model": self.model,
+            "fast_model": self.fast_extractor.model if self.fast_extractor is not None else "",
+            "system_prompt": self.system_prompt,
+            "template": self._build_static_prompt({}),
+            "compact_output": self.compact_output,
+            "table_mode": self.table_mode,
+        })
+    
+    def _subset(self, dev_mapping: Dict) -> "AIExtractor":
+        """
+        创建只提取指定点位的提取器（浅拷贝：共享客户端、响应缓存、限流器与用量/解析统计，不重新加载配置与提示词，
+        不使用点位结果存储），并记录本次提取中可能导致结果不完整的问题
+        
+        Args:
+            dev_mapping: 需要提取的点位 {描述: MeasuringPointName}
+            
+        Returns:
+            子集提取器
+        """
+        extractor = copy.copy(self)
+        extractor.dev_mapping = dev_mapping
+        extractor.static_prompt = extractor._build_static_prompt()
+        extractor.prefix_tokens = estimate_tokens(self.system_prompt) + estimate_tokens(extractor.static_prompt)
+        extractor.table_prompt = extractor._build_table_prompt() if self.table_mode else ""
+        extractor.point_shards = extractor._build_point_shards()
+        extractor.point_count = len(set(_flatten_mapping(dev_mapping).values()))
+        extractor.point_store = None
+        extractor.extract_issues = []
+        if self.fast_extractor is not None:
+            extractor.fast_extractor = self.fast_extractor._subset(dev_mapping)
+            extractor.fast_extractor.extract_issues = extractor.extract_issues
+        return extractor
+    
+    def _record_issue(self, message: str) -> None:
+        """记录可能导致结果不完整的问题（不完整的结果不写入点位结果存储）"""
+        logger.warning(message)
+        if self.extract_issues is not None:
+            with self._usage_lock:
+                self.extract_issues.append(message)
+    
+    def _supports_cache_control(self) -> bool:
+        """根据配置判断是否发送cache_control前缀缓存标记（auto: OpenRouter或Anthropic接口时发送）"""
+        setting = config.LLM_CACHE_CONTROL.lower()
+        if setting in ("true", "1", "yes"):
+            return True
+        if setting in ("false", "0", "no"):
+            return False
+        return "openrouter.ai" in self.base_url or "anthropic" in self.base_url or self.model.startswith("anthropic/")
     
     def _load_dev_mapping(self) -> Dict:
         """加载设备映射配置"""
@@ -100,7 +410,7 @@ class AIExtractor:
         self,
         markdown_content: str,
         temperature: float = 0.1,
-        max_tokens: int = 8000
+        max_tokens: Optional[int] = None
     ) -> List[Dict]:
         """
         从Markdown内容中提取Modbus点位信息
@@ -108,71 +418,1355 @@ class AIExtractor:
         Args:
             markdown_content: Markdown格式的协议内容
             temperature: 温度参数，控制输出随机性
-            max_tokens: 最大token数
+            max_tokens: 每次调用的最大输出token数，默认按请求的点位数自适应
             
         Returns:
             提取的点位信息列表
         """
         logger.info("开始使用AI提取Modbus点位信息...")
         
-        # 构建用户提示词
+        if self.point_store is not None:
+            plan = self._store_plan(markdown_content)
+            if plan["changed"]:
+                extractor = self._subset(plan["changed"])
+                new_points = extractor.extract(plan["document"], temperature, max_tokens)
+                recheck = self._recheck_mapping(plan, new_points)
+                if recheck:
+                    rechecker = self._subset(recheck)
+                    found = rechecker.extract(plan["markdown"], temperature, max_tokens)
+                    extractor.extract_issues.extend(rechecker.extract_issues)
+                    new_points = merge_followup(new_points, found, set(recheck.values()))
+                self._store_points(plan, new_points, extractor)
+            return self._stored_points(plan)
+        
+        if self.fast_extractor is not None:
+            data_points = self._extract_cascade(markdown_content, temperature, max_tokens)
+        else:
+            rows = self._register_rows(markdown_content)
+            if rows:
+                content = self._call_model(
+                    self._build_rows_prompt(rows), temperature, max_tokens or self._table_output_budget(), prefix=self.table_prompt
+                )
+                data_points = self._points_from_mapping(content, rows)
+            else:
+                # 文档过长时只保留与点位相关的章节
+                document = self._trim_document(markdown_content)
+                
+                if self.chunk_tokens > 0 and estimate_tokens(document) > self.chunk_tokens:
+                    data_points = self._extract_chunked(document, temperature, max_tokens)
+                else:
+                    data_points = self._extract_single(document, temperature, max_tokens)
+            
+            data_points = self._followup(markdown_content, data_points, temperature, max_tokens)
+        
+        logger.info(f"成功提取 {len(data_points)} 个点位信息")
+        if self.cache is not None:
+            stats = self.cache.stats()
+            logger.info(f"模型响应缓存: 命中 {stats['hits']} 次，未命中 {stats['misses']} 次，共 {stats['entries']} 条")
+        logger.info(f"响应解析统计: {self.decode_stats}")
+        if self.usage_stats["prompt_tokens"]:
+            logger.info(
+                f"累计输入 {self.usage_stats['prompt_tokens']} tokens，"
+                f"前缀缓存命中 {self.usage_stats['cached_tokens']} tokens"
+            )
+        return data_points
+    
+    def extract_stream(
+        self,
+        markdown_content: str,
+        temperature: float = 0.1,
+        max_tokens: Optional[int] = None
+    ) -> Iterator[Dict]:
+        """
+        流式提取：以stream=True调用模型，每个点位对象闭合后立即产出，无需等待完整响应
+        
+        命中响应缓存、启用分块提取、点位分组提取或寄存器表预提取时，结果一次性得到后再逐个产出。
+        之后还可能被补充提取或级联复核替换的点位（不可信、置信度低）暂不产出，合并后产出最终结果，
+        每个点位只产出一次。
+        
+        Args:
+            markdown_content: Markdown格式的协议内容
+            temperature: 温度参数，控制输出随机性
+            max_tokens: 每次调用的最大输出token数，默认按请求的点位数自适应
+            
+        Yields:
+            点位信息字典
+        """
+        logger.info("开始使用AI流式提取Modbus点位信息...")
+        
+        if self.point_store is not None:
+            plan = self._store_plan(markdown_content)
+            yield from (point for point in plan["stored"].values() if point is not None)
+            if plan["changed"]:
+                extractor = self._subset(plan["changed"])
+                partial = plan["document"] is not plan["markdown"]
+                new_points, held = [], []
+                for point in extractor.extract_stream(plan["document"], temperature, max_tokens):
+                    if partial and not is_confident(point):
+                        # 只在有差异的章节中提取时，没有可信结果的点位等完整文档中重新提取后再产出
+                        held.append(point)
+                        continue
+                    new_points.append(point)
+                    yield point
+                recheck = self._recheck_mapping(plan, new_points)
+                if recheck:
+                    rechecker = self._subset(recheck)
+                    found = list(rechecker.extract_stream(plan["markdown"], temperature, max_tokens))
+                    extractor.extract_issues.extend(rechecker.extract_issues)
+                    held = merge_followup(held, found, set(recheck.values()))
+                new_points.extend(held)
+                yield from held
+                self._store_points(plan, new_points, extractor)
+            return
+        
+        started = time.perf_counter()
+        primary = self.fast_extractor if self.fast_extractor is not None else self
+        usage_before = self._cascade_usage() if self.fast_extractor is not None else None
+        document_terms = set(tokenize(markdown_content)) if self.fast_extractor is not None else None
+        data_points = []
+        yielded = set()
+        for point in primary._stream_points(markdown_content, temperature, max_tokens):
+            data_points.append(point)
+            if self._is_final(point, document_terms):
+                yielded.add(id(point))
+                yield point
+        
+        # 补充提取（级联模式下为强模型复核）合并后，产出暂缓的点位（替换后的结果或原结果）与新找到的点位
+        if self.fast_extractor is not None:
+            fast_seconds = time.perf_counter() - started
+            uncertain = self._uncertain_points(data_points, markdown_content)
+            merged = self._followup(markdown_content, data_points, temperature, max_tokens, extra_codes=uncertain)
+            self._report_cascade(started, fast_seconds, usage_before, data_points, uncertain)
+        else:
+            merged = self._followup(markdown_content, data_points, temperature, max_tokens)
+        yield from (point for point in merged if id(point) not in yielded)
+    
+    def _is_final(self, point: Dict, document_terms: Optional[set]) -> bool:
+        """
+        流式提取时点位是否已是最终结果：补充提取只替换不可信的点位，级联模式下还会复核置信度低的点位
+        
+        Args:
+            point: 点位信息
+            document_terms: 原文的检索词集合（级联模式下用于计算置信度）
+            
+        Returns:
+            之后不会再被替换时为True
+        """
+        if self.fast_extractor is not None:
+            return score_point(point, document_terms)[0] >= config.CASCADE_MIN_CONFIDENCE
+        return self.followup_rounds <= 0 or is_confident(point)
+    
+    def _stream_points(self, markdown_content: str, temperature: float, max_tokens: Optional[int]) -> Iterator[Dict]:
+        """流式提取的主请求（不含补充提取）"""
+        rows = self._register_rows(markdown_content)
+        if rows:
+            # 映射结果很短，无需流式输出
+            content = self._call_model(
+                self._build_rows_prompt(rows), temperature, max_tokens or self._table_output_budget(), prefix=self.table_prompt
+            )
+            yield from self._points_from_mapping(content, rows)
+            return
+        
+        markdown_content = self._trim_document(markdown_content)
+        
+        if self.chunk_tokens > 0 and estimate_tokens(markdown_content) > self.chunk_tokens:
+            yield from self._extract_chunked(markdown_content, temperature, max_tokens)
+            return
+        
+        if self.point_shards:
+            yield from self._extract_sharded(markdown_content, temperature, max_tokens)
+            return
+        
+        user_prompt = self._build_user_prompt(markdown_content)
+        max_tokens = max_tokens or self._output_budget(self.point_count)
+        
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(user_prompt, temperature, max_tokens)
+            content = self.cache.get(cache_key)
+            if content is not None:
+                logger.info(f"命中模型响应缓存，跳过模型调用（{len(content)} 字符）")
+                yield from self._to_points(self._parse_response(content))
+                return
+        
+        logger.info(f"流式调用模型: {self.model}")
+        stream, reserved = self._create_completion(
+            user_prompt, temperature, max_tokens, stream=True, stream_options={"include_usage": True}
+        )
+        
+        parser = JsonArrayStreamParser()
+        parts: List[str] = []
+        finish_reason = None
+        used_tokens = None
+        try:
+            for chunk in stream:
+                used_tokens = self._used_tokens(chunk) or used_tokens
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                finish_reason = choice.finish_reason or finish_reason
+                delta = choice.delta.content if choice.delta else None
+                if not delta:
+                    continue
+                parts.append(delta)
+                yield from self._to_points(self._validate_points(parser.feed(delta)))
+        finally:
+            self.rate_limiter.release(reserved, used_tokens)
+        
+        content = "".join(parts)
+        logger.info(f"模型响应长度: {len(content)} 字符，流式解析出 {parser.count} 个点位")
+        self._record_decode(**parser.tiers)
+        
+        if finish_reason == "length":
+            # 输出被截断：续写其余点位，产出新增的部分
+            content, finish_reason, objects = self._continue(user_prompt, temperature, max_tokens, None, content, finish_reason)
+            if objects:
+                merged = json.loads(self._finish_response(content, finish_reason, objects, cache_key))
+                yield from self._to_points(self._validate_points(merged[parser.count:]))
+                return
+            self._record_issue("模型输出被截断，结果可能不完整")
+        
+        if parser.count == 0 and content.strip():
+            # 输出不是JSON数组（例如单个对象），回退为整体解析
+            yield from self._to_points(self._parse_response(content))
+        
+        if cache_key is not None and content and finish_reason in (None, "stop"):
+            self.cache.put(cache_key, content, meta={"model": self.model})
+    
+    def _extract_single(self, markdown_content: str, temperature: float, max_tokens: Optional[int]) -> List[Dict]:
+        """
+        单次调用模型提取（整篇文档或一个分块）
+        
+        Args:
+            markdown_content: Markdown内容
+            temperature: 温度参数
+            max_tokens: 最大token数
+            
+        Returns:
+            提取的点位信息列表
+        """
+        if self.point_shards:
+            return self._extract_sharded(markdown_content, temperature, max_tokens)
+        
         user_prompt = self._build_user_prompt(markdown_content)
         
         try:
-            # 调用API
-            logger.info(f"调用模型: {self.model}")
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": self.system_prompt},
-                    {"role": "user", "content": user_prompt}
-                ],
-                temperature=temperature,
-                max_tokens=max_tokens
+            content = self._call_model(user_prompt, temperature, max_tokens or self._output_budget(self.point_count))
+            return self._to_points(self._parse_response(content))
+        except Exception as e:
+            logger.error(f"AI提取失败: {e}")
+            raise
+    
+    def _call_model(self, user_prompt: str, temperature: float, max_tokens: int, prefix: Optional[str] = None) -> str:
+        """
+        调用模型并返回响应文本
+        
+        Args:
+            user_prompt: 用户提示词（可变部分）
+            temperature: 温度参数
+            max_tokens: 最大token数
+            prefix: 静态前缀，默认为完整提取的前缀
+            
+        Returns:
+            模型响应内容
+        """
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(user_prompt, temperature, max_tokens, prefix)
+            content = self.cache.get(cache_key)
+            if content is not None:
+                logger.info(f"命中模型响应缓存，跳过模型调用（{len(content)} 字符）")
+                return content
+        
+        logger.info(f"调用模型: {self.model}")
+        response, reserved = self._create_completion(user_prompt, temperature, max_tokens, prefix=prefix)
+        self.rate_limiter.release(reserved, self._used_tokens(response))
+        content, finish_reason = self._response_text(response)
+        content, finish_reason, objects = self._continue(user_prompt, temperature, max_tokens, prefix, content, finish_reason)
+        return self._finish_response(content, finish_reason, objects, cache_key)
+    
+    def _continue(
+        self,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        prefix: Optional[str],
+        content: str,
+        finish_reason: Optional[str]
+    ) -> Tuple[str, Optional[str], List[Dict]]:
+        """
+        输出被截断时从最后一个完整对象之后续写，最多续写 LLM_MAX_CONTINUATIONS 次
+        
+        Returns:
+            (最后一次响应文本, 最后一次响应的结束原因, 之前被截断的响应中完整的对象)
+        """
+        state = {"content": content, "finish_reason": finish_reason, "objects": []}
+        for extra_messages in self._continuation_requests(state):
+            response, reserved = self._create_completion(
+                user_prompt, temperature, max_tokens, prefix=prefix, extra_messages=extra_messages
+            )
+            self.rate_limiter.release(reserved, self._used_tokens(response))
+            state["content"], state["finish_reason"] = self._response_text(response)
+        return state["content"], state["finish_reason"], state["objects"]
+    
+    async def _acontinue(
+        self,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        prefix: Optional[str],
+        content: str,
+        finish_reason: Optional[str]
+    ) -> Tuple[str, Optional[str], List[Dict]]:
+        """异步续写（与_continue一致）"""
+        state = {"content": content, "finish_reason": finish_reason, "objects": []}
+        for extra_messages in self._continuation_requests(state):
+            response = await self._acreate_completion(
+                user_prompt, temperature, max_tokens, prefix=prefix, extra_messages=extra_messages
             )
+            state["content"], state["finish_reason"] = self._response_text(response)
+        return state["content"], state["finish_reason"], state["objects"]
+    
+    def _continuation_requests(self, state: Dict) -> Iterator[List[Dict]]:
+        """
+        续写流程（同步与异步调用共用）：每次产出一组续写请求的追加消息，调用方请求模型后
+        把响应写回state的content/finish_reason；输出未被截断、无法续写或达到续写次数上限时结束
+        
+        Args:
+            state: {content, finish_reason, objects}，objects原地累加被截断的响应中完整的对象
             
-            # 解析响应
-            content = response.choices[0].message.content
-            logger.info(f"模型响应长度: {len(content)} 字符")
+        Yields:
+            追加在用户消息之后的消息列表
+        """
+        for _ in range(config.LLM_MAX_CONTINUATIONS):
+            extra_messages = self._continuation_messages(state["content"], state["finish_reason"], state["objects"])
+            if extra_messages is None:
+                return
+            yield extra_messages
+    
+    def _response_text(self, response) -> Tuple[str, Optional[str]]:
+        """取出响应文本与结束原因"""
+        choice = response.choices[0]
+        content = choice.message.content or ""
+        logger.info(f"模型响应长度: {len(content)} 字符")
+        return content, choice.finish_reason
+    
+    def _continuation_messages(self, content: str, finish_reason: Optional[str], objects: List[Dict]) -> Optional[List[Dict]]:
+        """
+        输出因长度限制被截断时，取出其中完整的对象（累加到objects），构造续写请求的追加消息
+        
+        Args:
+            content: 本次响应文本
+            finish_reason: 本次响应的结束原因
+            objects: 之前各次响应中完整的对象（原地累加）
             
-            # 提取并解析JSON数据
-            data_points = self._parse_response(content)
-            logger.info(f"成功提取 {len(data_points)} 个点位信息")
+        Returns:
+            追加在用户消息之后的消息列表；未截断或截断的输出中没有完整对象（无法续写）时返回None
+        """
+        if finish_reason != "length":
+            return None
+        completed = JsonArrayStreamParser().feed(content)
+        if not completed:
+            logger.warning("模型输出被截断且没有完整的点位对象，无法续写")
+            return None
+        
+        objects.extend(completed)
+        names = [str(obj.get("MeasuringPointName") or obj.get("code") or "") for obj in objects]
+        logger.warning(f"模型输出被截断（max_tokens），已得到 {len(objects)} 个完整对象，请求续写")
+        return [
+            {"role": "assistant", "content": json.dumps(objects, ensure_ascii=False)},
+            {
+                "role": "user",
+                "content": (
+                    f"输出因长度限制被截断，以上是已完整输出的 {len(objects)} 个点位（{', '.join(n for n in names if n)}）。"
+                    "请继续输出其余点位，同样只输出JSON数组，不要重复已输出的点位；没有其余点位时输出 []。"
+                )
+            },
+        ]
+    
+    def _finish_response(
+        self,
+        content: str,
+        finish_reason: Optional[str],
+        objects: List[Dict],
+        cache_key: Optional[str]
+    ) -> str:
+        """
+        合并续写结果（续写中重复输出的点位只保留第一次），并缓存正常结束的响应（仍被截断的输出下次重新请求）
+        
+        Args:
+            content: 最后一次响应文本
+            finish_reason: 最后一次响应的结束原因
+            objects: 之前被截断的响应中完整的对象
+            cache_key: 响应缓存键
             
-            return data_points
+        Returns:
+            响应文本（有续写时为合并后的JSON数组）
+        """
+        if finish_reason == "length":
+            self._record_issue("续写次数用尽，输出仍被截断，结果可能不完整" if objects else "模型输出被截断，结果可能不完整")
+        if objects:
+            merged = _dedupe_objects(objects + JsonArrayStreamParser().feed(content))
+            content = json.dumps(merged, ensure_ascii=False)
+            logger.info(f"续写完成，合并得到 {len(merged)} 个对象")
+        
+        if cache_key is not None and content and finish_reason in (None, "stop"):
+            self.cache.put(cache_key, content, meta={"model": self.model})
+        return content
+    
+    def _used_tokens(self, response) -> Optional[int]:
+        """
+        记录响应中的token用量（含命中前缀缓存的token数）
+        
+        Returns:
+            总token数，接口未返回usage时为None
+        """
+        usage = getattr(response, "usage", None)
+        if not usage:
+            return None
+        
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", None) if details else None) or 0
+        prompt_tokens = getattr(usage, "prompt_tokens", None) or 0
+        with self._usage_lock:
+            self.usage_stats["calls"] += 1
+            self.usage_stats["prompt_tokens"] += prompt_tokens
+            self.usage_stats["cached_tokens"] += cached
+            self.usage_stats["completion_tokens"] += getattr(usage, "completion_tokens", None) or 0
+        if prompt_tokens:
+            logger.info(f"输入 {prompt_tokens} tokens，其中前缀缓存命中 {cached} tokens")
+        return getattr(usage, "total_tokens", None)
+    
+    def _cache_key(self, user_prompt: str, temperature: float, max_tokens: int, prefix: Optional[str] = None) -> str:
+        """响应缓存键（系统提示词与静态前缀合并计算哈希）"""
+        return ResponseCache.make_key(
+            self.model, self.base_url, f"{self.system_prompt}\n\n{prefix or self.static_prompt}",
+            user_prompt, temperature, max_tokens
+        )
+    
+    def _messages(self, user_prompt: str, prefix: Optional[str] = None, extra_messages: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        组装消息：系统提示词 + 静态前缀 + 文档（续写时再追加已输出的内容与续写要求）
+        
+        支持前缀缓存标记的服务（如OpenRouter转发的Anthropic/Gemini模型）在静态前缀末尾加
+        cache_control断点；其余服务依赖自动前缀缓存，静态部分同样位于最前面。
+        """
+        prefix = prefix or self.static_prompt
+        if self.cache_control:
+            user_content = [
+                {"type": "text", "text": prefix, "cache_control": {"type": "ephemeral"}},
+                {"type": "text", "text": user_prompt},
+            ]
+        else:
+            user_content = f"{prefix}\n{user_prompt}"
+        return [
+            {"role": "system", "content": self.system_prompt},
+            {"role": "user", "content": user_content}
+        ] + (extra_messages or [])
+    
+    def _output_budget(self, point_count: int, tokens_per_point: Optional[int] = None) -> int:
+        """
+        按请求的点位数估算最大输出token数（精简输出模式每个点位约为完整输出的1/4），不超过配置的上限
+        
+        Args:
+            point_count: 本次请求的点位数
+            tokens_per_point: 每个点位的输出token数，默认从配置读取
+            
+        Returns:
+            max_tokens
+        """
+        if tokens_per_point is None:
+            tokens_per_point = config.LLM_OUTPUT_TOKENS_PER_POINT
+            if self.compact_output:
+                tokens_per_point = max(tokens_per_point // 4, 1)
+        budget = config.LLM_OUTPUT_TOKENS_BASE + tokens_per_point * max(point_count, 1)
+        return min(budget, config.LLM_MAX_OUTPUT_TOKENS)
+    
+    def _table_output_budget(self) -> int:
+        """寄存器表预提取模式的输出预算（每个点位只输出点位与行ID）"""
+        return self._output_budget(self.point_count, tokens_per_point=30)
+    
+    def _reserve_tokens(
+        self,
+        user_prompt: str,
+        max_tokens: int,
+        prefix: Optional[str],
+        extra_messages: Optional[List[Dict]] = None
+    ) -> int:
+        """请求前向限流器预扣的token数（输入估算 + 最大输出）"""
+        prefix_tokens = self.prefix_tokens if prefix is None else estimate_tokens(self.system_prompt) + estimate_tokens(prefix)
+        extra_tokens = sum(estimate_tokens(message["content"]) for message in extra_messages or [])
+        return prefix_tokens + estimate_tokens(user_prompt) + extra_tokens + max_tokens
+    
+    def _retry_delay(self, error: Exception, attempt: int) -> Tuple[bool, float]:
+        """
+        判断调用失败后的等待时间
+        
+        Returns:
+            (是否为429限流, 重试前等待的秒数)
+        """
+        rate_limited = isinstance(error, openai.RateLimitError)
+        retry_after = parse_retry_after(getattr(getattr(error, "response", None), "headers", None))
+        if retry_after is None:
+            retry_after = min(2 ** attempt, 30) * (0.5 + random.random())
+        return rate_limited, retry_after
+    
+    def _create_completion(
+        self,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        prefix: Optional[str] = None,
+        extra_messages: Optional[List[Dict]] = None,
+        **kwargs
+    ):
+        """
+        经限流器调用模型，429/连接失败/5xx时退避重试
+        
+        成功返回时仍占用一个并发名额，调用方读取完响应后需调用 self.rate_limiter.release(reserved, used_tokens)。
+        
+        Returns:
+            (模型响应, 预扣的token数)
+        """
+        reserved = self._reserve_tokens(user_prompt, max_tokens, prefix, extra_messages)
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire(reserved)
+            try:
+                response = self.client.chat.completions.create(
+                    model=self.model,
+                    messages=self._messages(user_prompt, prefix, extra_messages),
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                    **kwargs
+                )
+                return response, reserved
+            except self.RETRYABLE_ERRORS as e:
+                rate_limited, delay = self._retry_delay(e, attempt)
+                self.rate_limiter.release(reserved, 0, rate_limited=rate_limited, retry_after=delay if rate_limited else None)
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning(f"模型调用失败（第 {attempt + 1} 次），{delay:.1f} 秒后重试: {e}")
+                if not rate_limited:
+                    time.sleep(delay)
+            except Exception:
+                self.rate_limiter.release(reserved, 0)
+                raise
+    
+    async def _acreate_completion(
+        self,
+        user_prompt: str,
+        temperature: float,
+        max_tokens: int,
+        prefix: Optional[str] = None,
+        extra_messages: Optional[List[Dict]] = None
+    ):
+        """
+        经限流器异步调用模型（共享AsyncOpenAI客户端），429/连接失败/5xx时退避重试
+        
+        Returns:
+            模型响应
+        """
+        client = _get_async_client(self.api_key, self.base_url)
+        reserved = self._reserve_tokens(user_prompt, max_tokens, prefix, extra_messages)
+        for attempt in range(self.max_retries + 1):
+            await self.rate_limiter.aacquire(reserved)
+            try:
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    messages=self._messages(user_prompt, prefix, extra_messages),
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+            except self.RETRYABLE_ERRORS as e:
+                rate_limited, delay = self._retry_delay(e, attempt)
+                self.rate_limiter.release(reserved, 0, rate_limited=rate_limited, retry_after=delay if rate_limited else None)
+                if attempt >= self.max_retries:
+                    raise
+                logger.warning(f"模型调用失败（第 {attempt + 1} 次），{delay:.1f} 秒后重试: {e}")
+                if not rate_limited:
+                    await asyncio.sleep(delay)
+                continue
+            except Exception:
+                self.rate_limiter.release(reserved, 0)
+                raise
+            
+            self.rate_limiter.release(reserved, self._used_tokens(response))
+            return response
+    
+    async def aextract(
+        self,
+        markdown_content: str,
+        temperature: float = 0.1,
+        max_tokens: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        异步提取Modbus点位信息（与extract结果一致）
+        
+        所有调用共享同一个AsyncOpenAI客户端与限流器，可用asyncio.gather同时处理多个文档，
+        并发数与请求速率由限流器统一控制。
+        
+        Args:
+            markdown_content: Markdown格式的协议内容
+            temperature: 温度参数，控制输出随机性
+            max_tokens: 每次调用的最大输出token数，默认按请求的点位数自适应
             
+        Returns:
+            提取的点位信息列表
+        """
+        logger.info("开始使用AI异步提取Modbus点位信息...")
+        
+        if self.point_store is not None:
+            # 点位结果存储与近似重复文档索引为SQLite读写，放到线程中执行，不阻塞事件循环上的其它提取
+            plan = await asyncio.to_thread(self._store_plan, markdown_content)
+            if plan["changed"]:
+                extractor = self._subset(plan["changed"])
+                new_points = await extractor.aextract(plan["document"], temperature, max_tokens)
+                recheck = self._recheck_mapping(plan, new_points)
+                if recheck:
+                    rechecker = self._subset(recheck)
+                    found = await rechecker.aextract(plan["markdown"], temperature, max_tokens)
+                    extractor.extract_issues.extend(rechecker.extract_issues)
+                    new_points = merge_followup(new_points, found, set(recheck.values()))
+                await asyncio.to_thread(self._store_points, plan, new_points, extractor)
+            return self._stored_points(plan)
+        
+        if self.fast_extractor is not None:
+            started = time.perf_counter()
+            usage_before = self._cascade_usage()
+            data_points = await self.fast_extractor.aextract(markdown_content, temperature, max_tokens)
+            fast_seconds = time.perf_counter() - started
+            uncertain = self._uncertain_points(data_points, markdown_content)
+            data_points = await self._afollowup(markdown_content, data_points, temperature, max_tokens, extra_codes=uncertain)
+            self._report_cascade(started, fast_seconds, usage_before, data_points, uncertain)
+            logger.info(f"成功提取 {len(data_points)} 个点位信息")
+            return data_points
+        
+        rows = self._register_rows(markdown_content)
+        if rows:
+            content = await self._acall_model(
+                self._build_rows_prompt(rows), temperature, max_tokens or self._table_output_budget(), prefix=self.table_prompt
+            )
+            data_points = self._points_from_mapping(content, rows)
+            data_points = await self._afollowup(markdown_content, data_points, temperature, max_tokens)
+            logger.info(f"成功提取 {len(data_points)} 个点位信息")
+            return data_points
+        
+        document = self._trim_document(markdown_content)
+        
+        if self.chunk_tokens > 0 and estimate_tokens(document) > self.chunk_tokens:
+            chunks = split_chunks(document, self.chunk_tokens, self.chunk_overlap_tokens)
+            logger.info(f"文档切分为 {len(chunks)} 个分块，异步并发提取")
+            outcomes = await asyncio.gather(
+                *(self._aextract_single(chunk, temperature, max_tokens) for chunk in chunks),
+                return_exceptions=True
+            )
+            results = [r for r in outcomes if not isinstance(r, BaseException)]
+            errors = [i + 1 for i, r in enumerate(outcomes) if isinstance(r, BaseException)]
+            if not results:
+                raise RuntimeError(f"所有分块提取均失败: {outcomes[0]}")
+            if errors:
+                self._record_issue(f"{len(errors)}/{len(chunks)} 个分块提取失败，结果可能不完整: {errors}")
+            data_points = merge_points(results)
+        else:
+            data_points = await self._aextract_single(document, temperature, max_tokens)
+        
+        data_points = await self._afollowup(markdown_content, data_points, temperature, max_tokens)
+        logger.info(f"成功提取 {len(data_points)} 个点位信息")
+        return data_points
+    
+    async def _aextract_single(self, markdown_content: str, temperature: float, max_tokens: Optional[int]) -> List[Dict]:
+        """异步单次调用模型提取（整篇文档或一个分块）"""
+        if self.point_shards:
+            return await self._aextract_sharded(markdown_content, temperature, max_tokens)
+        
+        content = await self._acall_model(
+            self._build_user_prompt(markdown_content), temperature, max_tokens or self._output_budget(self.point_count)
+        )
+        return self._to_points(self._parse_response(content))
+    
+    async def _acall_model(self, user_prompt: str, temperature: float, max_tokens: int, prefix: Optional[str] = None) -> str:
+        """异步调用模型并返回响应文本（与_call_model共用响应缓存，缓存文件读写在线程中执行）"""
+        cache_key = None
+        if self.cache is not None:
+            cache_key = self._cache_key(user_prompt, temperature, max_tokens, prefix)
+            content = await asyncio.to_thread(self.cache.get, cache_key)
+            if content is not None:
+                logger.info(f"命中模型响应缓存，跳过模型调用（{len(content)} 字符）")
+                return content
+        
+        try:
+            logger.info(f"异步调用模型: {self.model}")
+            response = await self._acreate_completion(user_prompt, temperature, max_tokens, prefix=prefix)
+            content, finish_reason = self._response_text(response)
+            content, finish_reason, objects = await self._acontinue(
+                user_prompt, temperature, max_tokens, prefix, content, finish_reason
+            )
+            return await asyncio.to_thread(self._finish_response, content, finish_reason, objects, cache_key)
         except Exception as e:
             logger.error(f"AI提取失败: {e}")
             raise
     
-    def _build_user_prompt(self, markdown_content: str) -> str:
+    def _extract_chunked(self, markdown_content: str, temperature: float, max_tokens: Optional[int]) -> List[Dict]:
         """
-        构建用户提示词
+        分块并行提取：文档切分为重叠分块后并发调用模型，再按MeasuringPointName合并结果
         
         Args:
             markdown_content: Markdown内容
+            temperature: 温度参数
+            max_tokens: 每个分块的最大输出token数，默认按点位数自适应
             
         Returns:
-            完整的用户提示词
+            合并后的点位信息列表
         """
-        # 构建数据描述
-        point_metadata_description = "需要提取的点位的meta data如下所示：\n"
-        for field_name, field_desc in self.point_metadata.items():
-            point_metadata_description += f"- {field_name}: {field_desc}\n"
+        chunks = split_chunks(markdown_content, self.chunk_tokens, self.chunk_overlap_tokens)
+        workers = min(self.max_workers, len(chunks))
+        logger.info(f"文档切分为 {len(chunks)} 个分块，并发数 {workers}")
+        
+        results: Dict[int, List[Dict]] = {}
+        errors: Dict[int, Exception] = {}
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(self._extract_single, chunk, temperature, max_tokens): i
+                for i, chunk in enumerate(chunks)
+            }
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                    logger.info(f"分块 {i + 1}/{len(chunks)} 提取完成: {len(results[i])} 个点位")
+                except Exception as e:
+                    errors[i] = e
+        
+        if not results:
+            raise RuntimeError(f"所有分块提取均失败: {next(iter(errors.values()))}")
+        if errors:
+            self._record_issue(f"{len(errors)}/{len(chunks)} 个分块提取失败，结果可能不完整: {sorted(i + 1 for i in errors)}")
+        
+        return merge_points([results[i] for i in sorted(results)])
+    
+    def _followup_request(
+        self,
+        markdown_content: str,
+        data_points: List[Dict],
+        extra_codes: Optional[List[str]] = None
+    ) -> Optional[Tuple[List[str], str, str]]:
+        """
+        构建补充提取请求：找出缺失或不可信（exist为假、地址缺失或格式不正确）的点位，
+        只检索与这些点位相关的章节
+        
+        Args:
+            markdown_content: 完整的Markdown内容
+            data_points: 当前的提取结果
+            extra_codes: 额外需要重新提取的点位（如级联模式下置信度低的点位）
             
-        dev_mapping_description = "需要提取的点位: MeasuringPointName 如下所示：\n"
+        Returns:
+            (补充提取的点位列表, 静态前缀, 用户提示词)，没有需要补充的点位时返回None
+        """
+        confident = {str(p.get("MeasuringPointName") or "").strip() for p in data_points if is_confident(p)}
+        confident -= set(extra_codes or [])
+        targets = {desc: code for desc, code in _flatten_mapping(self.dev_mapping).items() if code not in confident}
+        if not targets:
+            return None
+        
+        report = trim_markdown(
+            markdown_content,
+            mapping_queries(targets),
+            self.followup_token_budget,
+            max_section_tokens=config.RETRIEVAL_MAX_SECTION_TOKENS
+        )
+        logger.info(
+            f"补充提取 {len(targets)} 个缺失/不可信点位: {sorted(set(targets.values()))}，"
+            f"检索相关章节约 {report['kept_tokens']} tokens（原文约 {report['original_tokens']} tokens）"
+        )
+        return list(targets.values()), self._build_static_prompt(targets), self._build_user_prompt(report["content"])
+    
+    def _followup(
+        self,
+        markdown_content: str,
+        data_points: List[Dict],
+        temperature: float,
+        max_tokens: Optional[int],
+        extra_codes: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """
+        对缺失或不可信的点位做补充提取并合并结果，成本与缺失点位数成正比而不是整篇文档
+        
+        Args:
+            markdown_content: 完整的Markdown内容
+            data_points: 当前的提取结果
+            temperature: 温度参数
+            max_tokens: 最大token数
+            extra_codes: 第一轮额外重新提取的点位（给出时即使followup_rounds为0也会执行一轮）
+            
+        Returns:
+            合并后的点位信息列表
+        """
+        rounds = max(self.followup_rounds, 1 if extra_codes else 0)
+        for round_index in range(rounds):
+            request = self._followup_request(markdown_content, data_points, extra_codes if round_index == 0 else None)
+            if request is None:
+                break
+            codes, prefix, user_prompt = request
+            try:
+                content = self._call_model(user_prompt, temperature, max_tokens or self._output_budget(len(codes)), prefix=prefix)
+                found = self._to_points(self._parse_response(content))
+            except Exception as e:
+                self._record_issue(f"补充提取失败，保留原结果: {e}")
+                break
+            data_points = merge_followup(data_points, found, codes)
+        return data_points
+    
+    async def _afollowup(
+        self,
+        markdown_content: str,
+        data_points: List[Dict],
+        temperature: float,
+        max_tokens: Optional[int],
+        extra_codes: Optional[List[str]] = None
+    ) -> List[Dict]:
+        """异步补充提取（与_followup一致）"""
+        rounds = max(self.followup_rounds, 1 if extra_codes else 0)
+        for round_index in range(rounds):
+            request = self._followup_request(markdown_content, data_points, extra_codes if round_index == 0 else None)
+            if request is None:
+                break
+            codes, prefix, user_prompt = request
+            try:
+                content = await self._acall_model(
+                    user_prompt, temperature, max_tokens or self._output_budget(len(codes)), prefix=prefix
+                )
+                found = self._to_points(self._parse_response(content))
+            except Exception as e:
+                self._record_issue(f"补充提取失败，保留原结果: {e}")
+                break
+            data_points = merge_followup(data_points, found, codes)
+        return data_points
+    
+    def _store_plan(self, markdown_content: str) -> Dict:
+        """
+        查询点位结果存储，找出输入有变化（或从未提取过）的点位
+        
+        Args:
+            markdown_content: Markdown内容
+            
+        Returns:
+            {doc_hash, desc_hashes, codes（按映射顺序）, stored（已存储的结果）, changed（需要提取的 {描述: 点位}）,
+             document（提取changed时使用的文档内容）, markdown（完整文档）}
+        """
+        flat = _flatten_mapping(self.dev_mapping)
+        descriptions: Dict[str, List[str]] = {}
+        for desc, code in flat.items():
+            descriptions.setdefault(code, []).append(desc)
+        desc_hashes = {code: content_hash(sorted(descs)) for code, descs in descriptions.items()}
+        
+        doc_hash = content_hash(markdown_content)
+        stored = self.point_store.get_many(doc_hash, desc_hashes, self.metadata_hash, self.prompt_version)
+        document = markdown_content
+        if not stored and self.document_index is not None:
+            reused, document = self._reuse_near_duplicate(markdown_content, doc_hash, desc_hashes)
+            stored.update(reused)
+        changed = {desc: code for desc, code in flat.items() if code not in stored}
+        logger.info(
+            f"点位结果存储: 复用 {len(stored)} 个点位，需要提取 {len(set(changed.values()))} 个点位"
+        )
+        return {
+            "doc_hash": doc_hash,
+            "desc_hashes": desc_hashes,
+            "codes": list(descriptions),
+            "stored": stored,
+            "changed": changed,
+            "document": document,
+            "markdown": markdown_content,
+        }
+    
+    def _reuse_near_duplicate(
+        self,
+        markdown_content: str,
+        doc_hash: str,
+        desc_hashes: Dict[str, str]
+    ) -> Tuple[Dict[str, Dict], str]:
+        """
+        复用近似重复文档的点位结果
+        
+        - 地址出现在未变化章节中的点位直接复用
+        - 其余点位（地址只在有差异的章节中或已不在文档中）先在有差异的章节中重新核对，
+          没有找到时再在完整文档中提取（见_recheck_mapping）
+        - 近似重复文档中没有结果的点位（如新增的映射）在完整文档中提取
+        
+        Args:
+            markdown_content: Markdown内容
+            doc_hash: 文档哈希
+            desc_hashes: {MeasuringPointName: 点位描述哈希}
+            
+        Returns:
+            (复用的点位结果 {MeasuringPointName: 点位}, 提取其余点位时使用的文档内容)
+        """
+        signature = DocumentSignature.from_markdown(markdown_content, doc_hash)
+        self.document_index.add(signature)
+        
+        for similarity, previous in self.document_index.find_similar(signature, config.NEAR_DUPLICATE_THRESHOLD):
+            previous_points = self.point_store.get_many(
+                previous.doc_hash, desc_hashes, self.metadata_hash, self.prompt_version
+            )
+            if not previous_points:
+                continue
+            
+            changed, unchanged = changed_sections(markdown_content, previous)
+            unchanged_terms = set(tokenize("\n\n".join(section.text for section in unchanged)))
+            reused: Dict[str, Dict] = {}
+            for code, point in previous_points.items():
+                if address_in_document(point, unchanged_terms):
+                    reused[code] = point
+            if reused:
+                self.point_store.put_many(doc_hash, reused, desc_hashes, self.metadata_hash, self.prompt_version)
+            
+            missing = set(desc_hashes) - set(reused)
+            logger.info(
+                f"检测到近似重复文档（相似度 {similarity:.2f}）: 复用 {len(reused)} 个点位，"
+                f"{len(changed)}/{len(changed) + len(unchanged)} 个章节有差异，需要核对 {len(missing)} 个点位"
+            )
+            if changed and missing <= set(previous_points):
+                return reused, "\n\n".join(section.text for section in changed)
+            return reused, markdown_content
+        
+        return {}, markdown_content
+    
+    def _recheck_mapping(self, plan: Dict, new_points: List[Dict]) -> Dict[str, str]:
+        """
+        只在近似重复文档的差异章节中提取时，找出没有可信结果的点位：
+        这些点位可能位于未变化的章节中，需要在完整文档中重新提取后才能判定为缺失
+        
+        Args:
+            plan: _store_plan的结果
+            new_points: 在差异章节中提取的点位
+            
+        Returns:
+            需要在完整文档中重新提取的 {描述: MeasuringPointName}，提取时使用的已是完整文档时为空
+        """
+        if plan["document"] is plan["markdown"]:
+            return {}
+        confident = {str(point.get("MeasuringPointName") or "").strip() for point in new_points if is_confident(point)}
+        recheck = {desc: code for desc, code in plan["changed"].items() if code not in confident}
+        if recheck:
+            logger.info(f"差异章节中没有找到 {len(set(recheck.values()))} 个点位，在完整文档中重新提取")
+        return recheck
+    
+    def _store_points(self, plan: Dict, new_points: List[Dict], extractor: "AIExtractor") -> None:
+        """
+        合并子集提取器的结果到plan["stored"]，并取回其检索/级联报告
+        
+        提取完整（没有分块/分组失败、补充提取失败或输出截断）时只保存可信的点位结果；未找到或不可信的点位不写入，
+        下次重新提取。不完整时不写入点位结果存储。
+        
+        Args:
+            plan: _store_plan的结果
+            new_points: 子集提取器提取的点位
+            extractor: 子集提取器（_subset创建）
+        """
+        self.last_retrieval_report = extractor.last_retrieval_report
+        self.last_cascade_report = extractor.last_cascade_report
+        
+        results: Dict[str, Optional[Dict]] = {code: None for code in set(plan["changed"].values())}
+        for point in new_points:
+            name = str(point.get("MeasuringPointName") or "").strip()
+            if name in results and (results[name] is None or is_confident(point)):
+                results[name] = point
+        plan["stored"].update(results)
+        
+        if extractor.extract_issues:
+            logger.warning(f"提取结果可能不完整（{len(extractor.extract_issues)} 个问题），不写入点位结果存储")
+            return
+        found = {code: point for code, point in results.items() if point is not None and is_confident(point)}
+        self.point_store.put_many(
+            plan["doc_hash"], found, plan["desc_hashes"], self.metadata_hash, self.prompt_version
+        )
+    
+    @staticmethod
+    def _stored_points(plan: Dict) -> List[Dict]:
+        """按映射顺序返回点位结果（跳过文档中不存在的点位）"""
+        data_points = [plan["stored"][code] for code in plan["codes"] if plan["stored"].get(code) is not None]
+        logger.info(f"成功提取 {len(data_points)} 个点位信息")
+        return data_points
+    
+    def _extract_cascade(self, markdown_content: str, temperature: float, max_tokens: Optional[int]) -> List[Dict]:
+        """
+        模型级联：快速模型提取全部点位，只把置信度低的点位交给强模型在相关章节中复核
+        
+        Args:
+            markdown_content: 完整的Markdown内容
+            temperature: 温度参数
+            max_tokens: 最大token数
+            
+        Returns:
+            提取的点位信息列表
+        """
+        started = time.perf_counter()
+        usage_before = self._cascade_usage()
+        data_points = self.fast_extractor.extract(markdown_content, temperature, max_tokens)
+        fast_seconds = time.perf_counter() - started
+        
+        uncertain = self._uncertain_points(data_points, markdown_content)
+        data_points = self._followup(markdown_content, data_points, temperature, max_tokens, extra_codes=uncertain)
+        self._report_cascade(started, fast_seconds, usage_before, data_points, uncertain)
+        return data_points
+    
+    def _uncertain_points(self, data_points: List[Dict], markdown_content: str) -> List[str]:
+        """按置信度挑选需要强模型复核的点位（缺失的点位由补充提取统一处理）"""
+        uncertain = []
+        for name, (score, reasons) in score_points(data_points, markdown_content).items():
+            if score < config.CASCADE_MIN_CONFIDENCE:
+                uncertain.append(name)
+                logger.info(f"点位 {name} 置信度 {score}，交由 {self.model} 复核: {'；'.join(reasons)}")
+        return uncertain
+    
+    def _cascade_usage(self) -> Dict[str, Dict[str, int]]:
+        """快速模型与强模型当前的累计token用量"""
+        return {"fast": dict(self.fast_extractor.usage_stats), "strong": dict(self.usage_stats)}
+    
+    @staticmethod
+    def _usage_cost(model: str, prompt_tokens: int, completion_tokens: int) -> Optional[float]:
+        """按配置的模型单价估算费用（美元），未配置单价时返回None"""
+        prices = config.MODEL_PRICES.get(model)
+        if not prices:
+            return None
+        return (prompt_tokens * prices[0] + completion_tokens * prices[1]) / 1_000_000
+    
+    def _report_cascade(
+        self,
+        started: float,
+        fast_seconds: float,
+        usage_before: Dict[str, Dict[str, int]],
+        data_points: List[Dict],
+        uncertain: List[str]
+    ) -> Dict:
+        """
+        统计本文档级联提取的耗时与费用；全部使用强模型的费用按快速模型的token用量以强模型单价估算
+        
+        Returns:
+            级联报告（同时保存在last_cascade_report）
+        """
+        usage_after = self._cascade_usage()
+        delta = {
+            tier: {key: usage_after[tier][key] - usage_before[tier][key] for key in ("calls", "prompt_tokens", "completion_tokens")}
+            for tier in ("fast", "strong")
+        }
+        fast_cost = self._usage_cost(self.fast_extractor.model, delta["fast"]["prompt_tokens"], delta["fast"]["completion_tokens"])
+        strong_cost = self._usage_cost(self.model, delta["strong"]["prompt_tokens"], delta["strong"]["completion_tokens"])
+        strong_only_cost = self._usage_cost(self.model, delta["fast"]["prompt_tokens"], delta["fast"]["completion_tokens"])
+        
+        report = {
+            "fast_model": self.fast_extractor.model,
+            "strong_model": self.model,
+            "points": len(data_points),
+            "escalated_points": len(uncertain),
+            "fast_seconds": round(fast_seconds, 2),
+            "strong_seconds": round(time.perf_counter() - started - fast_seconds, 2),
+            "fast_usage": delta["fast"],
+            "strong_usage": delta["strong"],
+            "cost": None,
+            "strong_only_cost": strong_only_cost,
+            "saved_cost": None,
+        }
+        if fast_cost is not None and strong_cost is not None:
+            report["cost"] = round(fast_cost + strong_cost, 6)
+            if strong_only_cost:
+                report["saved_cost"] = round(strong_only_cost - report["cost"], 6)
+        self.last_cascade_report = report
+        
+        message = (
+            f"模型级联: {report['fast_model']} 提取耗时 {report['fast_seconds']} 秒，"
+            f"{report['strong_model']} 复核 {report['escalated_points']} 个低置信度点位（及缺失点位）耗时 {report['strong_seconds']} 秒，"
+            f"共 {report['points']} 个点位"
+        )
+        if report["saved_cost"] is not None:
+            message += (
+                f"；费用约 ${report['cost']:.4f}，全部使用强模型约 ${strong_only_cost:.4f}，"
+                f"节省 ${report['saved_cost']:.4f}"
+            )
+        logger.info(message)
+        return report
+    
+    def _build_point_shards(self) -> List[Dict[str, str]]:
+        """
+        将需要提取的点位按MeasuringPointName分组（同一点位的多条描述放在同一组）
+        
+        Returns:
+            [{点位描述: MeasuringPointName}]，点位数不超过shard_size或未启用分组时为空列表
+        """
+        if self.shard_size <= 0:
+            return []
+        
+        by_code: Dict[str, Dict[str, str]] = {}
+        for desc, code in _flatten_mapping(self.dev_mapping).items():
+            by_code.setdefault(code, {})[desc] = code
+        if len(by_code) <= self.shard_size:
+            return []
+        
+        codes = list(by_code)
+        shards = []
+        for start in range(0, len(codes), self.shard_size):
+            shard: Dict[str, str] = {}
+            for code in codes[start:start + self.shard_size]:
+                shard.update(by_code[code])
+            shards.append(shard)
+        logger.info(f"{len(codes)} 个点位分为 {len(shards)} 组提取，每组最多 {self.shard_size} 个")
+        return shards
+    
+    def _build_shard_prefix(self, markdown_content: str) -> str:
+        """点位分组提取的前缀：说明与文档在前，同一文档的所有分组共享这段前缀缓存，各组的点位列表放在最后"""
+        return f"{self._build_static_prompt(document_first=True)}\n{self._build_user_prompt(markdown_content)}"
+    
+    def _shard_points(self, content: str, shard: Dict[str, str]) -> List[Dict]:
+        """解析一组的响应，只保留本组的点位"""
+        codes = set(shard.values())
+        points = self._to_points(self._parse_response(content))
+        return [p for p in points if str(p.get("MeasuringPointName") or "").strip() in codes]
+    
+    def _extract_sharded(self, markdown_content: str, temperature: float, max_tokens: Optional[int]) -> List[Dict]:
+        """
+        点位分组并发提取：各组共享文档前缀，只有末尾的点位列表不同，合并各组结果
+        
+        启用cache_control时先单独执行第一组写入前缀缓存，其余组再并发执行以命中缓存。
+        
+        Args:
+            markdown_content: Markdown内容
+            temperature: 温度参数
+            max_tokens: 每组的最大输出token数，默认按组内点位数自适应
+            
+        Returns:
+            合并后的点位信息列表
+        """
+        prefix = self._build_shard_prefix(markdown_content)
+        shards = self.point_shards
+        
+        def run(shard: Dict[str, str]) -> List[Dict]:
+            budget = max_tokens or self._output_budget(len(set(shard.values())))
+            content = self._call_model(self._mapping_description(shard), temperature, budget, prefix=prefix)
+            return self._shard_points(content, shard)
+        
+        results: Dict[int, List[Dict]] = {}
+        errors: Dict[int, Exception] = {}
+        pending = list(range(len(shards)))
+        if self.cache_control and len(shards) > 1:
+            try:
+                results[0] = run(shards[0])
+            except Exception as e:
+                errors[0] = e
+            pending = pending[1:]
+        
+        with ThreadPoolExecutor(max_workers=max(1, min(self.max_workers, len(pending)))) as executor:
+            futures = {executor.submit(run, shards[i]): i for i in pending}
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                    logger.info(f"点位分组 {i + 1}/{len(shards)} 提取完成: {len(results[i])} 个点位")
+                except Exception as e:
+                    errors[i] = e
+        
+        if not results:
+            raise RuntimeError(f"所有点位分组提取均失败: {next(iter(errors.values()))}")
+        if errors:
+            self._record_issue(f"{len(errors)}/{len(shards)} 个点位分组提取失败，结果可能不完整: {sorted(i + 1 for i in errors)}")
+        
+        return merge_points([results[i] for i in sorted(results)])
+    
+    async def _aextract_sharded(self, markdown_content: str, temperature: float, max_tokens: Optional[int]) -> List[Dict]:
+        """异步点位分组提取（与_extract_sharded一致）"""
+        prefix = self._build_shard_prefix(markdown_content)
+        shards = self.point_shards
+        
+        async def run(shard: Dict[str, str]) -> List[Dict]:
+            budget = max_tokens or self._output_budget(len(set(shard.values())))
+            content = await self._acall_model(self._mapping_description(shard), temperature, budget, prefix=prefix)
+            return self._shard_points(content, shard)
+        
+        outcomes: List = []
+        if self.cache_control and len(shards) > 1:
+            outcomes.extend(await asyncio.gather(run(shards[0]), return_exceptions=True))
+        outcomes.extend(await asyncio.gather(*(run(shard) for shard in shards[len(outcomes):]), return_exceptions=True))
+        
+        results = [r for r in outcomes if not isinstance(r, BaseException)]
+        errors = [i + 1 for i, r in enumerate(outcomes) if isinstance(r, BaseException)]
+        if not results:
+            raise RuntimeError(f"所有点位分组提取均失败: {outcomes[0]}")
+        if errors:
+            self._record_issue(f"{len(errors)}/{len(shards)} 个点位分组提取失败，结果可能不完整: {errors}")
+        return merge_points(results)
+    
+    def _build_table_prompt(self) -> str:
+        """
+        构建寄存器表预提取模式的静态前缀：只要求模型把点位映射到候选行ID
+        
+        Returns:
+            静态前缀文本
+        """
+        dev_mapping_description = "需要提取的点位（描述: MeasuringPointName）：\n"
         for field_name, field_desc in self.dev_mapping.items():
             dev_mapping_description += f"- {field_name}: {field_desc}\n"
         
-        prompt = f"""{point_metadata_description}
-
-请从以下Modbus协议文档中提取完整的点位信息，以JSON数组格式输出。每个点位包含上述所有字段。
+        return f"""{dev_mapping_description}
+本消息最后给出了从协议文档的寄存器表中预先整理的候选行，每行格式为：行ID | 地址 | 单位 | 读写 | 精度 | 描述。
+请为上述每个点位选择最匹配的一个候选行，以JSON数组格式输出，格式如下：
+```json
+[
+  {{"code": "MeasuringPointName", "row": "R12"}},
+  ...
+]
+```
 
-协议文档内容：
+注意：
+1. 没有匹配候选行的点位不输出
+2. 同一个点位有多个类似的描述时，可以尝试通过分区进行区分；一般情况下控制设定点出现在0区&4区，状态采集点出现在1区&3区
+3. 只输出JSON数组，不要有其他文字说明
+"""
+    
+    def _register_rows(self, markdown_content: str) -> List[RegisterRow]:
+        """
+        寄存器表预提取模式下解析候选行；未启用或候选行过少（表格不规范）时返回空列表，走完整提取
+        
+        Args:
+            markdown_content: 完整的Markdown内容（在章节裁剪之前解析，避免丢失表格）
+            
+        Returns:
+            候选寄存器行列表
+        """
+        if not self.table_mode:
+            return []
+        rows = extract_register_rows(markdown_content)
+        if len(rows) < config.EXTRACT_TABLE_MIN_ROWS:
+            logger.info(f"候选寄存器行不足 {config.EXTRACT_TABLE_MIN_ROWS} 个，改为完整提取")
+            return []
+        return rows
+    
+    def _build_rows_prompt(self, rows: List[RegisterRow]) -> str:
+        """
+        构建寄存器表预提取模式的用户提示词（可变部分）：只包含候选行，超出预算时按相关度筛选
+        
+        Args:
+            rows: 候选寄存器行
+            
+        Returns:
+            用户提示词
+        """
+        lines = [row.to_line() for row in rows]
+        candidates = "\n".join(lines)
+        budget = self.retrieval_token_budget
+        if budget > 0 and estimate_tokens(candidates) > budget:
+            index = SectionIndex("\n".join(f"# {line}" for line in lines), max_section_tokens=budget)
+            selected = index.select(mapping_queries(self.dev_mapping), budget)
+            candidates = "\n".join(section.text[2:] for section in selected)
+            logger.info(f"候选寄存器行按相关度筛选: {len(selected)}/{len(rows)} 行")
+        
+        logger.info(f"寄存器表预提取模式: {len(rows)} 个候选行，约 {estimate_tokens(candidates)} tokens")
+        return f"候选寄存器行：\n\n{candidates}\n"
+    
+    def _points_from_mapping(self, content: str, rows: List[RegisterRow]) -> List[Dict]:
+        """
+        将模型输出的 点位 -> 行ID 映射展开为完整点位信息
+        
+        Args:
+            content: 模型响应文本
+            rows: 候选寄存器行
+            
+        Returns:
+            提取的点位信息列表
+        """
+        rows_by_id = {row.row_id: row for row in rows}
+        data_points = []
+        for item in self._parse_response(content, fields=_TABLE_OUTPUT_FIELDS):
+            code = str(item.get("code") or item.get("MeasuringPointName") or "").strip()
+            row_id = str(item.get("row") or "").strip().upper()
+            row = rows_by_id.get(row_id)
+            if not code:
+                continue
+            if row is None:
+                if row_id:
+                    logger.warning(f"点位 {code} 映射到不存在的候选行: {row_id}")
+                continue
+            point = self._point_from_row(code, row)
+            if point is not None:
+                data_points.append(point)
+        return data_points
+    
+    @staticmethod
+    def _point_from_row(code: str, row: RegisterRow) -> Optional[Dict]:
+        """根据候选行生成点位字段（数据类型、读写属性等按地址功能区推导）"""
+        rw = row.rw.lower()
+        point = derive_point({
+            "code": code,
+            "addr": row.modbus_address,
+            "scale": parse_scale(row.scale),
+            "unit": row.unit,
+            "rw": "ro" if rw and "w" not in rw and "写" not in rw else "",
+            "desc": row.description,
+        })
+        if point is not None:
+            point["thinking"] = f"规则预提取候选行 {row.row_id}: {row.description}"
+        return point
+    
+    def _to_points(self, items: List[Dict]) -> List[Dict]:
+        """精简输出模式下将模型输出推导为完整点位字段，否则原样返回"""
+        return derive_points(items) if self.compact_output else items
+    
+    def _trim_document(self, markdown_content: str) -> str:
+        """
+        按token预算检索与dev_mapping点位相关的章节（标题、表格），裁剪掉无关内容
+        
+        Args:
+            markdown_content: Markdown内容
+            
+        Returns:
+            裁剪后的Markdown内容（未超出预算时原样返回）
+        """
+        report = trim_markdown(
+            markdown_content,
+            mapping_queries(self.dev_mapping),
+            self.retrieval_token_budget,
+            max_section_tokens=config.RETRIEVAL_MAX_SECTION_TOKENS
+        )
+        self.last_retrieval_report = {k: v for k, v in report.items() if k != "content"}
+        
+        if report["cut_tokens"]:
+            logger.info(
+                f"文档检索裁剪: 原文约 {report['original_tokens']} tokens，"
+                f"保留 {report['kept_sections']}/{report['total_sections']} 个章节约 {report['kept_tokens']} tokens，"
+                f"裁剪 {report['cut_tokens']} tokens"
+            )
+        return report["content"]
+    
+    def _build_static_prompt(self, dev_mapping: Optional[Dict] = None, document_first: bool = False) -> str:
+        """
+        构建提示词的静态前缀（点位元数据、点位映射、输出格式与注意事项）
+        
+        静态前缀只依赖提取器的配置，每个提取器构建一次；放在文档内容之前，
+        同一设备类型的多份文档可命中服务端的前缀缓存。
+        
+        Args:
+            dev_mapping: 需要提取的点位，默认为全部点位（补充提取时只传入缺失的点位）
+            document_first: 点位分组提取时文档接在前缀之后、点位列表放在消息最后，前缀中不包含点位映射
+            
+        Returns:
+            静态前缀文本
+        """
+        dev_mapping = self.dev_mapping if dev_mapping is None else dev_mapping
+        dev_mapping_description = "" if document_first else self._mapping_description(dev_mapping)
+        task = (
+            "请从下面给出的Modbus协议文档中提取本消息最后列出的点位" if document_first
+            else "请从本消息最后给出的Modbus协议文档中提取上述点位"
+        )
+        if self.compact_output:
+            return self._build_compact_prompt(dev_mapping_description, task)
+        
+        point_metadata_description = "需要提取的点位的meta data如下所示：\n"
+        for field_name, field_desc in self.point_metadata.items():
+            point_metadata_description += f"- {field_name}: {field_desc}\n"
+        
+        return f"""{point_metadata_description}
 
-{markdown_content}
+{dev_mapping_description}
 
-请以JSON数组格式输出所有点位信息，格式如下：
+{task}的完整信息，以JSON数组格式输出。每个点位包含上述所有字段，格式如下：
 ```json
 [
   {{
@@ -186,61 +1780,151 @@ class AIExtractor:
 ]
 ```
 
+注意：
+1. 从说明书中提取上述描述中的点位信息（不存在的点位不输出）
+2. 同一个点位有多个类似的描述时，可以尝试通过分区进行区分；一般情况下控制设定点出现在0区&4区，状态采集点出现在1区&3区
+3. 只输出JSON数组，不要有其他文字说明
+"""
+    
+    def _build_compact_prompt(self, dev_mapping_description: str, task: str) -> str:
+        """
+        构建精简输出模式的静态前缀：只要求输出地址等无法推导的字段，
+        数据类型、读写属性、位使能等由地址功能区在本地推导
+        
+        Args:
+            dev_mapping_description: 需要提取的点位列表文本（点位分组提取时为空）
+            task: 任务说明
+            
+        Returns:
+            静态前缀文本
+        """
+        fields_description = "每个点位只输出以下字段：\n"
+        for field_name, field_desc in COMPACT_FIELDS.items():
+            fields_description += f"- {field_name}: {field_desc}\n"
+        
+        return f"""{fields_description}
 {dev_mapping_description}
+{task}，按上述规则确定功能区、数据类型与地址，以JSON数组格式输出（不要输出思考过程），格式如下：
+```json
+[
+  {{"code": "TchwIn", "addr": "3X0001", "scale": 0.1, "unit": "℃", "desc": "冷冻水进水温度"}},
+  {{"code": "STrunning", "addr": "3X0010.0", "desc": "机组运行状态"}},
+  ...
+]
+```
 
 注意：
-1. 从说明书中提取上述描述中的点位信息（不存在的点位不输出）
+1. 不存在的点位不输出
 2. 同一个点位有多个类似的描述时，可以尝试通过分区进行区分；一般情况下控制设定点出现在0区&4区，状态采集点出现在1区&3区
 3. 只输出JSON数组，不要有其他文字说明
 """
-        return prompt
     
-    def _parse_response(self, content: str) -> List[Dict]:
+    @staticmethod
+    def _mapping_description(dev_mapping: Dict) -> str:
+        """需要提取的点位列表文本"""
+        dev_mapping_description = "需要提取的点位: MeasuringPointName 如下所示：\n"
+        for field_name, field_desc in dev_mapping.items():
+            dev_mapping_description += f"- {field_name}: {field_desc}\n"
+        return dev_mapping_description
+    
+    def _build_user_prompt(self, markdown_content: str) -> str:
+        """
+        构建用户提示词的可变部分（协议文档），发送时接在静态前缀之后
+        
+        Args:
+            markdown_content: Markdown内容
+            
+        Returns:
+            文档部分的提示词
+        """
+        return f"""协议文档内容：
+
+{markdown_content}
+"""
+    
+    def _parse_response(self, content: str, fields: Optional[set] = None) -> List[Dict]:
         """
-        解析AI响应内容，使用 json_repair 处理格式不正确的 JSON
+        解析AI响应内容：先用json.loads严格解析，失败时再用 json_repair 修复格式不正确的 JSON，
+        最后按输出字段校验每个元素
         
         Args:
             content: AI响应的文本内容
+            fields: 允许的输出字段，默认为当前输出模式的字段
             
         Returns:
             解析后的点位信息列表
         """
-        import re
-        from json_repair import repair_json, loads
+        # 尝试提取JSON代码块，没有代码块时直接解析整个内容
+        match = _CODE_BLOCK_PATTERN.search(content)
+        json_str = match.group(1).strip() if match else content.strip()
         
-        # 尝试提取JSON代码块
-        # 匹配 ```json ... ``` 或 ``` ... ```
-        json_pattern = r'```(?:json)?\s*\n?(.*?)\n?```'
-        matches = re.findall(json_pattern, content, re.DOTALL)
+        try:
+            data = json.loads(json_str)
+            self._record_decode(strict=1)
+        except ValueError:
+            try:
+                data = json_repair.loads(json_str)
+                self._record_decode(repaired=1)
+            except Exception as e:
+                self._record_decode(failed=1)
+                logger.error(f"JSON解析失败: {e}")
+                logger.error(f"原始响应内容（前500字符）: {content[:500]}")
+                raise ValueError(f"AI响应的JSON格式无法解析: {e}")
         
-        if matches:
-            json_str = matches[0].strip()
-        else:
-            # 如果没有代码块，尝试直接解析整个内容
-            json_str = content.strip()
+        logger.opt(lazy=True).debug("JSON 解析成功: \n{}", lambda: json.dumps(data, ensure_ascii=False))
         
-        try:
-            # 首先尝试使用 json_repair 修复可能的 JSON 格式问题
-            # repaired_json_str = repair_json(json_str)
-            # data = json.loads(repaired_json_str)
-            
-            data = json_repair.loads(json_str)
-            
-            logger.debug("JSON 解析成功: \n" + json.dumps(data, ensure_ascii=False))
-            
-            # 确保返回的是列表
-            if isinstance(data, dict):
-                data = [data]
-            elif not isinstance(data, list):
-                raise ValueError("返回的数据格式不正确，应该是JSON数组")
-            
-            return data
-            
-        except Exception as e:
-            logger.error(f"JSON解析失败: {e}")
-            logger.error(f"原始响应内容（前500字符）: {content[:500]}")
+        # 确保返回的是列表
+        if isinstance(data, dict):
+            data = [data]
+        elif not isinstance(data, list):
+            self._record_decode(failed=1)
             logger.error(f"提取的JSON字符串（前500字符）: {json_str[:500]}")
-            raise ValueError(f"AI响应的JSON格式无法解析: {e}")
+            raise ValueError("AI响应的JSON格式无法解析: 返回的数据格式不正确，应该是JSON数组")
+        
+        return self._validate_points(data, fields)
+    
+    def _output_fields(self) -> set:
+        """当前输出模式允许的字段"""
+        if self.compact_output:
+            return set(COMPACT_FIELDS)
+        return set(self.point_metadata) | _EXTRA_OUTPUT_FIELDS
+    
+    def _validate_points(self, items: List, fields: Optional[set] = None) -> List[Dict]:
+        """
+        按输出字段校验模型输出：丢弃非对象或缺少点位名称的元素，统计未定义的字段
+        
+        Args:
+            items: 解析出的元素列表
+            fields: 允许的输出字段，默认为当前输出模式的字段
+            
+        Returns:
+            通过校验的点位列表
+        """
+        fields = fields or self._output_fields()
+        name_field = "code" if "code" in fields else "MeasuringPointName"
+        
+        valid: List[Dict] = []
+        unknown: set = set()
+        invalid = 0
+        for item in items:
+            if not isinstance(item, dict) or not str(item.get(name_field) or item.get("MeasuringPointName") or "").strip():
+                invalid += 1
+                continue
+            unknown.update(key for key in item if key not in fields)
+            valid.append(item)
+        
+        if invalid:
+            logger.warning(f"丢弃 {invalid} 个不符合输出格式的元素（非对象或缺少{name_field}）")
+        if unknown:
+            logger.debug(f"模型输出中包含未定义的字段: {sorted(unknown)}")
+        self._record_decode(invalid=invalid, unknown_fields=len(unknown))
+        return valid
+    
+    def _record_decode(self, **counts: int) -> None:
+        """累加响应解析统计"""
+        with self._usage_lock:
+            for key, value in counts.items():
+                self.decode_stats[key] += value
     
     def extract_from_file(self, markdown_file: Path) -> List[Dict]:
         """
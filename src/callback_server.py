@@ -0,0 +1,207 @@
+"""MinerU官方API回调接收模块 - 在本地接收解析任务完成通知，替代高频轮询"""
+
+import hashlib
+import http.server
+import json
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+# 任务登记（拿到task_id）之前到达的回调先暂存，登记时再用seed校验；限制暂存数量防止被灌满内存
+_MAX_UNVERIFIED_TASKS = 256
+_MAX_UNVERIFIED_PER_TASK = 8
+
+
+class CallbackReceiver:
+    """
+    MinerU官方API回调接收器
+
+    创建任务时携带 callback（本接收器的公网地址）与 seed，任务结束后MinerU会以
+    POST application/json 推送 {"checksum": ..., "content": "<任务结果JSON字符串>"}。
+    接收器校验 checksum 后按 task_id（批量任务为 batch_id）保存结果并唤醒等待的线程；任务登记之前到达的回调
+    （task_id要等创建任务的请求返回后才知道）先暂存，登记时再校验。
+    """
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8870, public_url: str = "", uid: str = ""):
+        """
+        初始化回调接收器
+
+        Args:
+            host: 本地监听地址
+            port: 本地监听端口，0表示随机端口
+            public_url: MinerU可访问的回调地址（需经端口映射/反向代理指向本接收器），为空时使用本地地址
+            uid: MinerU账号UID，用于校验回调的checksum（sha256(uid + seed + content)），必须提供
+
+        Raises:
+            ValueError: 未提供uid（无法校验回调来源）
+        """
+        if not uid:
+            raise ValueError("启用MinerU回调时必须提供账号UID（MINERU_UID），用于校验回调的checksum")
+        self.uid = uid
+        self._results: Dict[str, Dict] = {}
+        self._events: Dict[str, threading.Event] = {}
+        self._seeds: Dict[str, str] = {}
+        self._unverified: Dict[str, List[Tuple[Optional[str], str, Dict]]] = {}
+        self._lock = threading.Lock()
+
+        self._server = http.server.ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self.public_url = public_url or f"http://127.0.0.1:{self.port}/"
+
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mineru-callback", daemon=True)
+        self._thread.start()
+        logger.info(f"MinerU回调接收器已启动: {host}:{self.port} (回调地址: {self.public_url})")
+
+    def register(self, task_id: str, seed: str) -> None:
+        """
+        登记等待回调的任务
+
+        Args:
+            task_id: 任务ID（批量任务为batch_id）
+            seed: 创建任务时使用的seed，用于校验checksum（同时校验登记前暂存的回调）
+        """
+        finished = False
+        with self._lock:
+            event = self._events.setdefault(task_id, threading.Event())
+            self._seeds[task_id] = seed
+            for checksum, content, data in self._unverified.pop(task_id, []):
+                if checksum != self._checksum(seed, content):
+                    logger.warning(f"MinerU回调checksum校验失败，已忽略: task_id={task_id}")
+                    continue
+                self._results[task_id] = data
+                finished = finished or self._is_finished(data)
+        if finished:
+            event.set()
+
+    def wait(self, task_id: str, timeout: float) -> Optional[Dict]:
+        """
+        等待任务回调
+
+        Args:
+            task_id: 任务ID
+            timeout: 最长等待时间（秒）
+
+        Returns:
+            任务结果（与查询接口返回的data结构一致），超时返回None
+        """
+        with self._lock:
+            event = self._events.setdefault(task_id, threading.Event())
+        if not event.wait(timeout):
+            return None
+        with self._lock:
+            return self._results.get(task_id)
+
+    def discard(self, task_id: str) -> None:
+        """任务结束后清理登记信息"""
+        with self._lock:
+            self._events.pop(task_id, None)
+            self._results.pop(task_id, None)
+            self._seeds.pop(task_id, None)
+            self._unverified.pop(task_id, None)
+
+    def shutdown(self) -> None:
+        """停止接收器"""
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handle_notification(self, payload: Dict) -> bool:
+        """处理一条回调通知，返回是否接受"""
+        content = payload.get("content")
+        if not isinstance(content, str):
+            logger.warning(f"MinerU回调缺少content字段: {payload}")
+            return False
+
+        try:
+            data = json.loads(content)
+        except ValueError:
+            logger.warning("MinerU回调content不是合法JSON")
+            return False
+
+        # 兼容 content 直接为任务数据或外层包裹 data 的两种格式；批量任务以batch_id标识
+        if isinstance(data, dict) and isinstance(data.get("data"), dict):
+            data = data["data"]
+        task_id = (data.get("task_id") or data.get("batch_id")) if isinstance(data, dict) else None
+        if not task_id:
+            logger.warning(f"MinerU回调中未找到task_id: {content[:200]}")
+            return False
+
+        checksum = payload.get("checksum")
+        with self._lock:
+            seed = self._seeds.get(task_id)
+            if seed is None:
+                # 任务尚未登记：暂存，register时再校验
+                pending = self._unverified.setdefault(task_id, [])
+                pending.append((checksum, content, data))
+                del pending[:-_MAX_UNVERIFIED_PER_TASK]
+                while len(self._unverified) > _MAX_UNVERIFIED_TASKS:
+                    self._unverified.pop(next(iter(self._unverified)))
+                logger.info(f"收到尚未登记任务的MinerU回调，登记后校验: task_id={task_id}")
+                return True
+            if checksum != self._checksum(seed, content):
+                logger.warning(f"MinerU回调checksum校验失败，已忽略: task_id={task_id}")
+                return False
+            self._results[task_id] = data
+            event = self._events.setdefault(task_id, threading.Event())
+        logger.info(f"收到MinerU回调: task_id={task_id}, state={data.get('state')}")
+        # 只有任务结束时才唤醒等待方，中间状态的通知仅记录
+        if self._is_finished(data):
+            event.set()
+        return True
+
+    def _checksum(self, seed: str, content: str) -> str:
+        return hashlib.sha256(f"{self.uid}{seed}{content}".encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _is_finished(data: Dict) -> bool:
+        """单个任务结束，或批量任务中的所有文件都已结束"""
+        items = data.get("extract_result")
+        if isinstance(items, list) and items:
+            return all(isinstance(item, dict) and item.get("state") in ("done", "failed") for item in items)
+        return data.get("state") in ("done", "failed")
+
+    def _make_handler(self):
+        receiver = self
+
+        class _Handler(http.server.BaseHTTPRequestHandler):
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    payload = json.loads(self.rfile.read(length).decode("utf-8"))
+                    accepted = isinstance(payload, dict) and receiver._handle_notification(payload)
+                except ValueError:
+                    accepted = False
+                self.send_response(200 if accepted else 400)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                logger.debug(f"MinerU回调请求: {format % args}")
+
+        return _Handler
+
+
+_shared_receiver: Optional[CallbackReceiver] = None
+_shared_receiver_lock = threading.Lock()
+
+
+def get_callback_receiver(host: str, port: int, public_url: str = "", uid: str = "") -> CallbackReceiver:
+    """
+    获取进程内共享的回调接收器（同一端口只能监听一次）
+
+    Args:
+        host: 本地监听地址
+        port: 本地监听端口
+        public_url: MinerU可访问的回调地址
+        uid: MinerU账号UID（必须提供）
+
+    Returns:
+        共享的CallbackReceiver实例
+    """
+    global _shared_receiver
+    with _shared_receiver_lock:
+        if _shared_receiver is None:
+            _shared_receiver = CallbackReceiver(host=host, port=port, public_url=public_url, uid=uid)
+        return _shared_receiver
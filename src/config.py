@@ -1,5 +1,6 @@
 """配置管理模块"""
 
+import json
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -16,9 +17,63 @@ class Config:
     MODEL_NAME = os.getenv("MODEL_NAME", "google/gemini-2.5-pro")
     OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://openrouter.ai/api/v1")
     
+    # 模型级联配置（设置FAST_MODEL_NAME后启用：先用快速模型提取，置信度低的点位再用MODEL_NAME复核）
+    FAST_MODEL_NAME = os.getenv("FAST_MODEL_NAME", "")  # 例如 google/gemini-2.5-flash
+    CASCADE_MIN_CONFIDENCE = float(os.getenv("CASCADE_MIN_CONFIDENCE", "0.7"))
+    # 模型单价（美元/百万token，[输入, 输出]），用于估算级联节省的费用
+    MODEL_PRICES = json.loads(os.getenv(
+        "MODEL_PRICES",
+        '{"google/gemini-2.5-pro": [1.25, 10.0], "google/gemini-2.5-flash": [0.3, 2.5]}'
+    ))
+    
     # MinerU官方API配置
     MINERU_API_TOKEN = os.getenv("MINERU_API_TOKEN", "")
-    FILE_SERVER_URL = os.getenv("FILE_SERVER_URL", "")
+    FILE_SERVER_URL = os.getenv("FILE_SERVER_URL", "")  # 可选，未设置时直接上传文件到官方API
+    MINERU_OFFICIAL_API_BASE = os.getenv("MINERU_OFFICIAL_API_BASE", "https://mineru.net/api/v4")
+    
+    # 官方API任务轮询配置（按任务进度与页数自适应，限制在最小/最大间隔之间）
+    MINERU_POLL_MIN_INTERVAL = float(os.getenv("MINERU_POLL_MIN_INTERVAL", "1"))
+    MINERU_POLL_MAX_INTERVAL = float(os.getenv("MINERU_POLL_MAX_INTERVAL", "30"))
+    MINERU_SECONDS_PER_PAGE = float(os.getenv("MINERU_SECONDS_PER_PAGE", "1"))
+    
+    # 官方API回调配置（同时设置MINERU_CALLBACK_URL与MINERU_UID后启用，本地接收器监听HOST:PORT，按UID校验回调checksum）
+    MINERU_CALLBACK_URL = os.getenv("MINERU_CALLBACK_URL", "")
+    MINERU_CALLBACK_HOST = os.getenv("MINERU_CALLBACK_HOST", "0.0.0.0")
+    MINERU_CALLBACK_PORT = int(os.getenv("MINERU_CALLBACK_PORT", "8870"))
+    MINERU_UID = os.getenv("MINERU_UID", "")
+    
+    # MinerU本地Web API节点（多个节点以逗号分隔）与健康检查配置
+    MINERU_API_URLS = os.getenv("MINERU_API_URLS", "http://127.0.0.1:8000")
+    MINERU_HEALTH_PATH = os.getenv("MINERU_HEALTH_PATH", "/docs")
+    MINERU_HEALTH_INTERVAL = float(os.getenv("MINERU_HEALTH_INTERVAL", "30"))
+    
+    # 本地文本层解析配置（parse_mode为text_layer时使用）
+    TEXT_LAYER_MIN_CHARS = int(os.getenv("TEXT_LAYER_MIN_CHARS", "50"))
+    TEXT_LAYER_FALLBACK = os.getenv("TEXT_LAYER_FALLBACK", "local_api")  # local_api / official_api / none
+    
+    # MinerU HTTP连接池与重试配置
+    MINERU_POOL_SIZE = int(os.getenv("MINERU_POOL_SIZE", "10"))
+    MINERU_MAX_RETRIES = int(os.getenv("MINERU_MAX_RETRIES", "3"))
+    MINERU_BACKOFF_FACTOR = float(os.getenv("MINERU_BACKOFF_FACTOR", "0.5"))
+    
+    # MinerU分片解析配置（MINERU_SHARD_PAGES为0时不分片）
+    MINERU_SHARD_PAGES = int(os.getenv("MINERU_SHARD_PAGES", "0"))
+    MINERU_MAX_WORKERS = int(os.getenv("MINERU_MAX_WORKERS", "4"))
+    
+    # AI提取文档检索裁剪配置（文档估算token数超过预算时只发送相关章节，0表示不裁剪）
+    RETRIEVAL_TOKEN_BUDGET = int(os.getenv("RETRIEVAL_TOKEN_BUDGET", "60000"))
+    RETRIEVAL_MAX_SECTION_TOKENS = int(os.getenv("RETRIEVAL_MAX_SECTION_TOKENS", "4000"))
+    
+    # AI分块并行提取配置（文档估算token数超过EXTRACT_CHUNK_TOKENS时分块，0表示不分块）
+    EXTRACT_CHUNK_TOKENS = int(os.getenv("EXTRACT_CHUNK_TOKENS", "0"))
+    EXTRACT_CHUNK_OVERLAP_TOKENS = int(os.getenv("EXTRACT_CHUNK_OVERLAP_TOKENS", "1000"))
+    EXTRACT_MAX_WORKERS = int(os.getenv("EXTRACT_MAX_WORKERS", "4"))
+    # 点位数超过该值时按组并发提取（各组共享文档前缀缓存），0表示不分组
+    EXTRACT_SHARD_SIZE = int(os.getenv("EXTRACT_SHARD_SIZE", "30"))
+    
+    # 补充提取配置（对缺失或不可信的点位只检索相关章节重新提取，0表示不补充）
+    EXTRACT_FOLLOWUP_ROUNDS = int(os.getenv("EXTRACT_FOLLOWUP_ROUNDS", "1"))
+    EXTRACT_FOLLOWUP_TOKEN_BUDGET = int(os.getenv("EXTRACT_FOLLOWUP_TOKEN_BUDGET", "8000"))
     
     # Langfuse配置
     LANGFUSE_SECRET_KEY = os.getenv("LANGFUSE_SECRET_KEY", "")
@@ -30,6 +85,51 @@ class Config:
     DATA_DIR = PROJECT_ROOT / "data"
     OUTPUT_DIR = DATA_DIR / "output"
     SRC_DIR = DATA_DIR / "src"
+    CACHE_DIR = DATA_DIR / "cache"
+    
+    # Markdown缓存配置（按PDF内容哈希+解析参数索引，超出上限按LRU淘汰）
+    MARKDOWN_CACHE_DIR = CACHE_DIR / "markdown"
+    MARKDOWN_CACHE_MAX_MB = int(os.getenv("MARKDOWN_CACHE_MAX_MB", "1024"))
+    MARKDOWN_PAGE_CACHE = os.getenv("MARKDOWN_PAGE_CACHE", "false").lower() == "true"
+    
+    # 寄存器表预提取配置（规则解析候选行，模型只做点位到行ID的映射；候选行过少时回退为完整提取）
+    EXTRACT_TABLE_MODE = os.getenv("EXTRACT_TABLE_MODE", "false").lower() == "true"
+    EXTRACT_TABLE_MIN_ROWS = int(os.getenv("EXTRACT_TABLE_MIN_ROWS", "5"))
+    
+    # 精简输出模式（模型只输出地址、系数、单位等字段，数据类型/读写属性等按功能区在本地推导）
+    EXTRACT_COMPACT_OUTPUT = os.getenv("EXTRACT_COMPACT_OUTPUT", "false").lower() == "true"
+    
+    # 提示词前缀缓存标记（auto: OpenRouter/Anthropic接口时在静态前缀末尾发送cache_control）
+    LLM_CACHE_CONTROL = os.getenv("LLM_CACHE_CONTROL", "auto")
+    
+    # 模型调用限流配置（同一API地址共享配额，收到429时自动降低并发）
+    LLM_RPM = int(os.getenv("LLM_RPM", "60"))
+    LLM_TPM = int(os.getenv("LLM_TPM", "1000000"))
+    LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "5"))
+    
+    # 模型输出长度配置（max_tokens = 基础值 + 每个点位的token数 × 点位数，不超过上限；输出被截断时最多续写的次数）
+    LLM_OUTPUT_TOKENS_BASE = int(os.getenv("LLM_OUTPUT_TOKENS_BASE", "1000"))
+    LLM_OUTPUT_TOKENS_PER_POINT = int(os.getenv("LLM_OUTPUT_TOKENS_PER_POINT", "300"))
+    LLM_MAX_OUTPUT_TOKENS = int(os.getenv("LLM_MAX_OUTPUT_TOKENS", "16000"))
+    LLM_MAX_CONTINUATIONS = int(os.getenv("LLM_MAX_CONTINUATIONS", "3"))
+    
+    # 模型响应缓存配置（相同模型与提示词直接复用响应，按有效期与总大小淘汰）
+    LLM_CACHE_DIR = CACHE_DIR / "llm"
+    LLM_CACHE_MAX_MB = int(os.getenv("LLM_CACHE_MAX_MB", "256"))
+    LLM_CACHE_MAX_AGE_DAYS = float(os.getenv("LLM_CACHE_MAX_AGE_DAYS", "30"))
+    
+    # 点位结果存储配置（按文档、点位、描述、元数据与提示词版本存储结果，映射变化时只提取有变化的点位）
+    # 默认关闭；只保存可信的点位结果，未找到的点位每次都重新提取
+    POINT_STORE_ENABLED = os.getenv("POINT_STORE_ENABLED", "false").lower() == "true"
+    POINT_STORE_PATH = CACHE_DIR / "points.sqlite3"
+    PROMPT_VERSION = os.getenv("PROMPT_VERSION", "1")  # 修改提示词规则后递增，使已存储的点位结果失效
+    
+    # 近似重复文档检测配置（与已处理文档的相似度达到阈值时复用其点位结果，只核对有差异的章节；依赖点位结果存储）
+    # 复用的是另一份文档的结果，默认关闭，确认同系列说明书可以互相复用时再开启
+    NEAR_DUPLICATE_ENABLED = os.getenv("NEAR_DUPLICATE_ENABLED", "false").lower() == "true"
+    NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.8"))
+    DOCUMENT_INDEX_PATH = CACHE_DIR / "documents.sqlite3"
     
     # 配置文件路径
     DEV_MAPPING_FILE = PROJECT_ROOT / "config" / "dev_mapping.json"
@@ -134,6 +134,19 @@ class CSVExporter:
         logger.info(f"CSV文件导出成功: {output_path}")
         logger.info(f"导出数据行数: {len(df)}")
     
+    def open_writer(self, output_path: Path, encoding: str = 'utf-8-sig') -> "IncrementalCSVWriter":
+        """
+        打开增量写入器，流式提取时每得到一个点位就追加一行
+        
+        Args:
+            output_path: 输出CSV文件路径
+            encoding: 文件编码，默认为utf-8-sig（带BOM，Excel兼容）
+            
+        Returns:
+            增量写入器（可用作上下文管理器）
+        """
+        return IncrementalCSVWriter(self, output_path, encoding)
+    
     def _standardize_data(self, data_points: List[Dict]) -> List[Dict]:
         """
         标准化数据，确保所有必需的列都存在
@@ -311,3 +324,54 @@ def export_to_csv(
     exporter = CSVExporter(controller_name=controller_name)
     exporter.export(data_points, output_path)
 
+
+class IncrementalCSVWriter:
+    """CSV增量写入器：先写表头，之后逐个追加点位行，列顺序与CSVExporter.export一致"""
+    
+    def __init__(self, exporter: CSVExporter, output_path: Path, encoding: str = 'utf-8-sig'):
+        """
+        打开输出文件并写入表头
+        
+        Args:
+            exporter: 提供标准化规则的CSV导出器
+            output_path: 输出CSV文件路径
+            encoding: 文件编码
+        """
+        self.exporter = exporter
+        self.output_path = output_path
+        self.rows: List[Dict] = []
+        
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(output_path, 'w', newline='', encoding=encoding)
+        self._writer = csv.DictWriter(self._file, fieldnames=CSVExporter.STANDARD_COLUMNS, extrasaction='ignore')
+        self._writer.writeheader()
+        self._file.flush()
+    
+    def write(self, point: Dict) -> List[Dict]:
+        """
+        追加一个点位（不存在的点位会被跳过）
+        
+        Args:
+            point: AI提取的点位信息
+            
+        Returns:
+            本次写入的标准化行（点位不存在时为空列表）
+        """
+        records = self.exporter._standardize_data([point])
+        for record in records:
+            self._writer.writerow(record)
+        self._file.flush()
+        self.rows.extend(records)
+        return records
+    
+    def close(self) -> None:
+        """关闭文件"""
+        if not self._file.closed:
+            self._file.close()
+            logger.info(f"CSV文件增量写入完成: {self.output_path}，共 {len(self.rows)} 行")
+    
+    def __enter__(self) -> "IncrementalCSVWriter":
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
@@ -0,0 +1,196 @@
+"""磁盘缓存模块 - 以JSON索引记录条目的LRU磁盘缓存，供Markdown缓存与模型响应缓存共用"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional
+
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+@contextmanager
+def file_lock(lock_path: Path):
+    """跨进程的排他文件锁（POSIX用fcntl.flock，Windows用msvcrt.locking）"""
+    with open(lock_path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class DiskCache:
+    """
+    LRU磁盘缓存
+
+    每个条目保存为缓存目录下的一个文本文件，index.json记录文件名、大小、创建与最近访问时间。
+    索引的读-改-写在线程锁与文件锁内完成，CLI/批处理/Gradio多个进程可以共享同一个缓存目录。
+    条目超过有效期或总大小超过上限时淘汰。子类通过类属性指定文件后缀与日志名称。
+    """
+
+    INDEX_FILE = "index.json"
+    LOCK_FILE = "index.lock"
+
+    # 条目文件后缀（缓存目录下该后缀的文件都归缓存管理）
+    SUFFIX = ".txt"
+
+    # 日志中的缓存名称
+    NAME = "磁盘缓存"
+
+    def __init__(self, cache_dir: Path, max_size_bytes: int, max_age_seconds: float = 0):
+        """
+        初始化磁盘缓存
+
+        Args:
+            cache_dir: 缓存目录，条目文件与索引文件均保存在该目录下
+            max_size_bytes: 缓存总大小上限（字节），超出后按最近最少使用（LRU）淘汰
+            max_age_seconds: 条目有效期（秒），0表示不过期
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_size_bytes = max_size_bytes
+        self.max_age_seconds = max_age_seconds
+        self.index_path = self.cache_dir / self.INDEX_FILE
+        self.lock_path = self.cache_dir / self.LOCK_FILE
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        """索引的读-改-写在线程锁与文件锁内完成，多个进程同时写入时不会丢失条目"""
+        with self._lock, file_lock(self.lock_path):
+            yield
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        读取缓存，命中时刷新最近访问时间
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            缓存内容，未命中或已过期时返回None
+        """
+        with self._locked():
+            index = self._load_index()
+            entry = index.get(key)
+            path = self.cache_dir / entry["file"] if entry else None
+
+            if entry is not None and (self._is_expired(entry, time.time()) or not path.exists()):
+                # 已过期，或索引与文件不一致（例如被手动删除），视为未命中
+                path.unlink(missing_ok=True)
+                index.pop(key, None)
+                self._save_index(index)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            entry["last_access"] = time.time()
+            self._save_index(index)
+            self.hits += 1
+            return path.read_text(encoding='utf-8')
+
+    def put(self, key: str, content: str, meta: Optional[Dict] = None) -> None:
+        """
+        写入缓存并淘汰过期或超出容量的条目
+
+        Args:
+            key: 缓存键
+            content: 缓存内容
+            meta: 附加信息（如源文件名、模型名称），仅用于排查
+        """
+        with self._locked():
+            index = self._load_index()
+            file_name = f"{key}{self.SUFFIX}"
+            data = content.encode('utf-8')
+            (self.cache_dir / file_name).write_bytes(data)
+
+            now = time.time()
+            index[key] = {
+                "file": file_name,
+                "size": len(data),
+                "created": now,
+                "last_access": now,
+                "meta": meta or {},
+            }
+            self._evict(index)
+            self._save_index(index)
+
+    def stats(self) -> Dict:
+        """
+        缓存统计
+
+        Returns:
+            {hits, misses, hit_rate, entries, size_bytes}
+        """
+        with self._locked():
+            index = self._load_index()
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "entries": len(index),
+            "size_bytes": sum(entry.get("size", 0) for entry in index.values()),
+        }
+
+    def _is_expired(self, entry: Dict, now: float) -> bool:
+        return bool(self.max_age_seconds) and now - entry.get("created", 0) > self.max_age_seconds
+
+    def _evict(self, index: Dict[str, Dict]) -> None:
+        """删除索引中没有记录的条目文件，淘汰过期条目，再按最近访问时间从旧到新淘汰，直到总大小不超过上限"""
+        indexed = {entry["file"] for entry in index.values()}
+        for path in self.cache_dir.glob(f"*{self.SUFFIX}"):
+            if path.name not in indexed:
+                path.unlink(missing_ok=True)
+
+        now = time.time()
+        for key, entry in list(index.items()):
+            if self._is_expired(entry, now):
+                (self.cache_dir / entry["file"]).unlink(missing_ok=True)
+                index.pop(key)
+
+        total_size = sum(entry.get("size", 0) for entry in index.values())
+        for key, entry in sorted(index.items(), key=lambda item: item[1].get("last_access", 0)):
+            if total_size <= self.max_size_bytes:
+                break
+            (self.cache_dir / entry["file"]).unlink(missing_ok=True)
+            total_size -= entry.get("size", 0)
+            index.pop(key)
+            logger.info(f"{self.NAME}淘汰: {entry.get('meta', {}).get('pdf_name', key)}")
+
+    def _load_index(self) -> Dict[str, Dict]:
+        """每次操作都从磁盘读取索引，保证多个进程共享同一份缓存"""
+        if not self.index_path.exists():
+            return {}
+        try:
+            return json.loads(self.index_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            logger.warning(f"{self.NAME}索引损坏，将重建: {e}")
+            return {}
+
+    def _save_index(self, index: Dict[str, Dict]) -> None:
+        """先写临时文件再原子替换，避免并发进程读到半截索引"""
+        tmp_path = self.index_path.with_name(f"{self.INDEX_FILE}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(index, ensure_ascii=False, indent=2), encoding='utf-8')
+        os.replace(tmp_path, self.index_path)
@@ -0,0 +1,229 @@
+"""MinerU服务节点池模块 - 在多个本地Web API节点之间做负载均衡与健康检查"""
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Union
+
+import requests
+from loguru import logger
+
+
+class _Endpoint:
+    """单个服务节点的运行状态"""
+
+    def __init__(self, url: str):
+        self.url = url
+        self.outstanding = 0
+        self.total_requests = 0
+        self.total_failures = 0
+        self.consecutive_failures = 0
+        self.total_latency = 0.0
+        self.last_latency: Optional[float] = None
+        self.ejected_until = 0.0
+
+    def is_available(self, now: float) -> bool:
+        return now >= self.ejected_until
+
+
+class EndpointPool:
+    """
+    MinerU本地Web API节点池
+
+    - 按最少在途请求数（least-outstanding-requests）选择节点
+    - 连续失败达到阈值的节点会被临时摘除，冷却期后或健康检查通过后恢复
+    - 后台线程定期探测各节点健康状态
+    """
+
+    def __init__(
+        self,
+        urls: Union[str, List[str]],
+        session: Optional[requests.Session] = None,
+        health_path: str = "/docs",
+        health_interval: float = 30.0,
+        failure_threshold: int = 2,
+        eject_seconds: float = 60.0
+    ):
+        """
+        初始化节点池
+
+        Args:
+            urls: 节点地址列表，或以逗号分隔的地址字符串
+            session: 用于健康检查的HTTP会话
+            health_path: 健康检查路径
+            health_interval: 健康检查间隔（秒）
+            failure_threshold: 连续失败多少次后摘除节点
+            eject_seconds: 节点被摘除后的冷却时间（秒）
+        """
+        self.urls = self.parse_urls(urls)
+        if not self.urls:
+            raise ValueError("至少需要提供一个MinerU服务地址")
+
+        self.session = session or requests.Session()
+        self.health_path = health_path
+        self.health_interval = health_interval
+        self.failure_threshold = failure_threshold
+        self.eject_seconds = eject_seconds
+
+        self._endpoints = {url: _Endpoint(url) for url in self.urls}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._health_thread: Optional[threading.Thread] = None
+
+        # 只有一个节点时没有可切换的对象，不需要后台探测
+        if len(self.urls) > 1:
+            self.start_health_checks()
+
+    @staticmethod
+    def parse_urls(urls: Union[str, List[str]]) -> List[str]:
+        """将逗号分隔的字符串或列表规范化为去重后的地址列表"""
+        if isinstance(urls, str):
+            urls = urls.split(",")
+        result = []
+        for url in urls:
+            url = url.strip().rstrip("/")
+            if url and url not in result:
+                result.append(url)
+        return result
+
+    def acquire(self) -> str:
+        """
+        选择一个节点并登记在途请求
+
+        Returns:
+            节点地址
+        """
+        with self._lock:
+            now = time.time()
+            candidates = [ep for ep in self._endpoints.values() if ep.is_available(now)]
+            if not candidates:
+                # 所有节点都被摘除时，选择最早恢复的节点，避免请求直接失败
+                candidates = [min(self._endpoints.values(), key=lambda ep: ep.ejected_until)]
+            endpoint = min(candidates, key=lambda ep: (ep.outstanding, ep.total_requests))
+            endpoint.outstanding += 1
+            return endpoint.url
+
+    def release(self, url: str, success: bool, latency: float) -> None:
+        """
+        归还节点并记录请求结果
+
+        Args:
+            url: 节点地址
+            success: 请求是否成功
+            latency: 请求耗时（秒）
+        """
+        with self._lock:
+            endpoint = self._endpoints[url]
+            endpoint.outstanding = max(endpoint.outstanding - 1, 0)
+            endpoint.total_requests += 1
+            endpoint.total_latency += latency
+            endpoint.last_latency = latency
+
+            if success:
+                endpoint.consecutive_failures = 0
+                return
+
+            endpoint.total_failures += 1
+            endpoint.consecutive_failures += 1
+            if len(self._endpoints) > 1 and endpoint.consecutive_failures >= self.failure_threshold:
+                endpoint.ejected_until = time.time() + self.eject_seconds
+                logger.warning(f"MinerU节点连续失败 {endpoint.consecutive_failures} 次，暂时摘除 {self.eject_seconds} 秒: {url}")
+
+    @contextmanager
+    def lease(self) -> Iterator[str]:
+        """以上下文管理器方式使用节点，异常时记为失败"""
+        url = self.acquire()
+        start_time = time.time()
+        success = False
+        try:
+            yield url
+            success = True
+        finally:
+            self.release(url, success, time.time() - start_time)
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        获取各节点统计信息
+
+        Returns:
+            {节点地址: {outstanding, requests, failures, avg_latency, last_latency, healthy}}
+        """
+        with self._lock:
+            now = time.time()
+            return {
+                ep.url: {
+                    "outstanding": ep.outstanding,
+                    "requests": ep.total_requests,
+                    "failures": ep.total_failures,
+                    "avg_latency": ep.total_latency / ep.total_requests if ep.total_requests else None,
+                    "last_latency": ep.last_latency,
+                    "healthy": ep.is_available(now),
+                }
+                for ep in self._endpoints.values()
+            }
+
+    def start_health_checks(self) -> None:
+        """启动后台健康检查线程"""
+        if self._health_thread is not None and self._health_thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._health_thread = threading.Thread(target=self._health_loop, name="mineru-health-check", daemon=True)
+        self._health_thread.start()
+
+    def stop(self) -> None:
+        """停止后台健康检查线程"""
+        self._stop_event.set()
+        if self._health_thread is not None:
+            self._health_thread.join(timeout=5)
+            self._health_thread = None
+
+    def check_health(self) -> None:
+        """探测所有节点一次，恢复可用节点、摘除不可用节点"""
+        for url in self.urls:
+            try:
+                response = self.session.get(f"{url}{self.health_path}", timeout=5)
+                healthy = response.status_code < 500
+            except requests.exceptions.RequestException:
+                healthy = False
+
+            with self._lock:
+                endpoint = self._endpoints[url]
+                if healthy:
+                    if not endpoint.is_available(time.time()):
+                        logger.info(f"MinerU节点健康检查通过，恢复使用: {url}")
+                    endpoint.ejected_until = 0.0
+                    endpoint.consecutive_failures = 0
+                elif endpoint.is_available(time.time()):
+                    endpoint.ejected_until = time.time() + self.eject_seconds
+                    logger.warning(f"MinerU节点健康检查失败，暂时摘除 {self.eject_seconds} 秒: {url}")
+
+    def _health_loop(self) -> None:
+        while not self._stop_event.wait(self.health_interval):
+            self.check_health()
+
+
+_shared_pools: Dict[tuple, EndpointPool] = {}
+_shared_pools_lock = threading.Lock()
+
+
+def get_endpoint_pool(urls: Union[str, List[str]], **kwargs) -> EndpointPool:
+    """
+    获取进程内共享的节点池
+
+    相同节点列表的多个PDFParser（例如Gradio每次提取新建的流程）共用同一个节点池，
+    在途请求计数、延迟统计与健康检查线程都只有一份。
+
+    Args:
+        urls: 节点地址列表，或以逗号分隔的地址字符串
+        **kwargs: 首次创建节点池时传给EndpointPool的参数
+
+    Returns:
+        共享的EndpointPool实例
+    """
+    key = tuple(EndpointPool.parse_urls(urls))
+    with _shared_pools_lock:
+        pool = _shared_pools.get(key)
+        if pool is None:
+            pool = EndpointPool(list(key), **kwargs)
+            _shared_pools[key] = pool
+        return pool
@@ -0,0 +1,130 @@
+"""HTTP会话模块 - 为MinerU调用提供连接池复用与失败重试"""
+
+import random
+import time
+from typing import Callable, Dict
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+# 只对无请求体的幂等请求自动重试；POST（创建任务）与PUT（以文件流为请求体上传，重试时无法回放）
+# 由调用方判断能否重发：可以安全重发的请求（如本地MinerU的 /file_parse、预签名链接上传）用 send_with_retry
+IDEMPOTENT_METHODS = frozenset(["GET", "HEAD", "OPTIONS"])
+
+# 网关/服务暂时不可用时的状态码
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+
+def create_session(
+    pool_size: int = 10,
+    max_retries: int = 3,
+    backoff_factor: float = 0.5,
+    backoff_jitter: float = 0.5
+) -> requests.Session:
+    """
+    创建带连接池与重试策略的HTTP会话
+
+    同一个会话可在多个PDFParser、多个线程之间共享，轮询与下载请求会复用已建立的
+    TCP/TLS连接（keep-alive），避免每次请求都重新握手。
+
+    Args:
+        pool_size: 每个主机保持的最大连接数
+        max_retries: 幂等请求的最大重试次数
+        backoff_factor: 指数退避系数，第n次重试等待 backoff_factor * 2^(n-1) 秒
+        backoff_jitter: 每次退避额外叠加的随机抖动上限（秒）
+
+    Returns:
+        配置好的requests.Session
+    """
+    retry_kwargs = dict(
+        total=max_retries,
+        connect=max_retries,
+        read=max_retries,
+        status=max_retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=RETRY_STATUS_CODES,
+        allowed_methods=IDEMPOTENT_METHODS,
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    try:
+        retry = Retry(backoff_jitter=backoff_jitter, **retry_kwargs)
+    except TypeError:
+        # urllib3 < 2.0 不支持backoff_jitter
+        retry = Retry(**retry_kwargs)
+
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def send_with_retry(
+    send: Callable[[], requests.Response],
+    max_retries: int = 3,
+    backoff_factor: float = 0.5,
+    backoff_jitter: float = 0.5
+) -> requests.Response:
+    """
+    发送可以安全重发的请求，连接失败或返回 RETRY_STATUS_CODES 时指数退避重试（遵循Retry-After）
+
+    会话的自动重试不覆盖带请求体的POST/PUT，这类请求中幂等的接口由调用方通过本函数重试；
+    send每次调用都要重新构造请求体（如重新打开文件或seek(0)）。
+
+    Args:
+        send: 发送一次请求并返回响应的函数
+        max_retries: 最大重试次数
+        backoff_factor: 指数退避系数，第n次重试等待 backoff_factor * 2^(n-1) 秒
+        backoff_jitter: 每次退避额外叠加的随机抖动上限（秒）
+
+    Returns:
+        最后一次请求的响应（重试用尽时可能仍为错误状态码，由调用方raise_for_status）
+    """
+    for attempt in range(max_retries + 1):
+        try:
+            response = send()
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            if attempt == max_retries:
+                raise
+            delay = backoff_factor * (2 ** attempt)
+        else:
+            if response.status_code not in RETRY_STATUS_CODES or attempt == max_retries:
+                return response
+            retry_after = response.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else backoff_factor * (2 ** attempt)
+            response.close()
+        time.sleep(delay + random.uniform(0, backoff_jitter))
+
+
+def get_connection_stats(session: requests.Session) -> Dict[str, int]:
+    """
+    统计会话中各连接池的连接建立与复用情况
+
+    Args:
+        session: requests会话
+
+    Returns:
+        统计字典：requests（请求总数）、connections（新建连接数）、reused（复用连接的请求数）
+    """
+    stats = {"requests": 0, "connections": 0, "reused": 0}
+    seen_adapters = set()
+
+    for adapter in session.adapters.values():
+        if id(adapter) in seen_adapters or not isinstance(adapter, HTTPAdapter):
+            continue
+        seen_adapters.add(id(adapter))
+
+        pools = adapter.poolmanager.pools
+        for key in list(pools.keys()):
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats["requests"] += pool.num_requests
+            stats["connections"] += pool.num_connections
+
+    stats["reused"] = max(stats["requests"] - stats["connections"], 0)
+    return stats
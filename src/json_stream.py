@@ -0,0 +1,97 @@
+"""增量JSON解析模块 - 从流式输出的JSON数组中逐个取出已闭合的对象"""
+
+import json
+from typing import Dict, List
+
+import json_repair
+from loguru import logger
+
+
+class JsonArrayStreamParser:
+    """
+    流式JSON数组解析器
+
+    模型以流式方式输出 ``[ {...}, {...}, ... ]``（可包裹在 ```json 代码块中），
+    每次 feed 新收到的文本片段，返回这段文本中新闭合的顶层对象。
+    只跟踪字符串/转义状态与括号深度，不回溯已扫描的文本，整体为线性时间。
+    """
+
+    def __init__(self):
+        self._started = False
+        self._finished = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._object_chars: List[str] = []
+        self.count = 0
+        # 各解析层级成功的对象数：strict（json.loads）、repaired（json_repair）
+        self.tiers = {"strict": 0, "repaired": 0}
+
+    @property
+    def finished(self) -> bool:
+        """数组是否已结束（遇到顶层的 ']'）"""
+        return self._finished
+
+    def feed(self, text: str) -> List[Dict]:
+        """
+        输入新收到的文本片段
+
+        Args:
+            text: 流式响应的增量文本
+
+        Returns:
+            本次新解析出的点位对象列表
+        """
+        objects: List[Dict] = []
+        for char in text:
+            if self._finished:
+                break
+
+            if not self._started:
+                # 跳过数组开始前的文字与代码块标记
+                if char == "[":
+                    self._started = True
+                continue
+
+            if self._depth == 0:
+                if char == "{":
+                    self._depth = 1
+                    self._object_chars = [char]
+                elif char == "]":
+                    self._finished = True
+                continue
+
+            self._object_chars.append(char)
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "{[":
+                self._depth += 1
+            elif char in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    obj = self._decode("".join(self._object_chars))
+                    self._object_chars = []
+                    if obj is not None:
+                        objects.append(obj)
+
+        self.count += len(objects)
+        return objects
+
+    def _decode(self, text: str):
+        try:
+            obj = json.loads(text)
+            self.tiers["strict"] += 1
+        except ValueError:
+            obj = json_repair.loads(text)
+            self.tiers["repaired"] += 1
+        if not isinstance(obj, dict):
+            logger.warning(f"流式解析跳过非对象元素: {text[:200]}")
+            return None
+        return obj
@@ -0,0 +1,268 @@
+"""近似重复文档检测模块 - 用MinHash签名（正文与寄存器表）索引已处理的文档，找出近似重复文档及其有差异的章节"""
+
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from loguru import logger
+
+from src.point_store import content_hash
+from src.register_tables import extract_register_rows
+from src.section_index import Section, split_sections
+
+
+# MinHash参数：64个分桶（单次哈希的分桶MinHash），LSH分为16段、每段4个值（相似度0.8的文档几乎必然成为候选）
+_NUM_PERM = 64
+_BANDS = 16
+_ROWS = _NUM_PERM // _BANDS
+
+# 字符级shingle长度（去除空白后按字符切分，不依赖分词）
+_SHINGLE_CHARS = 5
+
+_HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+def _normalize(text: str) -> str:
+    """去除HTML标签与空白并转为小写（排版差异不影响签名）"""
+    return "".join(_HTML_TAG_PATTERN.sub(" ", text).lower().split())
+
+
+def _hash64(feature: str) -> int:
+    return int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'big')
+
+
+def minhash(features: Iterable[str]) -> List[int]:
+    """
+    计算特征集合的MinHash签名
+
+    每个特征只计算一次哈希，按哈希值分到64个桶中各取最小值；空桶沿用下一个非空桶的值
+    （长文档上比64个独立哈希函数快一个数量级，相似度同样按相等值的比例估计）
+
+    Args:
+        features: 特征（shingle或寄存器行）
+
+    Returns:
+        长度为64的签名，特征为空时为空列表
+    """
+    buckets: List[Optional[int]] = [None] * _NUM_PERM
+    for feature in set(features):
+        h = _hash64(feature)
+        bucket, value = h % _NUM_PERM, h // _NUM_PERM
+        if buckets[bucket] is None or value < buckets[bucket]:
+            buckets[bucket] = value
+    if all(value is None for value in buckets):
+        return []
+    for i in range(_NUM_PERM):
+        offset = 1
+        while buckets[i] is None:
+            # 空桶：向后找最近的非空桶，加上偏移量以区分来源
+            source = buckets[(i + offset) % _NUM_PERM]
+            if source is not None:
+                buckets[i] = source + offset
+            offset += 1
+    return buckets
+
+
+def estimate_jaccard(signature_a: List[int], signature_b: List[int]) -> float:
+    """
+    由两个MinHash签名估算Jaccard相似度
+
+    Args:
+        signature_a: 签名A
+        signature_b: 签名B
+
+    Returns:
+        0~1的相似度，任一签名为空时为0
+    """
+    if not signature_a or not signature_b:
+        return 0.0
+    return sum(a == b for a, b in zip(signature_a, signature_b)) / len(signature_a)
+
+
+def _section_hash(section: Section) -> str:
+    return content_hash(_normalize(section.text))
+
+
+@dataclass
+class DocumentSignature:
+    """一个文档的签名"""
+
+    doc_hash: str
+    text: List[int]
+    tables: List[int]
+    sections: List[str]
+
+    @classmethod
+    def from_markdown(cls, markdown_content: str, doc_hash: str) -> "DocumentSignature":
+        """
+        计算文档签名：正文的字符shingle MinHash、寄存器行（地址+描述）MinHash与各章节的内容哈希
+
+        Args:
+            markdown_content: Markdown内容
+            doc_hash: 文档哈希
+
+        Returns:
+            文档签名
+        """
+        normalized = _normalize(markdown_content)
+        shingles = (normalized[i:i + _SHINGLE_CHARS] for i in range(max(len(normalized) - _SHINGLE_CHARS + 1, 1)))
+        rows = (f"{row.modbus_address}|{_normalize(row.description)}" for row in extract_register_rows(markdown_content))
+        return cls(
+            doc_hash=doc_hash,
+            text=minhash(shingles),
+            tables=minhash(rows),
+            sections=[_section_hash(section) for section in split_sections(markdown_content)],
+        )
+
+    def similarity(self, other: "DocumentSignature") -> float:
+        """
+        与另一文档的相似度：正文相似度；两个文档都有寄存器表时取正文与寄存器表相似度的较小值
+
+        Args:
+            other: 另一文档的签名
+
+        Returns:
+            0~1的相似度
+        """
+        score = estimate_jaccard(self.text, other.text)
+        if self.tables and other.tables:
+            score = min(score, estimate_jaccard(self.tables, other.tables))
+        return score
+
+    def band_keys(self) -> List[str]:
+        """LSH分段键，任一分段相同的文档成为候选"""
+        if not self.text:
+            return []
+        return [
+            content_hash(self.text[band * _ROWS:(band + 1) * _ROWS])[:16]
+            for band in range(_BANDS)
+        ]
+
+
+def changed_sections(markdown_content: str, previous: DocumentSignature) -> Tuple[List[Section], List[Section]]:
+    """
+    按章节内容哈希对比文档与近似重复文档
+
+    Args:
+        markdown_content: 当前文档的Markdown内容
+        previous: 近似重复文档的签名
+
+    Returns:
+        (有差异的章节, 内容未变化的章节)
+    """
+    known = set(previous.sections)
+    changed, unchanged = [], []
+    for section in split_sections(markdown_content):
+        (unchanged if _section_hash(section) in known else changed).append(section)
+    return changed, unchanged
+
+
+class DocumentIndex:
+    """
+    已处理文档的签名索引（SQLite）
+
+    documents表保存每个文档的签名，bands表保存LSH分段键，查找时只比较分段键相同的候选文档。
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        初始化文档索引
+
+        Args:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS documents (doc_hash TEXT PRIMARY KEY, signature TEXT NOT NULL, created REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS bands (band_key TEXT NOT NULL, doc_hash TEXT NOT NULL, PRIMARY KEY (band_key, doc_hash))"
+        )
+        self._conn.commit()
+
+    def add(self, signature: DocumentSignature) -> None:
+        """
+        添加（或更新）文档签名
+
+        Args:
+            signature: 文档签名
+        """
+        payload = json.dumps({"text": signature.text, "tables": signature.tables, "sections": signature.sections})
+        band_keys = [(f"{band}:{key}", signature.doc_hash) for band, key in enumerate(signature.band_keys())]
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO documents VALUES (?, ?, ?)", (signature.doc_hash, payload, time.time())
+            )
+            self._conn.executemany("INSERT OR IGNORE INTO bands VALUES (?, ?)", band_keys)
+            self._conn.commit()
+
+    def find_similar(self, signature: DocumentSignature, threshold: float) -> List[Tuple[float, DocumentSignature]]:
+        """
+        查找近似重复文档
+
+        Args:
+            signature: 当前文档的签名
+            threshold: 相似度阈值
+
+        Returns:
+            [(相似度, 文档签名)]，按相似度从高到低排列，不包含当前文档本身
+        """
+        band_keys = [f"{band}:{key}" for band, key in enumerate(signature.band_keys())]
+        if not band_keys:
+            return []
+        placeholders = ", ".join("?" * len(band_keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT doc_hash, signature FROM documents WHERE doc_hash IN "
+                f"(SELECT DISTINCT doc_hash FROM bands WHERE band_key IN ({placeholders})) AND doc_hash != ?",
+                (*band_keys, signature.doc_hash)
+            ).fetchall()
+
+        matches = []
+        for doc_hash, payload in rows:
+            data = json.loads(payload)
+            candidate = DocumentSignature(doc_hash, data["text"], data["tables"], data["sections"])
+            score = signature.similarity(candidate)
+            if score >= threshold:
+                matches.append((score, candidate))
+        matches.sort(key=lambda item: item[0], reverse=True)
+        logger.debug(f"近似重复文档查找: {len(rows)} 个候选，{len(matches)} 个达到阈值 {threshold}")
+        return matches
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+_shared_indexes: Dict[str, DocumentIndex] = {}
+_shared_indexes_lock = threading.Lock()
+
+
+def get_document_index(db_path: Path) -> DocumentIndex:
+    """
+    获取进程内共享的文档索引（同一数据库文件只打开一个连接）
+
+    Args:
+        db_path: SQLite数据库文件路径
+
+    Returns:
+        共享的DocumentIndex实例
+    """
+    key = str(Path(db_path).resolve())
+    with _shared_indexes_lock:
+        index = _shared_indexes.get(key)
+        if index is None:
+            index = DocumentIndex(db_path)
+            _shared_indexes[key] = index
+        return index
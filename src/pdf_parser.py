@@ -3,24 +3,108 @@
 import requests
 import time
 import zipfile
-import io
+import hashlib
+import json
+import os
+import random
+import re
+import secrets
+import tempfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, List, Optional, Tuple, Union
 
 from loguru import logger
 
+from src.callback_server import CallbackReceiver, get_callback_receiver
+from src.config import config
+from src.disk_cache import DiskCache
+from src.endpoint_pool import EndpointPool, get_endpoint_pool
+from src.http_session import create_session, get_connection_stats, send_with_retry
+from src.text_layer import extract_text_layer_pages
+
+
+class MarkdownCache(DiskCache):
+    """基于内容哈希的Markdown缓存，同一份PDF（按字节内容）在相同解析参数下只解析一次"""
+    
+    SUFFIX = ".md"
+    NAME = "Markdown缓存"
+    
+    def __init__(self, cache_dir: Path, max_size_bytes: int = 1024 * 1024 * 1024):
+        """
+        初始化Markdown缓存
+        
+        Args:
+            cache_dir: 缓存目录，Markdown文件与索引文件均保存在该目录下
+            max_size_bytes: 缓存总大小上限（字节），超出后按最近最少使用（LRU）淘汰
+        """
+        super().__init__(cache_dir, max_size_bytes)
+    
+    @staticmethod
+    def hash_file(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+        """
+        计算文件内容的SHA-256
+        
+        Args:
+            file_path: 文件路径
+            chunk_size: 分块读取大小
+            
+        Returns:
+            十六进制摘要字符串
+        """
+        digest = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(chunk_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    @staticmethod
+    def make_key(content_hash: str, **options) -> str:
+        """
+        根据内容哈希与解析参数生成缓存键
+        
+        Args:
+            content_hash: PDF内容的SHA-256
+            **options: 影响解析结果的参数（lang、parse_method等）
+            
+        Returns:
+            缓存键
+        """
+        payload = json.dumps({"content": content_hash, **options}, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
 
 class PDFParser:
     """PDF解析器，使用MinerU将PDF转换为Markdown文本"""
     
+    # 支持的解析模式
+    PARSE_MODES = ("local_api", "official_api", "text_layer")
+    
+    # 官方API中表示任务尚未结束的状态
+    OFFICIAL_PENDING_STATES = ("pending", "running", "converting", "waiting-file")
+    
+    # 按页块缓存时，未设置分片页数的情况下每个页块的最大页数
+    PAGE_BLOCK_PAGES = 16
+    
     def __init__(
         self, 
         output_dir: Optional[Path] = None, 
         use_web_api: bool = True, 
-        api_url: str = "http://127.0.0.1:8000",
-        parse_mode: str = "local_api",  # "local_api", "official_api"
+        api_url: Union[str, List[str]] = "http://127.0.0.1:8000",
+        parse_mode: str = "local_api",  # "local_api", "official_api", "text_layer"
         official_api_token: Optional[str] = None,
-        file_server_url: Optional[str] = None
+        file_server_url: Optional[str] = None,
+        use_cache: bool = True,
+        cache: Optional[MarkdownCache] = None,
+        session: Optional[requests.Session] = None,
+        shard_pages: Optional[int] = None,
+        max_workers: Optional[int] = None,
+        shard_retries: int = 2,
+        official_api_base_url: Optional[str] = None,
+        callback_url: Optional[str] = None,
+        text_layer_fallback: Optional[str] = None,
+        page_cache: Optional[bool] = None
     ):
         """
         初始化PDF解析器
@@ -28,21 +112,75 @@ class PDFParser:
         Args:
             output_dir: 输出目录，默认为None时会自动生成
             use_web_api: 是否使用Web API方式解析，默认为True（兼容旧版本）
-            api_url: Web API服务地址，默认为http://127.0.0.1:8000
+            api_url: Web API服务地址，默认为http://127.0.0.1:8000；
+                多个节点可传列表或以逗号分隔，请求会按最少在途请求数分配到各节点
             parse_mode: 解析模式，可选值：
                 - "local_api": 本地Web API（默认）
                 - "official_api": MinerU官方API
+                - "text_layer": 本地提取PDF文本层（适用于电子版PDF），无文本层的页面回退到MinerU
             official_api_token: MinerU官方API的Token（仅在parse_mode为official_api时需要）
-            file_server_url: 文件服务器URL（仅在parse_mode为official_api时需要，用于让官方API访问文件）
+            file_server_url: 文件服务器URL（可选，仅在parse_mode为official_api时使用）；
+                未设置时直接将本地PDF上传到官方API，无需启动文件服务器
+            use_cache: 是否启用Markdown缓存，默认为True
+            cache: 自定义的Markdown缓存实例，默认使用配置中的缓存目录
+            session: 共享的HTTP会话（见 src.http_session.create_session），默认按配置新建带连接池和重试的会话
+            shard_pages: 分片解析时每个分片的页数，页数超过该值的PDF会按页码区间拆分并发解析；0表示不分片，默认从配置读取
+            max_workers: 分片并发解析的最大线程数，默认从配置读取
+            shard_retries: 失败分片的最大重试轮数，每轮只重试失败的分片
+            official_api_base_url: 官方API地址前缀，默认从配置读取（https://mineru.net/api/v4）
+            callback_url: MinerU可访问的回调地址，设置后启用回调模式（本地启动接收器），默认从配置读取
+            text_layer_fallback: text_layer模式下无文本层页面的回退解析方式（local_api/official_api/none），默认从配置读取
+            page_cache: 是否按页块缓存Markdown（修订版PDF只解析变化的页块），默认从配置读取
         """
         self.output_dir = output_dir
         self.use_web_api = use_web_api
-        self.api_url = api_url
+        self.api_url = ",".join(EndpointPool.parse_urls(api_url))
         
         # 解析模式相关
         self.parse_mode = parse_mode
         self.official_api_token = official_api_token
         self.file_server_url = file_server_url
+        self.official_api_base_url = (official_api_base_url or config.MINERU_OFFICIAL_API_BASE).rstrip("/")
+        
+        # 官方API任务等待：回调模式或自适应轮询
+        self.callback_url = callback_url if callback_url is not None else config.MINERU_CALLBACK_URL
+        self.min_poll_interval = config.MINERU_POLL_MIN_INTERVAL
+        self.max_poll_interval = config.MINERU_POLL_MAX_INTERVAL
+        
+        # Markdown缓存（按PDF内容哈希+解析参数索引）
+        if use_cache and cache is None:
+            cache = MarkdownCache(config.MARKDOWN_CACHE_DIR, config.MARKDOWN_CACHE_MAX_MB * 1024 * 1024)
+        self.cache = cache if use_cache else None
+        
+        # 按页块缓存：连续页面按内容切分为页块，每块作为一个页码区间解析并缓存，修订版只需解析变化的页块
+        self.page_cache = config.MARKDOWN_PAGE_CACHE if page_cache is None else page_cache
+        self.last_page_report: Optional[Dict[str, int]] = None
+        
+        # 所有MinerU请求复用同一个连接池会话，幂等请求在502/503等瞬时错误时自动退避重试
+        self.session = session or create_session(
+            pool_size=config.MINERU_POOL_SIZE,
+            max_retries=config.MINERU_MAX_RETRIES,
+            backoff_factor=config.MINERU_BACKOFF_FACTOR
+        )
+        
+        # 分片解析配置
+        self.shard_pages = config.MINERU_SHARD_PAGES if shard_pages is None else shard_pages
+        self.max_workers = max_workers or config.MINERU_MAX_WORKERS
+        self.shard_retries = shard_retries
+        
+        # 文本层模式下无可用文本的页面回退到MinerU
+        self.text_layer_fallback = text_layer_fallback or config.TEXT_LAYER_FALLBACK
+        
+        # 本地Web API节点池（进程内按节点列表共享，多节点时启用后台健康检查与故障摘除）
+        uses_local_api = parse_mode == "local_api" or (
+            parse_mode == "text_layer" and self.text_layer_fallback == "local_api"
+        )
+        self.endpoint_pool = get_endpoint_pool(
+            api_url,
+            session=self.session,
+            health_path=config.MINERU_HEALTH_PATH,
+            health_interval=config.MINERU_HEALTH_INTERVAL
+        ) if uses_local_api else None
     
     def parse(
         self,
@@ -51,6 +189,7 @@ class PDFParser:
         parse_method: str = "auto",
         formula_enable: bool = True,
         table_enable: bool = True,
+        force: bool = False,
     ) -> str:
         """
         解析PDF文件为Markdown文本
@@ -61,6 +200,7 @@ class PDFParser:
             parse_method: 解析方法，默认为'auto'
             formula_enable: 是否启用公式解析
             table_enable: 是否启用表格解析
+            force: 是否忽略缓存强制重新解析（解析结果仍会写入缓存）
             
         Returns:
             解析后的Markdown文本字符串
@@ -71,25 +211,489 @@ class PDFParser:
         logger.info(f"开始解析PDF文件: {pdf_path}")
         logger.info(f"解析模式: {self.parse_mode}")
         
-        # 根据解析模式选择方法
+        options = dict(
+            lang=lang,
+            parse_method=parse_method,
+            formula_enable=formula_enable,
+            table_enable=table_enable
+        )
+        
+        cache_key = self._cache_key(pdf_path, options)
+        if cache_key is not None and not force:
+            md_content = self.cache.get(cache_key)
+            if md_content is not None:
+                logger.info(f"✅ 命中Markdown缓存，跳过解析 (key: {cache_key[:12]})")
+                self._save_markdown(pdf_path, md_content)
+                return md_content
+        
+        md_content = self._parse_uncached(pdf_path=pdf_path, **options)
+        
+        self._log_connection_stats()
+        self._store_markdown(pdf_path, cache_key, md_content)
+        return md_content
+    
+    def parse_batch(
+        self,
+        pdf_paths: List[Path],
+        lang: str = "ch",
+        parse_method: str = "auto",
+        formula_enable: bool = True,
+        table_enable: bool = True,
+        force: bool = False,
+    ) -> Dict[Path, str]:
+        """
+        批量解析PDF文件
+        
+        官方API模式下所有未命中缓存的文件作为一个批量任务提交，并用一个查询循环等待整批结果；
+        本地Web API模式下在线程池中并发解析（受max_workers限制，请求分配到各节点）。
+        
+        Args:
+            pdf_paths: PDF文件路径列表
+            lang: 语言，默认为'ch'（中文）
+            parse_method: 解析方法，默认为'auto'
+            formula_enable: 是否启用公式解析
+            table_enable: 是否启用表格解析
+            force: 是否忽略缓存强制重新解析
+            
+        Returns:
+            {PDF路径: Markdown文本}，解析失败的文件不在结果中
+        """
+        options = dict(
+            lang=lang,
+            parse_method=parse_method,
+            formula_enable=formula_enable,
+            table_enable=table_enable
+        )
+        
+        results: Dict[Path, str] = {}
+        pending: Dict[Path, Optional[str]] = {}
+        for pdf_path in pdf_paths:
+            if not pdf_path.exists():
+                logger.error(f"PDF文件不存在: {pdf_path}")
+                continue
+            cache_key = self._cache_key(pdf_path, options)
+            md_content = self.cache.get(cache_key) if cache_key is not None and not force else None
+            if md_content is not None:
+                logger.info(f"✅ 命中Markdown缓存: {pdf_path.name}")
+                self._save_markdown(pdf_path, md_content)
+                results[pdf_path] = md_content
+            else:
+                pending[pdf_path] = cache_key
+        
+        if not pending:
+            return results
+        
+        logger.info(f"批量解析 {len(pending)} 个PDF文件（缓存命中 {len(results)} 个）")
         if self.parse_mode == "official_api":
-            return self._parse_via_official_api(
-                pdf_path=pdf_path,
-                lang=lang,
-                parse_method=parse_method,
-                formula_enable=formula_enable,
-                table_enable=table_enable
+            parsed = self._parse_batch_via_official_api(list(pending), **options)
+        else:
+            parsed = {}
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                futures = {
+                    executor.submit(self._parse_uncached, pdf_path=pdf_path, **options): pdf_path
+                    for pdf_path in pending
+                }
+                for future in as_completed(futures):
+                    pdf_path = futures[future]
+                    try:
+                        parsed[pdf_path] = future.result()
+                    except Exception as e:
+                        logger.error(f"解析文件 {pdf_path.name} 失败: {e}")
+        
+        self._log_connection_stats()
+        for pdf_path, md_content in parsed.items():
+            self._store_markdown(pdf_path, pending[pdf_path], md_content)
+            results[pdf_path] = md_content
+        
+        logger.info(f"批量解析完成！成功: {len(results)}/{len(pdf_paths)}")
+        return results
+    
+    def _cache_key(self, pdf_path: Path, options: Dict) -> Optional[str]:
+        """计算PDF的缓存键，未启用缓存时返回None"""
+        if self.cache is None:
+            return None
+        return MarkdownCache.make_key(
+            MarkdownCache.hash_file(pdf_path),
+            parse_mode=self.parse_mode,
+            text_layer_fallback=self.text_layer_fallback,
+            page_cache=self.page_cache,
+            **options
+        )
+    
+    def _store_markdown(self, pdf_path: Path, cache_key: Optional[str], md_content: str) -> None:
+        """将解析结果写入缓存并保存到输出目录"""
+        if cache_key is not None:
+            self.cache.put(cache_key, md_content, meta={"pdf_name": pdf_path.name, "parse_mode": self.parse_mode})
+        self._save_markdown(pdf_path, md_content)
+    
+    def _log_connection_stats(self) -> None:
+        """输出HTTP连接复用与各节点延迟统计"""
+        stats = self.connection_stats()
+        logger.info(f"HTTP连接统计: 请求 {stats['requests']} 次，新建连接 {stats['connections']} 个，复用 {stats['reused']} 次")
+        for url, ep_stats in self.endpoint_stats().items():
+            avg_latency = ep_stats['avg_latency']
+            logger.info(
+                f"MinerU节点 {url}: 请求 {ep_stats['requests']} 次，失败 {ep_stats['failures']} 次，"
+                f"平均耗时 {f'{avg_latency:.1f}s' if avg_latency is not None else '-'}"
             )
-        elif self.parse_mode == "local_api":
-            return self._parse_via_web_api(
-                pdf_path=pdf_path,
-                lang=lang,
-                parse_method=parse_method,
-                formula_enable=formula_enable,
-                table_enable=table_enable
+    
+    def connection_stats(self) -> Dict[str, int]:
+        """
+        获取HTTP会话的连接复用统计
+        
+        Returns:
+            统计字典：requests（请求总数）、connections（新建连接数）、reused（复用连接的请求数）
+        """
+        return get_connection_stats(self.session)
+    
+    def endpoint_stats(self) -> Dict[str, Dict]:
+        """
+        获取各本地Web API节点的请求数、失败数与延迟统计
+        
+        Returns:
+            {节点地址: 统计字典}，非local_api模式返回空字典
+        """
+        return self.endpoint_pool.stats() if self.endpoint_pool else {}
+    
+    def _parse_uncached(
+        self,
+        pdf_path: Path,
+        lang: str = "ch",
+        parse_method: str = "auto",
+        formula_enable: bool = True,
+        table_enable: bool = True,
+    ) -> str:
+        """根据解析模式调用对应的解析方法（不经过缓存），大文件按页码区间分片并发解析"""
+        if self.parse_mode not in self.PARSE_MODES:
+            raise ValueError(f"不支持的解析模式: {self.parse_mode}，仅支持 {', '.join(self.PARSE_MODES)}")
+        
+        options = dict(
+            lang=lang,
+            parse_method=parse_method,
+            formula_enable=formula_enable,
+            table_enable=table_enable
+        )
+        
+        if self.parse_mode == "text_layer":
+            return self._parse_via_text_layer(pdf_path, **options)
+        
+        if self.page_cache and self.cache is not None:
+            page_hashes = self._hash_pages(pdf_path)
+            if page_hashes:
+                return self._parse_incremental(pdf_path, page_hashes, **options)
+        
+        if self.shard_pages and self.shard_pages > 0:
+            page_count = self._count_pages(pdf_path)
+            if page_count > self.shard_pages:
+                return self._parse_sharded(pdf_path, page_count, **options)
+        
+        return self._parse_page_range(pdf_path, **options)
+    
+    def _parse_incremental(self, pdf_path: Path, page_hashes: List[str], **options) -> str:
+        """
+        按页块缓存的增量解析：内容未变的页块直接复用缓存，只把新增或修改的页块作为页码区间发送给MinerU
+        
+        Args:
+            pdf_path: PDF文件路径
+            page_hashes: 每页内容的哈希
+            **options: 解析参数（lang、parse_method等）
+            
+        Returns:
+            按页码顺序拼接的Markdown文本
+        """
+        blocks = self._page_blocks(page_hashes)
+        block_keys = [
+            MarkdownCache.make_key(
+                hashlib.sha256("".join(page_hashes[start:end + 1]).encode('utf-8')).hexdigest(),
+                scope="pages", parse_mode=self.parse_mode, **options
             )
-        else:
-            raise ValueError(f"不支持的解析模式: {self.parse_mode}，仅支持 'local_api' 和 'official_api'")
+            for start, end in blocks
+        ]
+        contents: Dict[int, str] = {}
+        for (start, _), key in zip(blocks, block_keys):
+            md_content = self.cache.get(key)
+            if md_content is not None:
+                contents[start] = md_content
+        
+        missing = [(start, end) for start, end in blocks if start not in contents]
+        parsed_pages = sum(end - start + 1 for start, end in missing)
+        self.last_page_report = {
+            "total_pages": len(page_hashes),
+            "reused_pages": len(page_hashes) - parsed_pages,
+            "parsed_pages": parsed_pages,
+            "parsed_ranges": len(missing),
+        }
+        logger.info(
+            f"按页块缓存: 共 {len(page_hashes)} 页（{len(blocks)} 个页块），复用 {len(page_hashes) - parsed_pages} 页，"
+            f"需要解析 {parsed_pages} 页（{len(missing)} 个页码区间）"
+        )
+        
+        if missing:
+            parsed = self._parse_ranges(pdf_path, missing, **options)
+            for (start, end), key in zip(blocks, block_keys):
+                if start in parsed:
+                    contents[start] = parsed[start]
+                    self.cache.put(key, parsed[start], meta={"pdf_name": pdf_path.name, "pages": f"{start + 1}-{end + 1}"})
+        
+        return "\n\n".join(contents[start] for start, _ in blocks if contents[start])
+    
+    def _page_blocks(self, page_hashes: List[str]) -> List[Tuple[int, int]]:
+        """
+        把页面切分为连续的页块（每块不超过 shard_pages 页，未设置分片时不超过 PAGE_BLOCK_PAGES 页）
+        
+        块边界由页面内容决定（页面哈希落在特定取值时在该页后断开），修改或插入一页只会改变所在页块，
+        其余页块的缓存键不变。
+        
+        Args:
+            page_hashes: 每页内容的哈希
+            
+        Returns:
+            页码区间列表 [(起始页, 结束页)]，从0开始且包含两端
+        """
+        max_pages = self.shard_pages if self.shard_pages and self.shard_pages > 0 else self.PAGE_BLOCK_PAGES
+        divisor = max(max_pages // 2, 1)
+        blocks: List[Tuple[int, int]] = []
+        start = 0
+        for i, page_hash in enumerate(page_hashes):
+            if i - start + 1 >= max_pages or int(page_hash[:8], 16) % divisor == 0 or i == len(page_hashes) - 1:
+                blocks.append((start, i))
+                start = i + 1
+        return blocks
+    
+    @staticmethod
+    def _hash_pages(pdf_path: Path) -> List[str]:
+        """
+        计算每页内容的哈希（页面尺寸 + 解码后的内容流 + 引用的图片/表单对象数据）
+        
+        Args:
+            pdf_path: PDF文件路径
+            
+        Returns:
+            每页的SHA-256列表，无法读取时返回空列表
+        """
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            logger.warning("未安装pypdf，无法按页缓存，将整体解析（pip install pypdf）")
+            return []
+        
+        def update_xobjects(digest, resources, depth: int = 0) -> None:
+            xobjects = (resources or {}).get("/XObject") or {}
+            for name in sorted(xobjects):
+                xobject = xobjects[name].get_object()
+                digest.update(str(name).encode('utf-8'))
+                digest.update(xobject.get_data())
+                if depth < 2 and xobject.get("/Subtype") == "/Form":
+                    update_xobjects(digest, xobject.get("/Resources"), depth + 1)
+        
+        try:
+            hashes = []
+            for page in PdfReader(str(pdf_path)).pages:
+                digest = hashlib.sha256()
+                digest.update(repr([float(v) for v in page.mediabox]).encode('utf-8'))
+                contents = page.get_contents()
+                if contents is not None:
+                    digest.update(contents.get_data())
+                update_xobjects(digest, page.get("/Resources"))
+                hashes.append(digest.hexdigest())
+            return hashes
+        except Exception as e:
+            logger.warning(f"计算页面哈希失败，将整体解析: {e}")
+            return []
+    
+    def _parse_via_text_layer(self, pdf_path: Path, **options) -> str:
+        """
+        本地提取PDF文本层生成Markdown，只有没有可用文本层的页面才交给MinerU解析
+        
+        Args:
+            pdf_path: PDF文件路径
+            **options: 解析参数（lang、parse_method等，仅用于回退到MinerU的页面）
+            
+        Returns:
+            按页码顺序拼接的Markdown文本
+        """
+        logger.info("使用本地文本层解析PDF")
+        start_time = time.time()
+        pages = extract_text_layer_pages(pdf_path, min_chars=config.TEXT_LAYER_MIN_CHARS)
+        
+        # 将连续的无文本页合并为页码区间
+        ranges: List[Tuple[int, int]] = []
+        for i, page in enumerate(pages):
+            if page is not None:
+                continue
+            if ranges and ranges[-1][1] == i - 1:
+                ranges[-1] = (ranges[-1][0], i)
+            else:
+                ranges.append((i, i))
+        
+        fallback: Dict[int, str] = {}
+        if ranges:
+            if self.text_layer_fallback not in ("local_api", "official_api"):
+                logger.warning(f"{sum(end - start + 1 for start, end in ranges)} 页没有可用文本层，未配置回退解析方式，已跳过")
+            else:
+                logger.info(f"{len(ranges)} 个页码区间没有可用文本层，回退到 {self.text_layer_fallback} 解析")
+                fallback = self._parse_ranges(pdf_path, ranges, mode=self.text_layer_fallback, **options)
+        
+        parts = []
+        for i, page in enumerate(pages):
+            if page is not None:
+                parts.append(page)
+            elif i in fallback:
+                parts.append(fallback[i])
+        
+        logger.info(f"文本层解析完成，耗时 {time.time() - start_time:.2f} 秒")
+        return "\n\n".join(part for part in parts if part)
+    
+    def _parse_page_range(
+        self,
+        pdf_path: Path,
+        start_page: Optional[int] = None,
+        end_page: Optional[int] = None,
+        mode: Optional[str] = None,
+        **options
+    ) -> str:
+        """
+        解析PDF的指定页码区间
+        
+        Args:
+            pdf_path: PDF文件路径
+            start_page: 起始页（从0开始，包含），None表示从第一页开始
+            end_page: 结束页（从0开始，包含），None表示到最后一页
+            mode: 使用的MinerU接口（local_api/official_api），默认为当前解析模式
+            **options: 解析参数（lang、parse_method等）
+            
+        Returns:
+            该区间的Markdown文本
+        """
+        if (mode or self.parse_mode) == "official_api":
+            page_ranges = None
+            if start_page is not None or end_page is not None:
+                # 官方API的page_ranges从1开始计数
+                page_ranges = f"{(start_page or 0) + 1}-{'' if end_page is None else end_page + 1}"
+            return self._parse_via_official_api(pdf_path=pdf_path, page_ranges=page_ranges, **options)
+        
+        return self._parse_via_web_api(pdf_path=pdf_path, start_page=start_page, end_page=end_page, **options)
+    
+    def _parse_sharded(self, pdf_path: Path, page_count: int, **options) -> str:
+        """
+        按页码区间拆分PDF并发解析，并按页码顺序拼接Markdown
+        
+        Args:
+            pdf_path: PDF文件路径
+            page_count: PDF总页数
+            **options: 解析参数（lang、parse_method等）
+            
+        Returns:
+            拼接后的Markdown文本
+        """
+        shards: List[Tuple[int, int]] = [
+            (start, min(start + self.shard_pages, page_count) - 1)
+            for start in range(0, page_count, self.shard_pages)
+        ]
+        logger.info(f"PDF共 {page_count} 页，拆分为 {len(shards)} 个分片并发解析（并发数: {self.max_workers}）")
+        
+        results = self._parse_ranges(pdf_path, shards, **options)
+        return "\n\n".join(results[start] for start, _ in shards)
+    
+    def _parse_ranges(
+        self,
+        pdf_path: Path,
+        ranges: List[Tuple[int, int]],
+        mode: Optional[str] = None,
+        **options
+    ) -> Dict[int, str]:
+        """
+        并发解析多个页码区间，每轮只重试失败的区间
+        
+        Args:
+            pdf_path: PDF文件路径
+            ranges: 页码区间列表 [(起始页, 结束页)]，从0开始且包含两端
+            mode: 使用的MinerU接口（local_api/official_api），默认为当前解析模式
+            **options: 解析参数（lang、parse_method等）
+            
+        Returns:
+            {区间起始页: Markdown文本}
+        """
+        results: Dict[int, str] = {}
+        pending = list(range(len(ranges)))
+        
+        for attempt in range(self.shard_retries + 1):
+            if attempt > 0:
+                logger.warning(f"第 {attempt} 轮重试失败分片: {[ranges[i] for i in pending]}")
+            
+            failed = []
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending))) as executor:
+                futures = {
+                    executor.submit(self._parse_page_range, pdf_path, ranges[i][0], ranges[i][1], mode, **options): i
+                    for i in pending
+                }
+                for future in as_completed(futures):
+                    i = futures[future]
+                    start, end = ranges[i]
+                    try:
+                        results[start] = future.result()
+                        logger.info(f"✓ 分片 {i + 1}/{len(ranges)}（第 {start + 1}-{end + 1} 页）解析完成")
+                    except Exception as e:
+                        logger.error(f"分片 {i + 1}/{len(ranges)}（第 {start + 1}-{end + 1} 页）解析失败: {e}")
+                        failed.append(i)
+            
+            pending = sorted(failed)
+            if not pending:
+                break
+        
+        if pending:
+            failed_ranges = ", ".join(f"{ranges[i][0] + 1}-{ranges[i][1] + 1}" for i in pending)
+            raise RuntimeError(f"分片解析失败，以下页码区间重试 {self.shard_retries} 次后仍未成功: {failed_ranges}")
+        
+        return results
+    
+    @staticmethod
+    def _count_pages(pdf_path: Path) -> int:
+        """
+        统计PDF页数，优先使用pypdf，未安装时退化为扫描页面对象
+        
+        Args:
+            pdf_path: PDF文件路径
+            
+        Returns:
+            页数，无法识别时返回0
+        """
+        try:
+            from pypdf import PdfReader
+        except ImportError:
+            logger.warning("未安装pypdf，使用正则估算PDF页数（pip install pypdf 可获得准确页数）")
+            return len(re.findall(rb"/Type\s*/Page(?!s)", pdf_path.read_bytes()))
+        
+        try:
+            return len(PdfReader(str(pdf_path)).pages)
+        except Exception as e:
+            logger.warning(f"读取PDF页数失败: {e}")
+            return 0
+    
+    def _resolve_output_dir(self, pdf_path: Path) -> Path:
+        """获取输出目录，未设置时使用PDF所在目录下的output"""
+        if self.output_dir is None:
+            self.output_dir = pdf_path.parent / "output"
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        return self.output_dir
+    
+    def _save_markdown(self, pdf_path: Path, md_content: str) -> Path:
+        """
+        将Markdown保存到输出目录（{output_dir}/{pdf_name}/auto/{pdf_name}.md）
+        
+        Args:
+            pdf_path: PDF文件路径
+            md_content: Markdown文本
+            
+        Returns:
+            Markdown文件路径
+        """
+        file_name = pdf_path.stem
+        md_file_path = self._resolve_output_dir(pdf_path) / file_name / "auto" / f"{file_name}.md"
+        md_file_path.parent.mkdir(parents=True, exist_ok=True)
+        md_file_path.write_text(md_content, encoding='utf-8')
+        logger.info(f"Markdown文件保存至: {md_file_path}")
+        return md_file_path
     
     def _parse_via_web_api(
         self,
@@ -98,6 +702,8 @@ class PDFParser:
         parse_method: str = "auto",
         formula_enable: bool = True,
         table_enable: bool = True,
+        start_page: Optional[int] = None,
+        end_page: Optional[int] = None,
     ) -> str:
         """
         通过Web API解析PDF文件为Markdown文本
@@ -108,21 +714,23 @@ class PDFParser:
             parse_method: 解析方法，默认为'auto'
             formula_enable: 是否启用公式解析
             table_enable: 是否启用表格解析
+            start_page: 起始页（从0开始，包含），None表示从第一页开始
+            end_page: 结束页（从0开始，包含），None表示到最后一页
             
         Returns:
             解析后的Markdown文本字符串
         """
-        logger.info(f"使用Web API方式解析PDF: {self.api_url}")
+        api_url = self.endpoint_pool.acquire()
+        request_start = time.time()
+        request_ok = False
+        logger.info(f"使用Web API方式解析PDF: {api_url}")
         
         try:
             # 设置输出目录
-            if self.output_dir is None:
-                self.output_dir = pdf_path.parent / "output"
-            
-            self.output_dir.mkdir(parents=True, exist_ok=True)
+            self._resolve_output_dir(pdf_path)
             
             # 准备请求参数
-            url = f"{self.api_url}/file_parse"
+            url = f"{api_url}/file_parse"
             
             # 打开并上传文件
             with open(pdf_path, 'rb') as f:
@@ -145,15 +753,26 @@ class PDFParser:
                     'return_images': False,
                     'response_format_zip': False
                 }
+                if start_page is not None:
+                    data['start_page_id'] = start_page
+                if end_page is not None:
+                    data['end_page_id'] = end_page
                 
                 logger.info(f"发送请求到: {url}")
                 logger.info(f"请求参数: {data}")
                 
-                # 发送POST请求
-                response = requests.post(url, files=files, data=data, timeout=300)
+                # 发送POST请求（/file_parse 不保存状态，网关错误或连接失败时重发）
+                def send() -> requests.Response:
+                    f.seek(0)
+                    return self.session.post(url, files=files, data=data, timeout=300)
+                
+                response = send_with_retry(
+                    send, max_retries=config.MINERU_MAX_RETRIES, backoff_factor=config.MINERU_BACKOFF_FACTOR
+                )
                 
                 # 检查响应状态
                 response.raise_for_status()
+                request_ok = True
                 
                 logger.info(f"Web API HTTP状态码: {response.status_code}")
                 logger.info(f"Web API响应头: {dict(response.headers)}")
@@ -267,24 +886,18 @@ class PDFParser:
                     raise ValueError(error_msg)
                 
                 logger.info(f"✅ 成功提取markdown内容，长度: {len(md_content)} 字符")
-                
-                # 保存markdown文件
-                file_name = pdf_path.stem
-                md_file_path = self.output_dir / file_name / "auto" / f"{file_name}.md"
-                md_file_path.parent.mkdir(parents=True, exist_ok=True)
-                md_file_path.write_text(md_content, encoding='utf-8')
-                
-                logger.info(f"PDF解析完成（Web API），Markdown文件保存至: {md_file_path}")
-                logger.info(f"Markdown文本长度: {len(md_content)} 字符")
+                logger.info(f"PDF解析完成（Web API），Markdown文本长度: {len(md_content)} 字符")
                 
                 return md_content
                 
         except requests.exceptions.RequestException as e:
             logger.error(f"Web API请求失败: {e}")
-            raise RuntimeError(f"Web API请求失败: {e}。请确认服务是否正常运行在 {self.api_url}")
+            raise RuntimeError(f"Web API请求失败: {e}。请确认服务是否正常运行在 {api_url}")
         except Exception as e:
             logger.error(f"Web API解析失败: {e}")
             raise
+        finally:
+            self.endpoint_pool.release(api_url, request_ok, time.time() - request_start)
     
     def _parse_via_official_api(
         self,
@@ -294,8 +907,8 @@ class PDFParser:
         formula_enable: bool = True,
         table_enable: bool = True,
         model_version: str = "vlm",
-        polling_interval: int = 5,
-        max_wait_time: int = 600
+        max_wait_time: int = 600,
+        page_ranges: Optional[str] = None
     ) -> str:
         """
         通过MinerU官方API解析PDF文件为Markdown文本
@@ -307,8 +920,8 @@ class PDFParser:
             formula_enable: 是否启用公式解析
             table_enable: 是否启用表格解析
             model_version: 模型版本，默认为'vlm'
-            polling_interval: 轮询间隔（秒），默认为5秒
             max_wait_time: 最大等待时间（秒），默认为600秒（10分钟）
+            page_ranges: 页码范围（从1开始，如"1-50"），None表示解析全部页
             
         Returns:
             解析后的Markdown文本字符串
@@ -319,137 +932,577 @@ class PDFParser:
             raise ValueError("使用官方API模式需要提供API Token，请在初始化时设置 official_api_token 参数")
         
         try:
-            # 步骤1: 准备文件URL
-            # 如果提供了file_server_url，则假设文件已经可通过该URL访问
-            # 否则需要用户提供可访问的URL
-            if self.file_server_url:
-                # 构造文件URL
-                file_url = f"{self.file_server_url}/{pdf_path.name}"
-                logger.info(f"使用文件URL: {file_url}")
-            else:
-                # 如果没有文件服务器URL，尝试从pdf_path中提取（假设是完整URL）
-                file_url = str(pdf_path)
-                logger.warning(f"未设置文件服务器URL，使用路径作为URL: {file_url}")
-            
-            # 步骤2: 创建解析任务
-            logger.info("正在创建解析任务...")
-            api_base_url = "https://mineru.net/api/v4/extract"
-            create_task_url = f"{api_base_url}/task"
+            # 未配置文件服务器时，直接把本地文件上传到官方API（无需公网可访问的文件服务器）
+            if not self.file_server_url:
+                return self._parse_via_official_upload(pdf_path, model_version, max_wait_time, page_ranges)
             
-            headers = {
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {self.official_api_token}"
-            }
+            # 步骤1: 准备文件URL（文件需已通过文件服务器对外提供）
+            file_url = f"{self.file_server_url}/{pdf_path.name}"
+            logger.info(f"使用文件URL: {file_url}")
             
+            # 步骤2: 创建解析任务
             task_data = {
                 "url": file_url,
                 "model_version": model_version
             }
+            if page_ranges:
+                task_data["page_ranges"] = page_ranges
             
-            logger.info(f"发送请求到: {create_task_url}")
-            logger.info(f"请求数据: {task_data}")
+            seed = self._add_callback(task_data)
             
-            response = requests.post(create_task_url, headers=headers, json=task_data, timeout=30)
-            response.raise_for_status()
+            task_id = self._create_official_task(task_data)
             
-            result = response.json()
-            logger.info(f"API响应: {result}")
+            # 步骤3: 等待任务完成（回调通知或自适应轮询）
+            expected_pages = self._count_page_ranges(page_ranges) or self._count_pages(pdf_path)
+            data = self._wait_official_task(task_id, expected_pages, max_wait_time, seed)
             
-            # 提取task_id
-            if "data" in result and "task_id" in result["data"]:
-                task_id = result["data"]["task_id"]
-                logger.info(f"✅ 任务创建成功，task_id: {task_id}")
-            else:
-                raise ValueError(f"无法从API响应中获取task_id: {result}")
+            full_zip_url = data.get("full_zip_url")
+            if not full_zip_url:
+                raise ValueError(f"任务完成但未获取到下载链接: {data}")
             
-            # 步骤3: 轮询任务状态
-            logger.info("正在等待解析完成...")
-            query_task_url = f"{api_base_url}/task/{task_id}"
+            logger.info(f"✅ 解析完成，下载地址: {full_zip_url}")
             
-            start_time = time.time()
+            # 步骤4: 下载并解压结果（流式写入临时文件，内存占用与压缩包大小无关）
+            logger.info("正在下载解析结果...")
+            zip_path = self._download_zip(full_zip_url)
+            try:
+                logger.info("正在解压文件...")
+                md_content = self._extract_markdown_from_zip(zip_path, pdf_path)
+            finally:
+                zip_path.unlink(missing_ok=True)
+            logger.info(f"PDF解析完成（官方API），Markdown文本长度: {len(md_content)} 字符")
+            
+            return md_content
+            
+        except requests.exceptions.RequestException as e:
+            logger.error(f"官方API请求失败: {e}")
+            raise RuntimeError(f"官方API请求失败: {e}")
+        except Exception as e:
+            logger.error(f"官方API解析失败: {e}")
+            raise
+    
+    def _official_headers(self) -> Dict[str, str]:
+        """官方API请求头"""
+        return {
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {self.official_api_token}"
+        }
+    
+    def _create_official_task(self, task_data: Dict) -> str:
+        """
+        创建官方API解析任务
+        
+        Args:
+            task_data: 任务参数
+            
+        Returns:
+            task_id
+        """
+        logger.info("正在创建解析任务...")
+        create_task_url = f"{self.official_api_base_url}/extract/task"
+        logger.info(f"发送请求到: {create_task_url}")
+        logger.info(f"请求数据: {task_data}")
+        
+        response = self.session.post(create_task_url, headers=self._official_headers(), json=task_data, timeout=30)
+        response.raise_for_status()
+        
+        result = response.json()
+        logger.info(f"API响应: {result}")
+        
+        # 提取task_id
+        if "data" in result and "task_id" in result["data"]:
+            task_id = result["data"]["task_id"]
+            logger.info(f"✅ 任务创建成功，task_id: {task_id}")
+            return task_id
+        raise ValueError(f"无法从API响应中获取task_id: {result}")
+    
+    def _wait_official_task(
+        self,
+        task_id: str,
+        expected_pages: int,
+        max_wait_time: int,
+        seed: Optional[str] = None
+    ) -> Dict:
+        """
+        等待官方API任务结束
+        
+        回调模式下阻塞等待通知，每隔 max_poll_interval 查询一次兜底；
+        轮询模式下根据任务进度与页数自适应调整查询间隔。
+        
+        Args:
+            task_id: 任务ID
+            expected_pages: 预计页数（用于估算轮询间隔）
+            max_wait_time: 最大等待时间（秒）
+            seed: 创建任务时使用的seed，非None表示启用了回调
+            
+        Returns:
+            状态为done的任务数据
+        """
+        logger.info("正在等待解析完成...")
+        query_task_url = f"{self.official_api_base_url}/extract/task/{task_id}"
+        receiver = self._get_callback_receiver() if seed is not None else None
+        if receiver is not None:
+            receiver.register(task_id, seed)
+        
+        start_time = time.time()
+        attempt = 0
+        try:
             while True:
                 # 检查是否超时
                 elapsed_time = time.time() - start_time
                 if elapsed_time > max_wait_time:
                     raise TimeoutError(f"解析超时（超过{max_wait_time}秒）")
                 
-                # 查询任务状态
-                response = requests.get(query_task_url, headers=headers, timeout=30)
-                response.raise_for_status()
-                
-                result = response.json()
-                
-                if "data" not in result:
-                    raise ValueError(f"API响应格式错误: {result}")
+                data = None
+                if receiver is not None:
+                    data = receiver.wait(task_id, timeout=min(self.max_poll_interval, max_wait_time - elapsed_time))
+                if data is None:
+                    data = self._query_official_task(query_task_url)
                 
-                data = result["data"]
                 state = data.get("state", "unknown")
-                
-                logger.info(f"任务状态: {state} (已等待 {int(elapsed_time)} 秒)")
+                logger.info(f"任务状态: {state} (已等待 {int(time.time() - start_time)} 秒)")
                 
                 if state == "done":
-                    # 任务完成
-                    full_zip_url = data.get("full_zip_url")
-                    if not full_zip_url:
-                        raise ValueError(f"任务完成但未获取到下载链接: {data}")
-                    
-                    logger.info(f"✅ 解析完成，下载地址: {full_zip_url}")
-                    
-                    # 步骤4: 下载并解压结果
-                    logger.info("正在下载解析结果...")
-                    zip_response = requests.get(full_zip_url, timeout=120)
-                    zip_response.raise_for_status()
-                    
-                    logger.info(f"下载完成，文件大小: {len(zip_response.content)} 字节")
-                    
-                    # 解压ZIP文件并提取Markdown内容
-                    logger.info("正在解压文件...")
-                    md_content = self._extract_markdown_from_zip(zip_response.content, pdf_path)
-                    
-                    # 保存markdown文件到本地
-                    if self.output_dir is None:
-                        self.output_dir = pdf_path.parent / "output"
-                    
-                    self.output_dir.mkdir(parents=True, exist_ok=True)
-                    
-                    file_name = pdf_path.stem
-                    md_file_path = self.output_dir / file_name / "auto" / f"{file_name}.md"
-                    md_file_path.parent.mkdir(parents=True, exist_ok=True)
-                    md_file_path.write_text(md_content, encoding='utf-8')
-                    
-                    logger.info(f"PDF解析完成（官方API），Markdown文件保存至: {md_file_path}")
-                    logger.info(f"Markdown文本长度: {len(md_content)} 字符")
-                    
-                    return md_content
-                    
-                elif state == "failed":
+                    return data
+                if state == "failed":
                     # 任务失败
                     err_msg = data.get("err_msg", "未知错误")
                     raise RuntimeError(f"解析任务失败: {err_msg}")
-                    
-                elif state in ["pending", "running"]:
-                    # 任务进行中，继续等待
-                    logger.info(f"任务{state}，{polling_interval}秒后重试...")
-                    time.sleep(polling_interval)
-                    
-                else:
-                    # 未知状态
+                if state not in self.OFFICIAL_PENDING_STATES:
                     logger.warning(f"未知任务状态: {state}")
-                    time.sleep(polling_interval)
+                
+                if receiver is not None:
+                    # 回调模式下 receiver.wait 已经起到等待作用
+                    continue
+                
+                interval = self._next_poll_interval(data, attempt, expected_pages)
+                interval = min(interval, max(max_wait_time - (time.time() - start_time), 0))
+                logger.info(f"任务{state}，{interval:.1f}秒后重试...")
+                time.sleep(interval)
+                attempt += 1
+        finally:
+            if receiver is not None:
+                receiver.discard(task_id)
+    
+    def _query_official_task(self, query_task_url: str) -> Dict:
+        """查询一次官方API任务状态，返回data字段"""
+        response = self.session.get(query_task_url, headers=self._official_headers(), timeout=30)
+        response.raise_for_status()
+        
+        result = response.json()
+        if "data" not in result:
+            raise ValueError(f"API响应格式错误: {result}")
+        return result["data"]
+    
+    def _next_poll_interval(self, data: Dict, attempt: int, expected_pages: int) -> float:
+        """
+        计算下一次轮询的等待时间
+        
+        - 排队中（pending等）：从最小间隔开始指数退避
+        - 解析中且有进度：按已解析页数估算剩余时间，取剩余时间的一半
+        - 解析中但无进度：按页数 × 每页预估耗时估算
+        结果限制在 [min_poll_interval, max_poll_interval] 内，并叠加±20%的随机抖动
+        
+        Args:
+            data: 任务查询结果
+            attempt: 已轮询次数
+            expected_pages: 预计页数
+            
+        Returns:
+            等待秒数
+        """
+        state = data.get("state")
+        progress = data.get("extract_progress") or {}
+        extracted_pages = int(progress.get("extracted_pages") or 0)
+        total_pages = int(progress.get("total_pages") or 0) or expected_pages
+        
+        interval = self.min_poll_interval * (2 ** attempt)
+        if state == "running":
+            running_seconds = None
+            started_at = progress.get("start_time")
+            if started_at:
+                try:
+                    running_seconds = time.time() - datetime.strptime(started_at, "%Y-%m-%d %H:%M:%S").timestamp()
+                except ValueError:
+                    running_seconds = None
+            
+            if extracted_pages > 0 and running_seconds and running_seconds > 0 and total_pages > extracted_pages:
+                seconds_per_page = running_seconds / extracted_pages
+                interval = (total_pages - extracted_pages) * seconds_per_page / 2
+            elif total_pages:
+                interval = total_pages * config.MINERU_SECONDS_PER_PAGE / 4
+        
+        interval = min(max(interval, self.min_poll_interval), self.max_poll_interval)
+        return interval * random.uniform(0.8, 1.2)
+    
+    @staticmethod
+    def _count_page_ranges(page_ranges: Optional[str]) -> int:
+        """统计page_ranges（如"1-50,60"）包含的页数，无法确定时返回0"""
+        if not page_ranges:
+            return 0
+        total = 0
+        for part in page_ranges.split(","):
+            start, _, end = part.strip().partition("-")
+            if not start.isdigit() or (end and not end.isdigit()):
+                return 0
+            total += (int(end) - int(start) + 1) if end else 1
+        return total
+    
+    def _add_callback(self, request_data: Dict) -> Optional[str]:
+        """
+        回调模式下在任务/批量请求中加入callback与seed
+        
+        Args:
+            request_data: 创建任务或申请上传链接的请求体（原地修改）
+            
+        Returns:
+            seed，未启用回调时返回None
+        """
+        receiver = self._get_callback_receiver()
+        if receiver is None:
+            return None
+        seed = secrets.token_hex(16)
+        request_data["callback"] = receiver.public_url
+        request_data["seed"] = seed
+        return seed
+    
+    def _get_callback_receiver(self) -> Optional[CallbackReceiver]:
+        """回调模式下获取（首次使用时启动）本地回调接收器；未配置MINERU_UID时无法校验回调，改用轮询"""
+        if not self.callback_url:
+            return None
+        if not config.MINERU_UID:
+            logger.warning("已设置MINERU_CALLBACK_URL但未设置MINERU_UID，无法校验回调checksum，改用轮询")
+            return None
+        return get_callback_receiver(
+            host=config.MINERU_CALLBACK_HOST,
+            port=config.MINERU_CALLBACK_PORT,
+            public_url=self.callback_url,
+            uid=config.MINERU_UID
+        )
+    
+    def _parse_batch_via_official_api(
+        self,
+        pdf_paths: List[Path],
+        lang: str = "ch",
+        parse_method: str = "auto",
+        formula_enable: bool = True,
+        table_enable: bool = True,
+        model_version: str = "vlm",
+        max_wait_time: int = 1800
+    ) -> Dict[Path, str]:
+        """
+        通过MinerU官方API批量任务解析多个PDF
+        
+        一次提交整批文件，单个查询循环轮询整批状态，每个文件完成后立即下载其结果，
+        总耗时约等于最慢的那个文件。
+        
+        Args:
+            pdf_paths: PDF文件路径列表
+            lang: 语言，默认为'ch'（中文）
+            parse_method: 解析方法，默认为'auto'
+            formula_enable: 是否启用公式解析
+            table_enable: 是否启用表格解析
+            model_version: 模型版本，默认为'vlm'
+            max_wait_time: 整批最大等待时间（秒），默认为1800秒
+            
+        Returns:
+            {PDF路径: Markdown文本}，失败的文件不在结果中
+        """
+        if not self.official_api_token:
+            raise ValueError("使用官方API模式需要提供API Token，请在初始化时设置 official_api_token 参数")
+        
+        # data_id 用于把批量结果对应回本地文件
+        files_by_id = {str(i): pdf_path for i, pdf_path in enumerate(pdf_paths)}
+        
+        try:
+            expected_pages = sum(self._count_pages(pdf_path) for pdf_path in pdf_paths)
+            
+            # 未配置文件服务器时，直接上传本地文件
+            if not self.file_server_url:
+                batch_id, seed = self._upload_official_batch(files_by_id, model_version)
+                return self._wait_official_batch(batch_id, files_by_id, expected_pages, max_wait_time, seed=seed)
+            
+            batch_files = [
+                {"url": f"{self.file_server_url}/{pdf_path.name}", "data_id": data_id}
+                for data_id, pdf_path in files_by_id.items()
+            ]
+            batch_data = {"files": batch_files, "model_version": model_version}
+            seed = self._add_callback(batch_data)
+            
+            logger.info(f"正在创建批量解析任务，共 {len(batch_files)} 个文件...")
+            response = self.session.post(
+                f"{self.official_api_base_url}/extract/task/batch",
+                headers=self._official_headers(),
+                json=batch_data,
+                timeout=30
+            )
+            response.raise_for_status()
+            result = response.json()
+            batch_id = (result.get("data") or {}).get("batch_id")
+            if not batch_id:
+                raise ValueError(f"无法从API响应中获取batch_id: {result}")
+            logger.info(f"✅ 批量任务创建成功，batch_id: {batch_id}")
+            
+            return self._wait_official_batch(batch_id, files_by_id, expected_pages, max_wait_time, seed=seed)
             
         except requests.exceptions.RequestException as e:
-            logger.error(f"官方API请求失败: {e}")
-            raise RuntimeError(f"官方API请求失败: {e}")
-        except Exception as e:
-            logger.error(f"官方API解析失败: {e}")
+            logger.error(f"官方API批量请求失败: {e}")
+            raise RuntimeError(f"官方API批量请求失败: {e}")
+    
+    def _parse_via_official_upload(
+        self,
+        pdf_path: Path,
+        model_version: str,
+        max_wait_time: int,
+        page_ranges: Optional[str] = None
+    ) -> str:
+        """
+        通过官方API的文件上传流程解析单个PDF：申请上传链接 -> 从磁盘流式上传 -> 等待解析结果
+        
+        Args:
+            pdf_path: PDF文件路径
+            model_version: 模型版本
+            max_wait_time: 最大等待时间（秒）
+            page_ranges: 页码范围（从1开始，如"1-50"），None表示解析全部页
+            
+        Returns:
+            解析后的Markdown文本字符串
+        """
+        files_by_id = {"0": pdf_path}
+        batch_id, seed = self._upload_official_batch(files_by_id, model_version, page_ranges)
+        
+        expected_pages = self._count_page_ranges(page_ranges) or self._count_pages(pdf_path)
+        errors: Dict[Path, str] = {}
+        results = self._wait_official_batch(batch_id, files_by_id, expected_pages, max_wait_time, errors, seed)
+        if pdf_path not in results:
+            raise RuntimeError(f"解析任务失败: {errors.get(pdf_path, '未知错误')}")
+        
+        md_content = results[pdf_path]
+        logger.info(f"PDF解析完成（官方API上传），Markdown文本长度: {len(md_content)} 字符")
+        return md_content
+    
+    def _upload_official_batch(
+        self,
+        files_by_id: Dict[str, Path],
+        model_version: str,
+        page_ranges: Optional[str] = None
+    ) -> Tuple[str, Optional[str]]:
+        """
+        申请上传链接并上传本地文件，上传完成后官方API会自动创建解析任务
+        
+        Args:
+            files_by_id: {data_id: PDF路径}
+            model_version: 模型版本
+            page_ranges: 页码范围（对所有文件生效），None表示解析全部页
+            
+        Returns:
+            (batch_id（用于查询解析结果）, 回调seed（未启用回调时为None）)
+        """
+        files = []
+        for data_id, pdf_path in files_by_id.items():
+            file_entry = {"name": pdf_path.name, "data_id": data_id}
+            if page_ranges:
+                file_entry["page_ranges"] = page_ranges
+            files.append(file_entry)
+        
+        request_data = {"files": files, "model_version": model_version}
+        seed = self._add_callback(request_data)
+        
+        logger.info(f"正在申请上传链接，共 {len(files)} 个文件...")
+        response = self.session.post(
+            f"{self.official_api_base_url}/file-urls/batch",
+            headers=self._official_headers(),
+            json=request_data,
+            timeout=30
+        )
+        response.raise_for_status()
+        result = response.json()
+        
+        data = result.get("data") or {}
+        batch_id = data.get("batch_id")
+        file_urls = data.get("file_urls") or []
+        if not batch_id or len(file_urls) != len(files):
+            raise ValueError(f"无法从API响应中获取上传链接: {result}")
+        
+        # 上传链接与请求中的文件顺序一一对应；直接以文件对象作为请求体，从磁盘流式上传
+        for pdf_path, upload_url in zip(files_by_id.values(), file_urls):
+            self._upload_file(upload_url, pdf_path)
+        
+        logger.info(f"✅ 文件上传完成，batch_id: {batch_id}")
+        return batch_id, seed
+    
+    def _upload_file(self, upload_url: str, pdf_path: Path) -> None:
+        """
+        将文件PUT到上传链接，失败时重新打开文件退避重试
+        
+        Args:
+            upload_url: 预签名上传链接
+            pdf_path: PDF文件路径
+        """
+        def send() -> requests.Response:
+            logger.info(f"正在上传: {pdf_path.name}")
+            with open(pdf_path, 'rb') as f:
+                return self.session.put(upload_url, data=f, timeout=300)
+        
+        upload_response = send_with_retry(
+            send, max_retries=config.MINERU_MAX_RETRIES, backoff_factor=config.MINERU_BACKOFF_FACTOR
+        )
+        upload_response.raise_for_status()
+    
+    def _wait_official_batch(
+        self,
+        batch_id: str,
+        files_by_id: Dict[str, Path],
+        expected_pages: int,
+        max_wait_time: int,
+        errors: Optional[Dict[Path, str]] = None,
+        seed: Optional[str] = None
+    ) -> Dict[Path, str]:
+        """
+        等待批量任务，文件完成后立即下载并提取Markdown
+        
+        回调模式下阻塞等待整批结束的通知，每隔 max_poll_interval 查询一次兜底（与 _wait_official_task 相同）；
+        轮询模式下按未完成文件的合计进度自适应调整查询间隔。
+        
+        Args:
+            batch_id: 批量任务ID
+            files_by_id: {data_id: PDF路径}
+            expected_pages: 整批预计页数（用于估算轮询间隔）
+            max_wait_time: 最大等待时间（秒）
+            errors: 传入字典时记录失败文件的错误信息 {PDF路径: 错误信息}
+            seed: 创建批量任务时使用的seed，非None表示启用了回调
+            
+        Returns:
+            {PDF路径: Markdown文本}
+        """
+        query_url = f"{self.official_api_base_url}/extract-results/batch/{batch_id}"
+        results: Dict[Path, str] = {}
+        errors = errors if errors is not None else {}
+        finished = set()
+        receiver = self._get_callback_receiver() if seed is not None else None
+        if receiver is not None:
+            receiver.register(batch_id, seed)
+        
+        try:
+            start_time = time.time()
+            attempt = 0
+            while len(finished) < len(files_by_id):
+                elapsed_time = time.time() - start_time
+                if elapsed_time > max_wait_time:
+                    unfinished = [files_by_id[i] for i in files_by_id if i not in finished]
+                    logger.error(f"批量解析超时（超过{max_wait_time}秒），未完成文件: {[p.name for p in unfinished]}")
+                    for pdf_path in unfinished:
+                        errors[pdf_path] = f"解析超时（超过{max_wait_time}秒）"
+                    break
+                
+                data = None
+                if receiver is not None:
+                    data = receiver.wait(batch_id, timeout=min(self.max_poll_interval, max_wait_time - elapsed_time))
+                if data is None:
+                    data = self._query_official_task(query_url)
+                extract_results = data.get("extract_result") or []
+                for item in extract_results:
+                    data_id = str(item.get("data_id", ""))
+                    pdf_path = files_by_id.get(data_id)
+                    if pdf_path is None or data_id in finished:
+                        continue
+                    
+                    state = item.get("state")
+                    if state == "done":
+                        finished.add(data_id)
+                        try:
+                            zip_path = self._download_zip(item["full_zip_url"])
+                            try:
+                                results[pdf_path] = self._extract_markdown_from_zip(zip_path, pdf_path)
+                            finally:
+                                zip_path.unlink(missing_ok=True)
+                            logger.info(f"✓ {pdf_path.name} 解析完成")
+                        except Exception as e:
+                            logger.error(f"下载 {pdf_path.name} 的解析结果失败: {e}")
+                            errors[pdf_path] = f"下载解析结果失败: {e}"
+                    elif state == "failed":
+                        finished.add(data_id)
+                        errors[pdf_path] = item.get('err_msg', '未知错误')
+                        logger.error(f"{pdf_path.name} 解析失败: {errors[pdf_path]}")
+                
+                logger.info(f"批量任务进度: {len(finished)}/{len(files_by_id)} (已等待 {int(elapsed_time)} 秒)")
+                if len(finished) >= len(files_by_id):
+                    break
+                if receiver is not None:
+                    # 回调模式下 receiver.wait 已经起到等待作用
+                    continue
+                
+                # 以未完成文件的合计进度估算轮询间隔
+                unfinished_items = [
+                    item for item in extract_results
+                    if str(item.get("data_id", "")) in files_by_id and str(item.get("data_id", "")) not in finished
+                ]
+                interval = self._next_poll_interval(self._aggregate_progress(unfinished_items), attempt, expected_pages)
+                time.sleep(min(interval, max(max_wait_time - (time.time() - start_time), 0)))
+                attempt += 1
+        finally:
+            if receiver is not None:
+                receiver.discard(batch_id)
+        
+        return results
+    
+    @staticmethod
+    def _aggregate_progress(items: List[Dict]) -> Dict:
+        """将多个文件的任务状态合并为一个，用于估算批量任务的轮询间隔"""
+        running = [item for item in items if item.get("state") == "running"]
+        if not running:
+            return {"state": "pending"}
+        
+        extracted_pages = 0
+        total_pages = 0
+        start_times = []
+        for item in running:
+            progress = item.get("extract_progress") or {}
+            extracted_pages += int(progress.get("extracted_pages") or 0)
+            total_pages += int(progress.get("total_pages") or 0)
+            if progress.get("start_time"):
+                start_times.append(progress["start_time"])
+        
+        return {
+            "state": "running",
+            "extract_progress": {
+                "extracted_pages": extracted_pages,
+                "total_pages": total_pages,
+                "start_time": min(start_times) if start_times else None,
+            }
+        }
+    
+    def _download_zip(self, zip_url: str, chunk_size: int = 1024 * 1024) -> Path:
+        """
+        将结果压缩包分块流式下载到临时文件
+        
+        Args:
+            zip_url: 压缩包下载地址
+            chunk_size: 每次写入的块大小
+            
+        Returns:
+            临时ZIP文件路径（调用方负责删除）
+        """
+        fd, tmp_name = tempfile.mkstemp(prefix="mineru_", suffix=".zip")
+        zip_path = Path(tmp_name)
+        try:
+            with os.fdopen(fd, 'wb') as f, self.session.get(zip_url, stream=True, timeout=120) as response:
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+        except BaseException:
+            zip_path.unlink(missing_ok=True)
             raise
+        
+        logger.info(f"下载完成，文件大小: {zip_path.stat().st_size} 字节")
+        return zip_path
     
-    def _extract_markdown_from_zip(self, zip_content: bytes, pdf_path: Path) -> str:
+    def _extract_markdown_from_zip(self, zip_path: Path, pdf_path: Path) -> str:
         """
-        从ZIP文件中提取Markdown内容
+        从ZIP文件中提取Markdown内容，只解压.md成员
         
         Args:
-            zip_content: ZIP文件的字节内容
+            zip_path: 磁盘上的ZIP文件路径
             pdf_path: 原始PDF文件路径（用于确定文件名）
             
         Returns:
@@ -458,7 +1511,7 @@ class PDFParser:
         logger.info("正在从ZIP文件中提取Markdown内容...")
         
         try:
-            with zipfile.ZipFile(io.BytesIO(zip_content)) as zip_file:
+            with zipfile.ZipFile(zip_path) as zip_file:
                 # 列出ZIP中的所有文件
                 file_list = zip_file.namelist()
                 logger.info(f"ZIP文件包含 {len(file_list)} 个文件")
@@ -1,7 +1,8 @@
 """主流程模块 - 协调整个处理流程"""
 
+import asyncio
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterator, List, Optional, Union
 from datetime import datetime
 
 from loguru import logger
@@ -23,10 +24,11 @@ class ModbusPipeline:
         dev_mapping: Optional[Dict[str, str]] = None,
         point_metadata: Optional[Dict[str, str]] = None,
         use_web_api: bool = True,
-        api_url: str = "http://127.0.0.1:8000",
+        api_url: Union[str, List[str]] = "http://127.0.0.1:8000",
         parse_mode: str = "local_api",
         official_api_token: Optional[str] = None,
-        file_server_url: Optional[str] = None
+        file_server_url: Optional[str] = None,
+        use_llm_cache: bool = True
     ):
         """
         初始化流程
@@ -38,12 +40,14 @@ class ModbusPipeline:
             dev_mapping: 设备映射配置，默认从文件读取
             point_metadata: 点位元数据配置，默认从文件读取
             use_web_api: 是否使用Web API方式解析PDF，默认为True（兼容旧版本）
-            api_url: Web API服务地址，默认为http://127.0.0.1:8000
+            api_url: Web API服务地址，默认为http://127.0.0.1:8000；多个节点可传列表或以逗号分隔
             parse_mode: 解析模式，可选值：
                 - "local_api": 本地Web API（默认）
                 - "official_api": MinerU官方API
+                - "text_layer": 本地提取PDF文本层（电子版PDF），无文本层的页面回退到MinerU
             official_api_token: MinerU官方API的Token（仅在parse_mode为official_api时需要）
             file_server_url: 文件服务器URL（仅在parse_mode为official_api时需要）
+            use_llm_cache: 是否使用模型响应缓存，False时总是重新调用模型
         """
         self.output_dir = output_dir or config.OUTPUT_DIR
         self.controller_name = controller_name
@@ -61,7 +65,11 @@ class ModbusPipeline:
             official_api_token=official_api_token,
             file_server_url=file_server_url
         )
-        self.ai_extractor = AIExtractor(dev_mapping=dev_mapping, point_metadata=point_metadata)
+        self.ai_extractor = AIExtractor(
+            dev_mapping=dev_mapping,
+            point_metadata=point_metadata,
+            use_cache=use_llm_cache
+        )
         self.csv_exporter = CSVExporter(
             controller_name=controller_name,
             address_offset=address_offset,
@@ -71,7 +79,8 @@ class ModbusPipeline:
         # 根据parse_mode显示不同的日志
         mode_names = {
             "local_api": "本地Web API",
-            "official_api": "MinerU官方API"
+            "official_api": "MinerU官方API",
+            "text_layer": "本地文本层快速解析"
         }
         mode_name = mode_names.get(parse_mode, parse_mode)
         logger.info(f"ModbusPipeline 初始化完成 (解析方式: {mode_name})")
@@ -81,7 +90,9 @@ class ModbusPipeline:
         pdf_path: Path,
         output_csv_path: Optional[Path] = None,
         save_markdown: bool = True,
-        parse_pdf: bool = False
+        parse_pdf: bool = False,
+        markdown_content: Optional[str] = None,
+        stream: bool = False
     ) -> Path:
         """
         处理完整流程：PDF -> Markdown -> AI提取 -> CSV
@@ -90,7 +101,9 @@ class ModbusPipeline:
             pdf_path: 输入PDF文件路径
             output_csv_path: 输出CSV文件路径，默认为None时自动生成
             save_markdown: 是否保存中间的Markdown文件
-            parse_pdf: 是否重新解析PDF（默认False，使用已有的Markdown文件）
+            parse_pdf: 是否强制重新解析PDF（默认False，优先使用Markdown缓存）
+            markdown_content: 已解析好的Markdown内容（批量处理时预先解析），提供时跳过解析步骤
+            stream: 是否流式提取，每得到一个点位就写入CSV
             
         Returns:
             输出的CSV文件路径
@@ -102,39 +115,32 @@ class ModbusPipeline:
         logger.info(f"开始处理 Modbus 协议文件: {pdf_path.name}")
         logger.info("=" * 60)
         
-        # 步骤1: 获取Markdown内容
-        if parse_pdf:
-            # 重新解析PDF为Markdown
-            logger.info("\n[步骤 1/3] 解析PDF文件...")
-            markdown_content = self.pdf_parser.parse(pdf_path)
-            logger.info(f"✓ PDF解析完成，文本长度: {len(markdown_content)} 字符")
-        else:
-            # 使用已有的Markdown文件
-            logger.info("\n[步骤 1/3] 读取已有的Markdown文件...")
-            markdown_path = self._find_existing_markdown(pdf_path)
-            if markdown_path and markdown_path.exists():
-                markdown_content = markdown_path.read_text(encoding='utf-8')
-                logger.info(f"✓ 读取Markdown文件: {markdown_path.name}")
-                logger.info(f"✓ 文本长度: {len(markdown_content)} 字符")
-            else:
-                logger.warning(f"⚠ 未找到已有的Markdown文件，将重新解析PDF")
-                markdown_content = self.pdf_parser.parse(pdf_path)
-                logger.info(f"✓ PDF解析完成，文本长度: {len(markdown_content)} 字符")
-        
-        # 步骤2: 使用AI提取点位信息
-        logger.info("\n[步骤 2/3] 使用AI提取点位信息...")
-        data_points = self.ai_extractor.extract(markdown_content)
-        logger.info(f"✓ 成功提取 {len(data_points)} 个点位")
-        
-        # 步骤3: 导出为CSV
-        logger.info("\n[步骤 3/3] 导出CSV文件...")
+        # 步骤1: 获取Markdown内容（按PDF内容哈希命中缓存时不会重新解析）
+        logger.info("\n[步骤 1/3] 解析PDF文件...")
+        if markdown_content is None:
+            markdown_content = self.pdf_parser.parse(pdf_path, force=parse_pdf)
+        logger.info(f"✓ Markdown获取完成，文本长度: {len(markdown_content)} 字符")
+        
         if output_csv_path is None:
             # 使用时间戳生成文件名
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_csv_path = self.output_dir / f"{timestamp}.csv"
         
-        self.csv_exporter.export(data_points, output_csv_path)
-        logger.info(f"✓ CSV文件已保存: {output_csv_path}")
+        if stream:
+            # 步骤2+3: 流式提取，点位边生成边写入CSV
+            logger.info("\n[步骤 2/3] 使用AI流式提取点位信息并写入CSV...")
+            row_count = sum(1 for _ in self.extract_to_csv_stream(markdown_content, output_csv_path))
+            logger.info(f"✓ 成功写入 {row_count} 个点位，CSV文件已保存: {output_csv_path}")
+        else:
+            # 步骤2: 使用AI提取点位信息
+            logger.info("\n[步骤 2/3] 使用AI提取点位信息...")
+            data_points = self.ai_extractor.extract(markdown_content)
+            logger.info(f"✓ 成功提取 {len(data_points)} 个点位")
+            
+            # 步骤3: 导出为CSV
+            logger.info("\n[步骤 3/3] 导出CSV文件...")
+            self.csv_exporter.export(data_points, output_csv_path)
+            logger.info(f"✓ CSV文件已保存: {output_csv_path}")
         
         logger.info("\n" + "=" * 60)
         logger.info("处理完成！")
@@ -142,33 +148,20 @@ class ModbusPipeline:
         
         return output_csv_path
     
-    def _find_existing_markdown(self, pdf_path: Path) -> Optional[Path]:
+    def extract_to_csv_stream(self, markdown_content: str, output_csv_path: Path) -> Iterator[Dict]:
         """
-        查找已存在的Markdown文件
+        流式提取点位并增量写入CSV
         
         Args:
-            pdf_path: PDF文件路径
+            markdown_content: Markdown内容
+            output_csv_path: 输出CSV文件路径
             
-        Returns:
-            Markdown文件路径，如果不存在则返回None
+        Yields:
+            已写入CSV的标准化行（不存在的点位不产出）
         """
-        # 构造可能的Markdown文件路径
-        # 格式1: data/output/{pdf_name}.md/{pdf_name}/auto/{pdf_name}.md
-        pdf_stem = pdf_path.stem
-        md_path1 = self.output_dir / f"{pdf_stem}.md" / pdf_stem / "auto" / f"{pdf_stem}.md"
-        
-        # 格式2: data/output/{pdf_name}/auto/{pdf_name}.md
-        md_path2 = self.output_dir / pdf_stem / "auto" / f"{pdf_stem}.md"
-        
-        # 格式3: data/output/{pdf_name}.md
-        md_path3 = self.output_dir / f"{pdf_stem}.md"
-        
-        # 按顺序检查
-        for md_path in [md_path1, md_path2, md_path3]:
-            if md_path.exists():
-                return md_path
-        
-        return None
+        with self.csv_exporter.open_writer(output_csv_path) as writer:
+            for point in self.ai_extractor.extract_stream(markdown_content):
+                yield from writer.write(point)
     
     def process_batch(
         self,
@@ -182,7 +175,7 @@ class ModbusPipeline:
         Args:
             pdf_paths: PDF文件路径列表
             output_dir: 输出目录
-            parse_pdf: 是否重新解析PDF
+            parse_pdf: 是否强制重新解析PDF
             
         Returns:
             生成的CSV文件路径列表
@@ -195,17 +188,48 @@ class ModbusPipeline:
         
         logger.info(f"开始批量处理 {total} 个文件...")
         
-        for i, pdf_path in enumerate(pdf_paths, 1):
+        # 先整批解析PDF（官方API模式下为一个批量任务），解析失败的文件随后逐个重试
+        try:
+            markdown_by_path = self.pdf_parser.parse_batch(pdf_paths, force=parse_pdf)
+        except Exception as e:
+            logger.error(f"批量解析失败，将逐个解析: {e}")
+            markdown_by_path = {}
+        
+        # 逐个补解析批量解析失败的文件
+        for pdf_path in pdf_paths:
+            if pdf_path in markdown_by_path:
+                continue
             try:
-                logger.info(f"\n处理文件 {i}/{total}: {pdf_path.name}")
-                csv_path = self.process(pdf_path, parse_pdf=parse_pdf)
-                results.append(csv_path)
+                markdown_by_path[pdf_path] = self.pdf_parser.parse(pdf_path, force=parse_pdf)
             except Exception as e:
-                logger.error(f"处理文件 {pdf_path.name} 失败: {e}")
+                logger.error(f"解析文件 {pdf_path.name} 失败: {e}")
+        
+        # 所有文档的AI提取异步并发执行，速率与并发数由共享限流器控制
+        parsed_paths = [p for p in pdf_paths if p in markdown_by_path]
+        outcomes = asyncio.run(self._aextract_all([markdown_by_path[p] for p in parsed_paths]))
+        
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        for i, (pdf_path, outcome) in enumerate(zip(parsed_paths, outcomes), 1):
+            if isinstance(outcome, BaseException):
+                logger.error(f"处理文件 {pdf_path.name} 失败: {outcome}")
                 continue
+            try:
+                csv_path = self.output_dir / f"{pdf_path.stem}_{timestamp}.csv"
+                self.csv_exporter.export(outcome, csv_path)
+                logger.info(f"✓ [{i}/{len(parsed_paths)}] {pdf_path.name}: {len(outcome)} 个点位 -> {csv_path}")
+                results.append(csv_path)
+            except Exception as e:
+                logger.error(f"导出文件 {pdf_path.name} 失败: {e}")
         
         logger.info(f"\n批量处理完成！成功: {len(results)}/{total}")
         return results
+    
+    async def _aextract_all(self, documents: List[str]) -> list:
+        """并发提取多个文档，单个文档失败时返回对应的异常"""
+        return await asyncio.gather(
+            *(self.ai_extractor.aextract(document) for document in documents),
+            return_exceptions=True
+        )
 
 
 def process_pdf(
@@ -222,7 +246,7 @@ def process_pdf(
         pdf_path: PDF文件路径
         output_csv_path: 输出CSV路径
         controller_name: 控制器名称，默认为'default'
-        parse_pdf: 是否重新解析PDF
+        parse_pdf: 是否强制重新解析PDF
         address_offset: 地址偏移量，默认为0
         
     Returns:
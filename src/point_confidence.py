@@ -0,0 +1,117 @@
+"""点位置信度模块 - 按地址格式、功能区一致性与原文证据为提取结果打分，用于模型级联时挑选需要复核的点位"""
+
+from typing import Dict, List, Set, Tuple
+
+from src.point_derivation import parse_address
+from src.point_merger import is_existing, normalize_address
+from src.section_index import tokenize
+
+
+# 各项检查的分值，总分为1；原文中找不到地址时最高0.6，低于级联复核阈值（CASCADE_MIN_CONFIDENCE，默认0.7）
+_ADDRESS_SCORE = 0.2
+_CONSISTENCY_SCORE = 0.2
+_ADDRESS_EVIDENCE_SCORE = 0.4
+_DESCRIPTION_EVIDENCE_SCORE = 0.2
+
+# 描述中的二元组在原文中出现的比例达到该值时视为有证据
+_DESCRIPTION_OVERLAP = 0.5
+
+
+def _address_forms(zone: str, body: str) -> Set[str]:
+    """地址在说明书中可能的写法：0014、30014、3x0014、14、0x0014、0014h"""
+    body = body.lower()
+    forms = {body, f"{zone}{body.zfill(4)}", f"{zone}x{body}", f"0x{body}", f"{body}h"}
+    if body.isdigit() and int(body) >= 10:
+        forms.add(str(int(body)))
+    return forms
+
+
+def address_in_document(point: Dict, document_terms: Set[str]) -> bool:
+    """
+    点位地址是否以某种常见写法出现在原文中
+
+    Args:
+        point: 点位信息
+        document_terms: 原文的检索词集合（tokenize的结果）
+
+    Returns:
+        地址格式正确且在原文中出现时为True
+    """
+    parsed = parse_address(normalize_address(point.get("Address")))
+    return parsed is not None and bool(_address_forms(parsed["zone"], parsed["address"]) & document_terms)
+
+
+def _consistency_issues(point: Dict, zone: str, bit: str) -> List[str]:
+    """功能区与ReadWrite/DataType不一致之处"""
+    issues = []
+    read_write = str(point.get("ReadWrite") or "").strip().lower()
+    data_type = str(point.get("DataType") or "").strip().upper()
+    if zone in ("1", "3") and read_write in ("rw", "wo"):
+        issues.append(f"{zone}区只读但ReadWrite为{read_write}")
+    if zone in ("0", "1") and data_type == "WORD":
+        issues.append(f"{zone}区为数字量但DataType为WORD")
+    if bit and data_type == "WORD":
+        issues.append("地址带bit位但DataType为WORD")
+    return issues
+
+
+def score_point(point: Dict, document_terms: Set[str]) -> Tuple[float, List[str]]:
+    """
+    计算单个点位的置信度
+
+    - 地址格式正确（如 3X0014、4X0001.2）：0.2，格式不正确时直接为0
+    - 功能区与ReadWrite/DataType一致：0.2
+    - 地址在原文中出现：0.4
+    - 描述与原文的二元组重合度达到一半：0.2（描述取Description，完整输出模式没有Description时取thinking）
+
+    Args:
+        point: 点位信息
+        document_terms: 原文的检索词集合（tokenize的结果）
+
+    Returns:
+        (置信度0~1, 扣分原因列表)
+    """
+    if not is_existing(point):
+        return 0.0, ["exist为假"]
+    parsed = parse_address(normalize_address(point.get("Address")))
+    if parsed is None:
+        return 0.0, ["地址格式不正确"]
+
+    score = _ADDRESS_SCORE
+    reasons = _consistency_issues(point, parsed["zone"], parsed["bit"])
+    if not reasons:
+        score += _CONSISTENCY_SCORE
+
+    if address_in_document(point, document_terms):
+        score += _ADDRESS_EVIDENCE_SCORE
+    else:
+        reasons.append("原文中未找到地址")
+
+    evidence = point.get("Description") or point.get("thinking") or ""
+    bigrams = [term for term in tokenize(str(evidence)) if len(term) == 2]
+    if bigrams and sum(term in document_terms for term in bigrams) / len(bigrams) >= _DESCRIPTION_OVERLAP:
+        score += _DESCRIPTION_EVIDENCE_SCORE
+    else:
+        reasons.append("描述与原文重合度低")
+
+    return round(score, 2), reasons
+
+
+def score_points(points: List[Dict], markdown_content: str) -> Dict[str, Tuple[float, List[str]]]:
+    """
+    计算一组点位的置信度（原文只切分一次）
+
+    Args:
+        points: 点位信息列表
+        markdown_content: 原文Markdown
+
+    Returns:
+        {MeasuringPointName: (置信度, 扣分原因列表)}
+    """
+    document_terms = set(tokenize(markdown_content))
+    scores = {}
+    for point in points:
+        name = str(point.get("MeasuringPointName") or "").strip()
+        if name:
+            scores[name] = score_point(point, document_terms)
+    return scores
@@ -0,0 +1,128 @@
+"""点位字段推导模块 - 按 config/modbus_extract.md 的规则，从精简的模型输出推导完整点位字段"""
+
+import re
+from typing import Dict, List, Optional
+
+from loguru import logger
+
+
+# 精简输出的字段（模型只输出这些，其余字段在本地推导）
+COMPACT_FIELDS = {
+    "code": "MeasuringPointName",
+    "addr": "地址，格式同Address，如 3X0014、4X0001、3X0014.1（带bit位时用“.”接BitIndex）、1X0001",
+    "scale": "WORD型数据的系数Gain（如数据为实际值x10时为0.1），没有说明时省略",
+    "offset": "WORD型数据的偏移Offset，没有说明时省略",
+    "unit": "单位，没有时省略",
+    "rw": "读写类型ro/rw/wo，仅在与功能区默认值（0区/4区为rw，1区/3区为ro）不同时输出",
+    "rev": "BIT型点位需要位取反时为1，否则省略",
+    "desc": "点位在说明书中的原始描述",
+}
+
+# 地址主体按说明书原样保留，十六进制地址（如0x00A0）的主体可以包含A-F
+_ADDRESS_PATTERN = re.compile(r"^([0134])X([0-9A-F]+)(?:\.(\d{1,2}))?$", re.IGNORECASE)
+
+# 按功能区的默认读写属性：0区/4区可读可写，1区/3区只读
+_ZONE_READ_WRITE = {"0": "rw", "1": "ro", "3": "ro", "4": "rw"}
+
+
+def _text(value) -> str:
+    return "" if value is None else str(value).strip()
+
+
+def _number(value, default: str) -> str:
+    """将系数/偏移规范化为字符串，无法识别时使用默认值"""
+    text = _text(value)
+    if not text:
+        return default
+    try:
+        return f"{float(text):g}"
+    except ValueError:
+        logger.warning(f"无法识别的系数/偏移: {text}，使用默认值 {default}")
+        return default
+
+
+def parse_address(address: str) -> Optional[Dict[str, str]]:
+    """
+    解析点位地址
+
+    Args:
+        address: 地址，如 3X0014.1、4X0001、3X00A0
+
+    Returns:
+        {zone, address, bit}（十六进制地址主体统一为大写），格式不正确时返回None
+    """
+    match = _ADDRESS_PATTERN.match("".join(_text(address).split()))
+    if not match:
+        return None
+    zone, body, bit = match.groups()
+    return {"zone": zone, "address": body.upper(), "bit": bit or ""}
+
+
+def derive_point(compact: Dict) -> Optional[Dict]:
+    """
+    由精简输出推导完整点位字段
+
+    - DataType/EnableBit：0区/1区或地址带bit位时为BIT，否则为WORD
+    - BitIndex/reverseBit：BitIndex取地址中的bit位，reverseBit仅BIT型填写
+    - ReadWrite：按功能区推导，模型显式给出rw时以模型为准
+    - Gain/Offset/Transform Type：WORD型为 系数/偏移/zoom，BIT型为空/空/none
+
+    Args:
+        compact: 精简点位，如 {"code": "TchwIn", "addr": "3X0001", "scale": 0.1, "unit": "℃"}
+
+    Returns:
+        完整点位字典，缺少点位名称或地址无法解析时返回None
+    """
+    code = _text(compact.get("code") or compact.get("MeasuringPointName"))
+    address = _text(compact.get("addr") or compact.get("Address"))
+    parsed = parse_address(address)
+    if not code or parsed is None:
+        logger.warning(f"精简输出缺少点位名称或地址格式不正确，已跳过: {compact}")
+        return None
+
+    zone, bit = parsed["zone"], parsed["bit"]
+    is_bit = bit != "" or zone in ("0", "1")
+    read_write = _text(compact.get("rw")).lower()
+    if read_write not in ("ro", "rw", "wo"):
+        read_write = _ZONE_READ_WRITE[zone]
+
+    full_address = f"{zone}X{parsed['address']}"
+    if bit != "" and zone in ("3", "4"):
+        full_address += f".{bit}"
+
+    return {
+        "MeasuringPointName": code,
+        "exist": True,
+        "DataType": "BIT" if is_bit else "WORD",
+        "EnableBit": 1 if is_bit else 0,
+        "BitIndex": bit,
+        "reverseBit": ("1" if _text(compact.get("rev")) in ("1", "true", "True") else "0") if is_bit else "",
+        "Address": full_address,
+        "Decimal": "0",
+        "ReadWrite": read_write,
+        "Unit": _text(compact.get("unit")),
+        "Description": _text(compact.get("desc")),
+        "Gain": "" if is_bit else _number(compact.get("scale"), "1"),
+        "Offset": "" if is_bit else _number(compact.get("offset"), "0"),
+        "Transform Type": "none" if is_bit else "zoom",
+    }
+
+
+def derive_points(compact_points: List[Dict]) -> List[Dict]:
+    """
+    批量推导完整点位字段（跳过无法推导的点位）
+
+    Args:
+        compact_points: 精简点位列表
+
+    Returns:
+        完整点位列表
+    """
+    points = []
+    for compact in compact_points:
+        if not isinstance(compact, dict):
+            continue
+        point = derive_point(compact)
+        if point is not None:
+            points.append(point)
+    return points
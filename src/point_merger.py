@@ -0,0 +1,128 @@
+"""点位合并模块 - 合并分块提取的结果，按MeasuringPointName去重并以地址证据解决冲突"""
+
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List
+
+from loguru import logger
+
+from src.point_derivation import parse_address
+
+
+def is_existing(point: Dict) -> bool:
+    """点位的exist字段是否为真（模型可能输出布尔值或字符串）"""
+    exist = point.get("exist", True)
+    if isinstance(exist, str):
+        return exist.strip().lower() not in ("false", "0", "no", "")
+    return bool(exist)
+
+
+def normalize_address(address) -> str:
+    """规范化地址用于比较：去空白、统一大写（3x0014 与 3X0014 视为同一地址）"""
+    if address is None:
+        return ""
+    return "".join(str(address).split()).upper()
+
+
+def is_confident(point: Dict) -> bool:
+    """点位结果是否可信：exist为真且地址格式正确（如 3X0014、4X0001.2）"""
+    return is_existing(point) and parse_address(normalize_address(point.get("Address"))) is not None
+
+
+def _filled_fields(point: Dict) -> int:
+    return sum(1 for value in point.values() if value not in (None, ""))
+
+
+def merge_points(results: List[List[Dict]]) -> List[Dict]:
+    """
+    合并多个分块的提取结果
+
+    同一MeasuringPointName出现多次时：
+    1. 优先采用exist为真且给出地址的结果；
+    2. 多个分块给出不同地址时，采用出现次数最多的地址（次数相同时取字段更完整的结果）；
+    3. 以选中的结果为基础，用同一地址的其它结果补全空字段。
+
+    Args:
+        results: 各分块的点位列表，按分块顺序排列
+
+    Returns:
+        合并后的点位列表（按点位首次出现的顺序）
+    """
+    grouped: Dict[str, List[Dict]] = defaultdict(list)
+    order: List[str] = []
+    unnamed: List[Dict] = []
+
+    for points in results:
+        for point in points:
+            if not isinstance(point, dict):
+                continue
+            name = str(point.get("MeasuringPointName") or "").strip()
+            if not name:
+                unnamed.append(point)
+                continue
+            if name not in grouped:
+                order.append(name)
+            grouped[name].append(point)
+
+    merged: List[Dict] = []
+    for name in order:
+        candidates = grouped[name]
+        with_address = [p for p in candidates if is_existing(p) and normalize_address(p.get("Address"))]
+        if not with_address:
+            existing = [p for p in candidates if is_existing(p)]
+            merged.append(dict(max(existing or candidates, key=_filled_fields)))
+            continue
+
+        votes = Counter(normalize_address(p.get("Address")) for p in with_address)
+        if len(votes) > 1:
+            logger.info(f"点位 {name} 在不同分块中地址不一致: {dict(votes)}")
+
+        best_address = max(
+            votes,
+            key=lambda addr: (
+                votes[addr],
+                max(_filled_fields(p) for p in with_address if normalize_address(p.get("Address")) == addr)
+            )
+        )
+        same_address = sorted(
+            (p for p in with_address if normalize_address(p.get("Address")) == best_address),
+            key=_filled_fields,
+            reverse=True
+        )
+        point = dict(same_address[0])
+        for other in same_address[1:]:
+            for key, value in other.items():
+                if point.get(key) in (None, "") and value not in (None, ""):
+                    point[key] = value
+        merged.append(point)
+
+    if unnamed:
+        logger.warning(f"忽略 {len(unnamed)} 个缺少MeasuringPointName的点位")
+
+    return merged
+
+
+def merge_followup(points: List[Dict], followup_points: List[Dict], codes: Iterable[str]) -> List[Dict]:
+    """
+    合并补充提取的结果：补充结果中可信的点位替换原结果中的同名点位（原结果没有时追加）
+
+    Args:
+        points: 原提取结果
+        followup_points: 补充提取的结果
+        codes: 本次补充提取的点位（MeasuringPointName），其它点位的补充结果忽略
+
+    Returns:
+        合并后的点位列表
+    """
+    codes = set(codes)
+    recovered: Dict[str, Dict] = {}
+    for point in followup_points:
+        name = str(point.get("MeasuringPointName") or "").strip()
+        if name in codes and name not in recovered and is_confident(point):
+            recovered[name] = point
+
+    merged: List[Dict] = []
+    for point in points:
+        name = str(point.get("MeasuringPointName") or "").strip()
+        merged.append(recovered.pop(name, point) if name in codes else point)
+    merged.extend(recovered.values())
+    return merged
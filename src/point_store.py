@@ -0,0 +1,188 @@
+"""点位结果存储模块 - 按点位持久化提取结果（SQLite），点位映射变化时只重新提取输入有变化的点位"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+from loguru import logger
+
+
+def content_hash(value) -> str:
+    """
+    计算内容哈希（字典按键排序序列化后计算）
+
+    Args:
+        value: 字符串或可JSON序列化的对象
+
+    Returns:
+        SHA-256十六进制摘要
+    """
+    if not isinstance(value, str):
+        value = json.dumps(value, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(value.encode('utf-8')).hexdigest()
+
+
+class PointStore:
+    """
+    点位提取结果存储
+
+    每个点位一行，键为 (文档哈希, MeasuringPointName, 点位描述哈希, point_metadata哈希, 提示词版本)，
+    值为该点位的提取结果。只记录找到的点位：模型一次没有找到的点位不写入，下次重新提取，
+    避免一次不准确的回答让该点位永久缺失。
+    """
+
+    def __init__(self, db_path: Path):
+        """
+        初始化点位存储
+
+        Args:
+            db_path: SQLite数据库文件路径
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS points (
+                doc_hash TEXT NOT NULL,
+                code TEXT NOT NULL,
+                desc_hash TEXT NOT NULL,
+                metadata_hash TEXT NOT NULL,
+                prompt_version TEXT NOT NULL,
+                point TEXT,
+                created REAL NOT NULL,
+                PRIMARY KEY (doc_hash, code, desc_hash, metadata_hash, prompt_version)
+            )
+            """
+        )
+        self._conn.commit()
+
+    def get_many(
+        self,
+        doc_hash: str,
+        desc_hashes: Dict[str, str],
+        metadata_hash: str,
+        prompt_version: str
+    ) -> Dict[str, Dict]:
+        """
+        批量读取点位结果
+
+        Args:
+            doc_hash: 文档哈希
+            desc_hashes: {MeasuringPointName: 点位描述哈希}
+            metadata_hash: point_metadata哈希
+            prompt_version: 提示词版本
+
+        Returns:
+            {MeasuringPointName: 点位结果}，未命中的点位不在结果中
+        """
+        found: Dict[str, Dict] = {}
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT code, desc_hash, point FROM points WHERE doc_hash = ? AND metadata_hash = ? AND prompt_version = ?",
+                (doc_hash, metadata_hash, prompt_version)
+            ).fetchall()
+            for code, desc_hash, point in rows:
+                # 旧版本记录的“不存在”（point为NULL）视为未命中
+                if point and desc_hashes.get(code) == desc_hash:
+                    found[code] = json.loads(point)
+            self.hits += len(found)
+            self.misses += len(desc_hashes) - len(found)
+        return found
+
+    def put_many(
+        self,
+        doc_hash: str,
+        points: Dict[str, Optional[Dict]],
+        desc_hashes: Dict[str, str],
+        metadata_hash: str,
+        prompt_version: str
+    ) -> None:
+        """
+        批量写入点位结果（值为None的点位不写入）
+
+        Args:
+            doc_hash: 文档哈希
+            points: {MeasuringPointName: 点位结果}
+            desc_hashes: {MeasuringPointName: 点位描述哈希}
+            metadata_hash: point_metadata哈希
+            prompt_version: 提示词版本
+        """
+        now = time.time()
+        rows = [
+            (doc_hash, code, desc_hashes[code], metadata_hash, prompt_version, json.dumps(point, ensure_ascii=False), now)
+            for code, point in points.items()
+            if point is not None
+        ]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO points VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self._conn.commit()
+        logger.debug(f"点位结果已存储: {len(rows)} 个点位")
+
+    def delete_document(self, doc_hash: str, codes: Optional[Iterable[str]] = None) -> int:
+        """
+        删除文档的点位结果（用于强制重新提取）
+
+        Args:
+            doc_hash: 文档哈希
+            codes: 只删除这些点位，默认删除该文档的全部点位
+
+        Returns:
+            删除的行数
+        """
+        with self._lock:
+            if codes is None:
+                cursor = self._conn.execute("DELETE FROM points WHERE doc_hash = ?", (doc_hash,))
+            else:
+                cursor = self._conn.executemany(
+                    "DELETE FROM points WHERE doc_hash = ? AND code = ?", [(doc_hash, code) for code in codes]
+                )
+            self._conn.commit()
+            return cursor.rowcount
+
+    def stats(self) -> Dict:
+        """
+        存储统计
+
+        Returns:
+            {hits, misses, documents, points}
+        """
+        with self._lock:
+            documents, points = self._conn.execute("SELECT COUNT(DISTINCT doc_hash), COUNT(*) FROM points").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "documents": documents, "points": points}
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
+
+
+_shared_stores: Dict[str, PointStore] = {}
+_shared_stores_lock = threading.Lock()
+
+
+def get_point_store(db_path: Path) -> PointStore:
+    """
+    获取进程内共享的点位存储（同一数据库文件只打开一个连接）
+
+    Args:
+        db_path: SQLite数据库文件路径
+
+    Returns:
+        共享的PointStore实例
+    """
+    key = str(Path(db_path).resolve())
+    with _shared_stores_lock:
+        store = _shared_stores.get(key)
+        if store is None:
+            store = PointStore(db_path)
+            _shared_stores[key] = store
+        return store
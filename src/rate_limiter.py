@@ -0,0 +1,222 @@
+"""模型调用限流模块 - 按每分钟请求数/token数的令牌桶限流，并在429时自适应降低并发"""
+
+import asyncio
+import threading
+import time
+from typing import Dict, Optional
+
+from loguru import logger
+
+
+class TokenBucket:
+    """令牌桶：容量为每分钟配额，按秒匀速补充（调用方需持有外部锁）"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """取出amount个令牌还需等待的秒数（超过容量的请求按满桶计算，避免永远等待）"""
+        self._refill(now)
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def take(self, amount: float) -> None:
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class RateLimiter:
+    """
+    模型调用限流器（线程与协程共用）
+
+    - 请求数与token数各用一个令牌桶（RPM/TPM），请求前按估算token数预扣，完成后按实际用量退还差额
+    - 并发上限按AIMD调整：收到429时减半并暂停到Retry-After之后，连续成功后逐步恢复
+    """
+
+    def __init__(self, rpm: int = 60, tpm: int = 1_000_000, max_concurrency: int = 8, min_concurrency: int = 1):
+        """
+        初始化限流器
+
+        Args:
+            rpm: 每分钟最大请求数，0表示不限制
+            tpm: 每分钟最大token数，0表示不限制
+            max_concurrency: 最大并发请求数
+            min_concurrency: 429降级后的最小并发数
+        """
+        self.requests = TokenBucket(rpm) if rpm > 0 else None
+        self.tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.concurrency = self.max_concurrency
+
+        self.in_flight = 0
+        self.throttled = 0
+        self._successes = 0
+        self._paused_until = 0.0
+        self._decrease_blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _try_reserve(self, tokens: int) -> float:
+        """尝试预留一次请求的配额，成功返回0，否则返回建议等待的秒数"""
+        with self._lock:
+            now = time.monotonic()
+            if now < self._paused_until:
+                return self._paused_until - now
+            if self.in_flight >= self.concurrency:
+                return 0.05
+
+            wait = 0.0
+            if self.requests is not None:
+                wait = max(wait, self.requests.wait_time(1, now))
+            if self.tokens is not None:
+                wait = max(wait, self.tokens.wait_time(tokens, now))
+            if wait > 0:
+                return wait
+
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None:
+                self.tokens.take(tokens)
+            self.in_flight += 1
+            return 0.0
+
+    def acquire(self, tokens: int) -> None:
+        """
+        同步等待配额
+
+        Args:
+            tokens: 本次请求预计消耗的token数（输入 + 最大输出）
+        """
+        while True:
+            wait = self._try_reserve(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def aacquire(self, tokens: int) -> None:
+        """
+        异步等待配额
+
+        Args:
+            tokens: 本次请求预计消耗的token数（输入 + 最大输出）
+        """
+        while True:
+            wait = self._try_reserve(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def release(
+        self,
+        reserved_tokens: int,
+        used_tokens: Optional[int] = None,
+        rate_limited: bool = False,
+        retry_after: Optional[float] = None
+    ) -> None:
+        """
+        请求结束后归还并发名额并调整限流状态
+
+        Args:
+            reserved_tokens: 请求前预扣的token数
+            used_tokens: 实际消耗的token数（来自usage），提供时退还多扣的部分
+            rate_limited: 是否收到429
+            retry_after: 服务端建议的重试等待时间（秒）
+        """
+        with self._lock:
+            self.in_flight = max(self.in_flight - 1, 0)
+
+            if self.tokens is not None and used_tokens is not None and used_tokens < reserved_tokens:
+                self.tokens.refund(reserved_tokens - used_tokens)
+
+            if rate_limited:
+                self.throttled += 1
+                self._successes = 0
+                now = time.monotonic()
+                pause = retry_after if retry_after is not None else 1.0
+                self._paused_until = max(self._paused_until, now + pause)
+                # 同一波并发请求同时收到的多个429只减半一次
+                if now >= self._decrease_blocked_until:
+                    self._decrease_blocked_until = now + max(pause, 1.0)
+                    new_concurrency = max(self.min_concurrency, self.concurrency // 2)
+                    if new_concurrency != self.concurrency:
+                        logger.warning(f"模型接口限流(429)，并发上限 {self.concurrency} -> {new_concurrency}，暂停 {pause:.1f} 秒")
+                    self.concurrency = new_concurrency
+                return
+
+            self._successes += 1
+            # 每连续成功“当前并发数”次，并发上限加1
+            if self.concurrency < self.max_concurrency and self._successes >= self.concurrency:
+                self._successes = 0
+                self.concurrency += 1
+
+    def stats(self) -> Dict:
+        """
+        限流状态
+
+        Returns:
+            {concurrency, in_flight, throttled}
+        """
+        with self._lock:
+            return {
+                "concurrency": self.concurrency,
+                "in_flight": self.in_flight,
+                "throttled": self.throttled,
+            }
+
+
+def parse_retry_after(headers) -> Optional[float]:
+    """
+    从响应头解析Retry-After（秒），兼容retry-after-ms
+
+    Args:
+        headers: 响应头（类字典对象）
+
+    Returns:
+        等待秒数，无法解析时返回None
+    """
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        return None
+    return None
+
+
+_shared_limiters: Dict[str, RateLimiter] = {}
+_shared_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(key: str, **kwargs) -> RateLimiter:
+    """
+    获取进程内共享的限流器
+
+    同一服务地址的所有AIExtractor（CLI批处理、Gradio多个会话）共用一份配额。
+
+    Args:
+        key: 共享键（通常为API基础URL）
+        **kwargs: 首次创建时传给RateLimiter的参数
+
+    Returns:
+        共享的RateLimiter实例
+    """
+    with _shared_limiters_lock:
+        limiter = _shared_limiters.get(key)
+        if limiter is None:
+            limiter = RateLimiter(**kwargs)
+            _shared_limiters[key] = limiter
+        return limiter
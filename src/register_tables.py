@@ -0,0 +1,332 @@
+"""寄存器表预提取模块 - 用规则解析MinerU输出的Markdown/HTML表格，得到带类型的候选寄存器行"""
+
+import html
+import re
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from typing import Dict, List, Optional, Tuple
+
+from loguru import logger
+
+
+# 表头关键词 -> 列角色（按顺序匹配，先匹配到的角色优先）
+_COLUMN_KEYWORDS: List[Tuple[str, re.Pattern]] = [
+    ("function", re.compile(r"功能码|function|\bfc\b", re.IGNORECASE)),
+    ("bit", re.compile(r"^(bit|位|位号|bit位|位地址|bit\s*no\.?)$|bit\s*index", re.IGNORECASE)),
+    ("address", re.compile(r"地址|寄存器号|寄存器编号|address|\breg(ister)?\b", re.IGNORECASE)),
+    ("unit", re.compile(r"单位|unit", re.IGNORECASE)),
+    ("rw", re.compile(r"读写|属性|权限|r/w|access|读/写", re.IGNORECASE)),
+    ("scale", re.compile(r"倍率|系数|精度|比例|分辨率|scale|factor|resolution|gain", re.IGNORECASE)),
+    ("description", re.compile(r"名称|描述|说明|含义|内容|参数|变量|定义|name|description|parameter", re.IGNORECASE)),
+]
+
+# 表格标题/上下文中表示功能区的关键词
+_ZONE_CONTEXT = [
+    ("0", re.compile(r"线圈|coil|功能码\s*0?[15]\b|0x0?[15]\b", re.IGNORECASE)),
+    ("1", re.compile(r"离散输入|discrete|功能码\s*0?2\b", re.IGNORECASE)),
+    ("3", re.compile(r"输入寄存器|input\s*register|功能码\s*0?4\b", re.IGNORECASE)),
+    ("4", re.compile(r"保持寄存器|holding|功能码\s*0?[36]\b|功能码\s*16\b", re.IGNORECASE)),
+]
+
+_FUNCTION_ZONES = {"01": "0", "05": "0", "15": "0", "02": "1", "04": "3", "03": "4", "06": "4", "16": "4"}
+
+_HEX_PATTERN = re.compile(r"^(?:0x)?([0-9a-f]+)h?$", re.IGNORECASE)
+_ZONE_ADDRESS_PATTERN = re.compile(r"^([134])x([0-9]+)$", re.IGNORECASE)
+_BIT_PATTERN = re.compile(r"^(?:bit\s*|b)?(\d{1,2})$", re.IGNORECASE)
+_SCALE_PATTERN = re.compile(r"^(/|÷)?(\d+(?:\.\d+)?)")
+
+
+@dataclass
+class RegisterRow:
+    """一行候选寄存器"""
+
+    row_id: str
+    zone: str
+    address: str
+    bit: str
+    unit: str
+    description: str
+    rw: str
+    scale: str
+    table_index: int
+
+    @property
+    def modbus_address(self) -> str:
+        """按提示词规则拼出的地址，如 4X0001、3X0014.1（功能区未知时不带前缀）"""
+        address = f"{self.zone}X{self.address}" if self.zone else self.address
+        return f"{address}.{self.bit}" if self.bit != "" else address
+
+    def to_line(self) -> str:
+        """候选行的紧凑文本表示，供模型选择行ID"""
+        return " | ".join([self.row_id, self.modbus_address, self.unit, self.rw, self.scale, self.description])
+
+
+class _HTMLTableParser(HTMLParser):
+    """解析HTML表格，展开rowspan/colspan"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.tables: List[List[List[str]]] = []
+        self._rows: Optional[List[List[str]]] = None
+        self._row: Optional[List[str]] = None
+        self._cell: Optional[List[str]] = None
+        self._span = (1, 1)
+        self._pending: Dict[int, Tuple[str, int]] = {}
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "table":
+            self._rows, self._pending = [], {}
+        elif tag == "tr" and self._rows is not None:
+            self._row = []
+        elif tag in ("td", "th") and self._row is not None:
+            attrs = dict(attrs)
+            self._cell = []
+            self._span = (_int(attrs.get("rowspan"), 1), _int(attrs.get("colspan"), 1))
+        elif tag == "br" and self._cell is not None:
+            self._cell.append(" ")
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+    def handle_endtag(self, tag):
+        if tag in ("td", "th") and self._cell is not None:
+            self._fill_pending()
+            text = " ".join("".join(self._cell).split())
+            rowspan, colspan = self._span
+            for _ in range(colspan):
+                if rowspan > 1:
+                    self._pending[len(self._row)] = (text, rowspan - 1)
+                self._row.append(text)
+                self._fill_pending()
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            self._fill_pending()
+            self._rows.append(self._row)
+            self._row = None
+        elif tag == "table" and self._rows is not None:
+            self.tables.append(self._rows)
+            self._rows = None
+
+    def _fill_pending(self):
+        """补上被上方单元格rowspan占据的列"""
+        while len(self._row) in self._pending:
+            col = len(self._row)
+            text, remaining = self._pending.pop(col)
+            self._row.append(text)
+            if remaining > 1:
+                self._pending[col] = (text, remaining - 1)
+
+
+def _int(value, default: int) -> int:
+    try:
+        return max(int(value), 1)
+    except (TypeError, ValueError):
+        return default
+
+
+def _split_pipe_row(line: str) -> List[str]:
+    cells = re.split(r"(?<!\\)\|", line.strip().strip("|"))
+    return [html.unescape(cell.replace("\\|", "|")).strip() for cell in cells]
+
+
+def find_tables(markdown_content: str) -> List[Tuple[str, List[List[str]]]]:
+    """
+    找出Markdown中的所有表格（Markdown管道表格与HTML表格）
+
+    Args:
+        markdown_content: Markdown文本
+
+    Returns:
+        [(表格前的上下文文本, 表格行列表)]，按文档顺序排列
+    """
+    tables: List[Tuple[int, str, List[List[str]]]] = []
+
+    for match in re.finditer(r"<table.*?</table>", markdown_content, re.IGNORECASE | re.DOTALL):
+        parser = _HTMLTableParser()
+        parser.feed(match.group(0))
+        for rows in parser.tables:
+            tables.append((match.start(), rows))
+
+    lines = markdown_content.splitlines(keepends=True)
+    offset, block, block_start = 0, [], 0
+    for line in lines + [""]:
+        if line.strip().startswith("|"):
+            if not block:
+                block_start = offset
+            block.append(line)
+        elif block:
+            rows = [_split_pipe_row(row) for row in block if not re.match(r"^\s*\|?[\s:|-]+\|?\s*$", row)]
+            if len(rows) > 1:
+                tables.append((block_start, rows))
+            block = []
+        offset += len(line)
+
+    tables.sort(key=lambda item: item[0])
+    return [(_context_before(markdown_content, start), rows) for start, rows in tables]
+
+
+def _context_before(markdown_content: str, position: int, max_chars: int = 300) -> str:
+    """表格之前的上下文（从最近的标题开始，最多max_chars个字符），用于判断功能区"""
+    context = markdown_content[max(0, position - max_chars):position]
+    headings = list(re.finditer(r"^#{1,6}\s", context, re.MULTILINE))
+    if headings:
+        context = context[headings[-1].start():]
+    context = re.sub(r"<table.*?</table>", " ", context, flags=re.DOTALL | re.IGNORECASE)
+    return context.strip()
+
+
+def _classify_header(header: List[str]) -> Dict[str, int]:
+    """识别表头各列的角色"""
+    roles: Dict[str, int] = {}
+    for col, cell in enumerate(header):
+        for role, pattern in _COLUMN_KEYWORDS:
+            if role not in roles and pattern.search(cell or ""):
+                roles[role] = col
+                break
+    return roles
+
+
+def _parse_address(text: str, zone_hint: str) -> Tuple[str, str, str]:
+    """
+    解析地址单元格
+
+    Returns:
+        (功能区, 地址主体, 地址中携带的bit位)
+    """
+    text = text.replace(" ", "")
+    bit = ""
+    if "." in text:
+        text, bit = text.split(".", 1)
+        bit = bit if bit.isdigit() else ""
+
+    # 1X/3X/4X 分区写法；0x开头一律按十六进制处理（说明书中远比“0X区”写法常见）
+    match = _ZONE_ADDRESS_PATTERN.match(text)
+    if match:
+        return match.group(1), match.group(2), bit
+
+    # 5位/6位十进制逻辑地址（如40001、300014），首位即功能区
+    if text.isdigit() and len(text) in (5, 6) and text[0] in "0134" and zone_hint in ("", text[0]):
+        return text[0], text[1:].zfill(4), bit
+
+    if text.isdigit():
+        return zone_hint, text.zfill(4), bit
+
+    match = _HEX_PATTERN.match(text)
+    if match and (text.lower().startswith("0x") or text.lower().endswith("h")):
+        return zone_hint, match.group(1).upper().zfill(4), bit
+
+    return zone_hint, "", bit
+
+
+def _zone_from(text: str) -> str:
+    for zone, pattern in _ZONE_CONTEXT:
+        if pattern.search(text or ""):
+            return zone
+    return ""
+
+
+def _zone_from_rw(rw: str) -> str:
+    """只有读写属性时的功能区推断：只读按3区，可写按4区"""
+    rw = (rw or "").lower()
+    if not rw:
+        return ""
+    if "w" in rw or "写" in rw:
+        return "4"
+    if "r" in rw or "读" in rw:
+        return "3"
+    return ""
+
+
+def extract_register_rows(markdown_content: str) -> List[RegisterRow]:
+    """
+    从Markdown中提取候选寄存器行
+
+    只处理表头能识别出地址列的表格；地址单元格为空的行（位定义表中常见）沿用上一行的地址。
+
+    Args:
+        markdown_content: Markdown文本
+
+    Returns:
+        候选寄存器行列表，行ID为 R1、R2……
+    """
+    rows: List[RegisterRow] = []
+
+    for table_index, (context, table) in enumerate(find_tables(markdown_content)):
+        header_index = next(
+            (i for i, row in enumerate(table[:3]) if "address" in _classify_header(row)), None
+        )
+        if header_index is None:
+            continue
+        roles = _classify_header(table[header_index])
+        table_zone = _zone_from(context) or _zone_from(" ".join(table[header_index]))
+
+        def cell(row: List[str], role: str) -> str:
+            col = roles.get(role)
+            return row[col].strip() if col is not None and col < len(row) else ""
+
+        last_address: Tuple[str, str] = ("", "")
+        for row in table[header_index + 1:]:
+            if not any(row):
+                continue
+            address_text = cell(row, "address")
+            function = cell(row, "function")
+            rw = cell(row, "rw")
+            zone_hint = _FUNCTION_ZONES.get(function.zfill(2)[-2:], "") if function else ""
+            zone_hint = zone_hint or table_zone
+
+            if address_text:
+                zone, address, bit = _parse_address(address_text, zone_hint)
+                if not address:
+                    continue
+                last_address = (zone, address)
+            elif last_address[1]:
+                zone, address = last_address
+                bit = ""
+            else:
+                continue
+
+            bit_match = _BIT_PATTERN.match(cell(row, "bit").replace(" ", ""))
+            if bit_match and int(bit_match.group(1)) <= 15:
+                bit = bit_match.group(1)
+
+            description = cell(row, "description")
+            if not description:
+                # 没有识别出描述列时，用地址以外的单元格拼接
+                description = " ".join(c for i, c in enumerate(row) if c and i != roles.get("address"))
+
+            rows.append(RegisterRow(
+                row_id=f"R{len(rows) + 1}",
+                zone=zone or _zone_from_rw(rw),
+                address=address,
+                bit=bit,
+                unit=cell(row, "unit"),
+                description=description,
+                rw=rw,
+                scale=cell(row, "scale"),
+                table_index=table_index,
+            ))
+
+    logger.info(f"寄存器表预提取: {len(rows)} 个候选行")
+    return rows
+
+
+def parse_scale(scale: str) -> str:
+    """
+    将精度/系数单元格转换为Gain：纯数字直接作为Gain（"0.1" -> "0.1"），"/10" -> "0.1"；
+    "×10"、"1000-100.0" 等含义不唯一的写法不处理
+
+    Args:
+        scale: 表格中的精度/系数单元格
+
+    Returns:
+        Gain字符串，无法识别时为空字符串
+    """
+    match = _SCALE_PATTERN.match((scale or "").replace(" ", ""))
+    if not match or re.search(r"\d\s*[-~]\s*\d", scale):
+        return ""
+    divide, number = match.groups()
+    value = float(number)
+    if value == 0:
+        return ""
+    return f"{1 / value if divide else value:g}"
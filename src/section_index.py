@@ -0,0 +1,357 @@
+"""文档分段检索模块 - 按标题与表格切分Markdown，用字符n-gram BM25挑选与点位相关的章节"""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from loguru import logger
+
+
+_HEADING_PATTERN = re.compile(r'^#{1,6}\s+\S')
+_CJK_PATTERN = re.compile(r'[㐀-鿿豈-﫿]')
+_TERM_PATTERN = re.compile(r'[㐀-鿿豈-﫿]+|[a-z0-9]+')
+_HTML_TAG_PATTERN = re.compile(r'<[^>]+>')
+
+# 寄存器表常见的特征词，出现在表格中时提高该章节的基础得分
+_REGISTER_HINT_PATTERN = re.compile(r'寄存器|地址|功能码|0x[0-9a-f]+|[034]\d{4}|读写|只读|register|address', re.IGNORECASE)
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的token数：中日韩字符约1个token，其余字符约4个字符1个token
+
+    Args:
+        text: 文本
+
+    Returns:
+        估算的token数
+    """
+    cjk = len(_CJK_PATTERN.findall(text))
+    return cjk + (len(text) - cjk + 3) // 4
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    将文本切分为检索词：中文按单字与相邻二元组（不依赖分词词典），英文与数字按整词
+
+    Args:
+        text: 文本
+
+    Returns:
+        检索词列表
+    """
+    terms: List[str] = []
+    for run in _TERM_PATTERN.findall(_HTML_TAG_PATTERN.sub(" ", text).lower()):
+        if _CJK_PATTERN.match(run):
+            terms.extend(run)
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+        else:
+            terms.append(run)
+    return terms
+
+
+@dataclass
+class Section:
+    """文档中的一个章节片段"""
+
+    index: int
+    title: str
+    text: str
+    has_table: bool
+    tokens: int = 0
+    term_counts: Counter = field(default_factory=Counter, repr=False)
+    length: int = 0
+
+
+def _is_table_line(line: str) -> bool:
+    stripped = line.strip()
+    return stripped.startswith("|") or stripped.lower().startswith(("<table", "<tr", "<td", "</t", "<th"))
+
+
+def _split_blocks(lines: List[str]) -> List[str]:
+    """将章节正文切分为块：连续的表格行为一个块，其余按空行分段"""
+    blocks: List[str] = []
+    current: List[str] = []
+    current_is_table = False
+    for line in lines:
+        is_table = _is_table_line(line)
+        if current and (is_table != current_is_table or (not is_table and not line.strip())):
+            blocks.append("\n".join(current))
+            current = []
+        if line.strip() or is_table:
+            current.append(line)
+            current_is_table = is_table
+    if current:
+        blocks.append("\n".join(current))
+    return blocks
+
+
+def split_sections(markdown_content: str, max_section_tokens: int = 4000) -> List[Section]:
+    """
+    按Markdown标题切分章节，过长的章节再按表格/段落边界拆分（拆出的片段保留所属标题）
+
+    Args:
+        markdown_content: Markdown文本
+        max_section_tokens: 单个片段的最大token数
+
+    Returns:
+        按文档顺序排列的章节列表
+    """
+    raw_sections: List[List[str]] = [[]]
+    for line in markdown_content.splitlines():
+        if _HEADING_PATTERN.match(line) and raw_sections[-1]:
+            raw_sections.append([])
+        raw_sections[-1].append(line)
+
+    sections: List[Section] = []
+    for lines in raw_sections:
+        title = lines[0].lstrip("#").strip() if lines and _HEADING_PATTERN.match(lines[0]) else ""
+        text = "\n".join(lines).strip()
+        if not text:
+            continue
+
+        if estimate_tokens(text) <= max_section_tokens:
+            parts = [text]
+        else:
+            parts, current = [], ""
+            for block in _split_blocks(lines):
+                candidate = f"{current}\n\n{block}" if current else block
+                if current and estimate_tokens(candidate) > max_section_tokens:
+                    parts.append(current)
+                    candidate = f"{lines[0]}（续）\n\n{block}" if title else block
+                current = candidate
+            if current:
+                parts.append(current)
+
+        for part in parts:
+            sections.append(Section(
+                index=len(sections),
+                title=title,
+                text=part,
+                has_table=any(_is_table_line(line) for line in part.splitlines())
+            ))
+    return sections
+
+
+class SectionIndex:
+    """
+    Markdown章节检索索引
+
+    以字符n-gram作为检索词建立BM25索引，对每个查询（点位描述）分别打分，
+    在token预算内优先保证每个点位的最佳章节，再按综合得分补充其余章节。
+    """
+
+    def __init__(self, markdown_content: str, max_section_tokens: int = 4000, k1: float = 1.5, b: float = 0.75):
+        """
+        建立索引
+
+        Args:
+            markdown_content: Markdown文本
+            max_section_tokens: 单个片段的最大token数
+            k1: BM25词频饱和参数
+            b: BM25文档长度归一化参数
+        """
+        self.k1 = k1
+        self.b = b
+        self.sections = split_sections(markdown_content, max_section_tokens)
+
+        document_frequency: Counter = Counter()
+        for section in self.sections:
+            terms = tokenize(f"{section.title}\n{section.text}")
+            section.term_counts = Counter(terms)
+            section.length = len(terms)
+            section.tokens = estimate_tokens(section.text)
+            document_frequency.update(section.term_counts.keys())
+
+        n = len(self.sections)
+        self.avg_length = sum(s.length for s in self.sections) / n if n else 0.0
+        self.idf: Dict[str, float] = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5)) for term, df in document_frequency.items()
+        }
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(section.tokens for section in self.sections)
+
+    def score(self, query: str) -> List[float]:
+        """
+        计算查询对每个章节的BM25得分
+
+        Args:
+            query: 查询文本
+
+        Returns:
+            与self.sections一一对应的得分列表
+        """
+        query_terms = set(tokenize(query))
+        scores = []
+        for section in self.sections:
+            norm = self.k1 * (1 - self.b + self.b * section.length / self.avg_length) if self.avg_length else self.k1
+            score = 0.0
+            for term in query_terms:
+                tf = section.term_counts.get(term)
+                if tf:
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            scores.append(score)
+        return scores
+
+    def select(self, queries: Iterable[str], token_budget: int) -> List[Section]:
+        """
+        在token预算内挑选与查询最相关的章节
+
+        Args:
+            queries: 查询文本（每个点位一条）
+            token_budget: 可发送给模型的文档token上限
+
+        Returns:
+            入选的章节（按文档顺序）
+        """
+        queries = [q for q in queries if q.strip()]
+        if not self.sections or not queries:
+            return list(self.sections)
+
+        per_query = [self.score(query) for query in queries]
+
+        # 综合得分：各查询按自身最高分归一化后求和，寄存器表格额外加权
+        combined = [0.0] * len(self.sections)
+        for scores in per_query:
+            top = max(scores)
+            if top > 0:
+                for i, s in enumerate(scores):
+                    combined[i] += s / top
+        for i, section in enumerate(self.sections):
+            if section.has_table and _REGISTER_HINT_PATTERN.search(section.text):
+                combined[i] *= 1.5
+
+        # 第一轮：每个查询的最佳章节；第二轮：按综合得分补充
+        order: List[int] = []
+        for scores in sorted(per_query, key=max, reverse=True):
+            best = max(range(len(scores)), key=scores.__getitem__)
+            if scores[best] > 0 and best not in order:
+                order.append(best)
+        order.extend(
+            i for i in sorted(range(len(self.sections)), key=combined.__getitem__, reverse=True)
+            if combined[i] > 0 and i not in order
+        )
+
+        selected, used = set(), 0
+        for i in order:
+            tokens = self.sections[i].tokens
+            if used + tokens > token_budget:
+                continue
+            selected.add(i)
+            used += tokens
+        return [section for section in self.sections if section.index in selected]
+
+
+def trim_markdown(
+    markdown_content: str,
+    queries: Iterable[str],
+    token_budget: int,
+    max_section_tokens: int = 4000
+) -> Dict:
+    """
+    按token预算裁剪Markdown，只保留与点位描述相关的章节
+
+    Args:
+        markdown_content: Markdown文本
+        queries: 查询文本（每个点位一条）
+        token_budget: 文档token上限，小于等于0时不裁剪
+        max_section_tokens: 单个片段的最大token数
+
+    Returns:
+        {"content": 裁剪后的Markdown, "original_tokens", "kept_tokens", "cut_tokens",
+         "total_sections", "kept_sections"}
+    """
+    original_tokens = estimate_tokens(markdown_content)
+    report = {
+        "content": markdown_content,
+        "original_tokens": original_tokens,
+        "kept_tokens": original_tokens,
+        "cut_tokens": 0,
+        "total_sections": None,
+        "kept_sections": None,
+    }
+    if token_budget <= 0 or original_tokens <= token_budget:
+        return report
+
+    index = SectionIndex(markdown_content, max_section_tokens=min(max_section_tokens, token_budget))
+    selected = index.select(queries, token_budget)
+    if not selected:
+        logger.warning("文档检索未命中任何章节，将发送完整文档")
+        return report
+
+    content = "\n\n".join(section.text for section in selected)
+    kept_tokens = estimate_tokens(content)
+    report.update(
+        content=content,
+        kept_tokens=kept_tokens,
+        cut_tokens=max(original_tokens - kept_tokens, 0),
+        total_sections=len(index.sections),
+        kept_sections=len(selected),
+    )
+    return report
+
+
+def split_chunks(markdown_content: str, chunk_tokens: int, overlap_tokens: int = 0) -> List[str]:
+    """
+    将Markdown按章节边界切分为相互重叠的分块，用于分块并行提取
+
+    Args:
+        markdown_content: Markdown文本
+        chunk_tokens: 每个分块的token上限
+        overlap_tokens: 相邻分块之间重复的token数（取上一分块末尾的章节），避免跨块的表格被截断后丢失上下文
+
+    Returns:
+        分块文本列表
+    """
+    sections = split_sections(markdown_content, max_section_tokens=chunk_tokens)
+    for section in sections:
+        section.tokens = estimate_tokens(section.text)
+
+    chunks: List[List[Section]] = []
+    current: List[Section] = []
+    used = 0
+    for section in sections:
+        if current and used + section.tokens > chunk_tokens:
+            chunks.append(current)
+            # 从上一分块末尾回溯，携带不超过overlap_tokens的章节
+            overlap: List[Section] = []
+            overlap_used = 0
+            for previous in reversed(current):
+                if overlap_used + previous.tokens > overlap_tokens or overlap_used + previous.tokens + section.tokens > chunk_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_used += previous.tokens
+            current, used = overlap, overlap_used
+        current.append(section)
+        used += section.tokens
+    if current:
+        chunks.append(current)
+
+    return ["\n\n".join(section.text for section in chunk) for chunk in chunks]
+
+
+def mapping_queries(dev_mapping: Dict, extra: Optional[Iterable[str]] = None) -> List[str]:
+    """
+    由设备映射配置生成检索查询：每个点位的中文描述加英文ID
+
+    Args:
+        dev_mapping: {点位描述: MeasuringPointName}
+        extra: 额外的查询文本
+
+    Returns:
+        查询文本列表
+    """
+    queries = []
+    for desc, code in dev_mapping.items():
+        if isinstance(code, dict):
+            # 按设备类型分组的映射配置
+            queries.extend(mapping_queries(code))
+        else:
+            queries.append(f"{desc} {code}")
+    if extra:
+        queries.extend(extra)
+    return queries
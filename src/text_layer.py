@@ -0,0 +1,133 @@
+"""PDF文本层提取模块 - 对带文本层的电子版PDF在本地直接提取文字与表格，生成Markdown"""
+
+import statistics
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from loguru import logger
+
+
+def _require_pymupdf():
+    """按需导入PyMuPDF（可选依赖）"""
+    try:
+        import pymupdf
+    except ImportError:
+        raise ImportError("文本层解析需要安装PyMuPDF: pip install pymupdf")
+    return pymupdf
+
+
+def _has_usable_text(text: str, min_chars: int) -> bool:
+    """判断页面文本是否可用：有效字符足够多且乱码（替换字符）比例较低"""
+    chars = [c for c in text if not c.isspace()]
+    if len(chars) < min_chars:
+        return False
+    garbled = sum(1 for c in chars if c == "�")
+    return garbled / len(chars) < 0.1
+
+
+def _clean_cell(cell: Optional[str]) -> str:
+    """表格单元格：去掉换行并转义竖线"""
+    if cell is None:
+        return ""
+    return " ".join(str(cell).split()).replace("|", "\\|")
+
+
+def _table_to_markdown(rows: List[List[Optional[str]]]) -> str:
+    """将表格行数据转换为Markdown表格，第一行作为表头"""
+    rows = [row for row in rows if any(cell not in (None, "") for cell in row)]
+    if not rows:
+        return ""
+    width = max(len(row) for row in rows)
+    lines = []
+    for i, row in enumerate(rows):
+        cells = [_clean_cell(cell) for cell in row] + [""] * (width - len(row))
+        lines.append("| " + " | ".join(cells) + " |")
+        if i == 0:
+            lines.append("|" + " --- |" * width)
+    return "\n".join(lines)
+
+
+def _intersects(bbox: Tuple[float, float, float, float], rects: List[Tuple[float, float, float, float]]) -> bool:
+    x0, y0, x1, y1 = bbox
+    return any(x0 < r[2] and r[0] < x1 and y0 < r[3] and r[1] < y1 for r in rects)
+
+
+def _page_to_markdown(page) -> str:
+    """
+    将单页的文本层转换为Markdown：表格输出为Markdown表格，较大字号的短行作为标题，其余按阅读顺序输出段落
+
+    Args:
+        page: PyMuPDF页面对象
+
+    Returns:
+        该页的Markdown文本
+    """
+    items: List[Tuple[float, float, str]] = []
+
+    # 表格
+    table_rects = []
+    try:
+        tables = page.find_tables().tables
+    except Exception as e:
+        logger.debug(f"第 {page.number + 1} 页表格识别失败: {e}")
+        tables = []
+    for table in tables:
+        rect = tuple(table.bbox)
+        table_rects.append(rect)
+        md_table = _table_to_markdown(table.extract())
+        if md_table:
+            items.append((rect[1], rect[0], md_table))
+
+    # 表格以外的文本块
+    blocks = page.get_text("dict").get("blocks", [])
+    sizes = [
+        span["size"]
+        for block in blocks if block.get("type") == 0
+        for line in block["lines"] for span in line["spans"] if span["text"].strip()
+    ]
+    body_size = statistics.median(sizes) if sizes else 0
+
+    for block in blocks:
+        if block.get("type") != 0 or _intersects(tuple(block["bbox"]), table_rects):
+            continue
+        lines = []
+        for line in block["lines"]:
+            text = "".join(span["text"] for span in line["spans"]).strip()
+            if not text:
+                continue
+            line_size = max(span["size"] for span in line["spans"])
+            if body_size and line_size >= body_size * 1.25 and len(text) <= 60:
+                lines.append(f"\n# {text}\n")
+            else:
+                lines.append(text)
+        if lines:
+            items.append((block["bbox"][1], block["bbox"][0], "\n".join(lines).strip()))
+
+    items.sort(key=lambda item: (round(item[0], 1), item[1]))
+    return "\n\n".join(text for _, _, text in items)
+
+
+def extract_text_layer_pages(pdf_path: Path, min_chars: int = 50) -> List[Optional[str]]:
+    """
+    逐页提取PDF文本层并转换为Markdown
+
+    Args:
+        pdf_path: PDF文件路径
+        min_chars: 页面有效字符数低于该值时视为没有可用文本层（扫描页、纯图片页）
+
+    Returns:
+        每页的Markdown文本列表，没有可用文本层的页面为None
+    """
+    pymupdf = _require_pymupdf()
+
+    pages: List[Optional[str]] = []
+    with pymupdf.open(str(pdf_path)) as doc:
+        for page in doc:
+            if not _has_usable_text(page.get_text("text"), min_chars):
+                pages.append(None)
+                continue
+            pages.append(_page_to_markdown(page))
+
+    usable = sum(1 for page in pages if page is not None)
+    logger.info(f"文本层提取完成: {usable}/{len(pages)} 页有可用文本")
+    return pages
@@ -0,0 +1,226 @@
+"""AI提取器测试 - 用替身模型客户端验证续写等调用流程，不访问真实接口"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from src import ai_extractor
+from src.ai_extractor import AIExtractor, ResponseCache
+from src.point_store import PointStore
+from src.rate_limiter import RateLimiter
+
+
+DEV_MAPPING = {"出水温度": "TchwOut", "回水温度": "TchwIn", "运行状态": "RunSts"}
+
+
+def _point(name: str, address: str) -> dict:
+    return {"MeasuringPointName": name, "exist": True, "Address": address, "DataType": "WORD", "ReadWrite": "ro"}
+
+
+def _response(content: str, finish_reason: str = "stop"):
+    message = SimpleNamespace(content=content)
+    return SimpleNamespace(choices=[SimpleNamespace(message=message, finish_reason=finish_reason)], usage=None)
+
+
+class FakeCompletions:
+    """按顺序返回预设响应，并记录每次请求的消息"""
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def create(self, messages, **kwargs):
+        self.requests.append(messages)
+        return self.responses.pop(0)
+
+
+class AsyncFakeCompletions(FakeCompletions):
+    async def create(self, messages, **kwargs):
+        return FakeCompletions.create(self, messages, **kwargs)
+
+
+def _fake_client(completions):
+    return SimpleNamespace(chat=SimpleNamespace(completions=completions))
+
+
+@pytest.fixture
+def extractor():
+    return AIExtractor(
+        api_key="test-key",
+        model="test-model",
+        base_url="http://127.0.0.1:9/v1",
+        dev_mapping=DEV_MAPPING,
+        point_metadata={"Address": "地址"},
+        retrieval_token_budget=0,
+        chunk_tokens=0,
+        use_cache=False,
+        rate_limiter=RateLimiter(rpm=0, tpm=0),
+        table_mode=False,
+        compact_output=False,
+        followup_rounds=0,
+        fast_model="",
+        shard_size=0,
+    )
+
+
+def _truncated_then_continued():
+    """第一次输出在第三个对象中途被截断；续写时模型重复了最后一个完整对象"""
+    first = json.dumps([_point("TchwOut", "3X0001"), _point("TchwIn", "3X0002")], ensure_ascii=False)
+    first = first[:-1] + ', {"MeasuringPointName": "RunS'
+    second = json.dumps([_point("TchwIn", "3X0002"), _point("RunSts", "1X0001")], ensure_ascii=False)
+    return [_response(first, "length"), _response(second)]
+
+
+def test_continuation_merges_without_duplicates(extractor):
+    """输出被截断时带上已完整输出的对象续写，合并结果中重复的点位只保留一次"""
+    completions = FakeCompletions(_truncated_then_continued())
+    extractor.client = _fake_client(completions)
+
+    content = extractor._call_model("文档", temperature=0.1, max_tokens=100)
+
+    names = [point["MeasuringPointName"] for point in json.loads(content)]
+    assert names == ["TchwOut", "TchwIn", "RunSts"]
+    assert len(completions.requests) == 2
+    assistant = completions.requests[1][-2]
+    assert assistant["role"] == "assistant"
+    assert [point["MeasuringPointName"] for point in json.loads(assistant["content"])] == ["TchwOut", "TchwIn"]
+
+
+def test_async_continuation_matches_sync(extractor, monkeypatch):
+    """异步调用与同步调用共用续写流程，结果一致"""
+    completions = AsyncFakeCompletions(_truncated_then_continued())
+    monkeypatch.setattr(ai_extractor, "_get_async_client", lambda api_key, base_url: _fake_client(completions))
+
+    content = asyncio.run(extractor._acall_model("文档", temperature=0.1, max_tokens=100))
+
+    assert [point["MeasuringPointName"] for point in json.loads(content)] == ["TchwOut", "TchwIn", "RunSts"]
+    assert len(completions.requests) == 2
+
+
+def test_point_store_sends_only_changed_codes(tmp_path, monkeypatch):
+    """点位结果存储：第二次提取只把描述有变化的点位与上次没有找到的点位发送给模型"""
+    requests = []
+
+    def fake_call_model(self, user_prompt, temperature, max_tokens, prefix=None):
+        codes = sorted(set(self.dev_mapping.values()))
+        requests.append(codes)
+        # 模型只找到了温度点位，RunSts没有找到
+        return json.dumps([_point(code, f"3X000{i + 1}") for i, code in enumerate(codes) if code != "RunSts"])
+
+    monkeypatch.setattr(AIExtractor, "_call_model", fake_call_model)
+    store = PointStore(tmp_path / "points.sqlite3")
+
+    def run(dev_mapping):
+        return AIExtractor(
+            api_key="test-key",
+            model="test-model",
+            base_url="http://127.0.0.1:9/v1",
+            dev_mapping=dev_mapping,
+            point_metadata={"Address": "地址"},
+            retrieval_token_budget=0,
+            chunk_tokens=0,
+            cache=ResponseCache(tmp_path / "llm"),
+            rate_limiter=RateLimiter(rpm=0, tpm=0),
+            table_mode=False,
+            compact_output=False,
+            followup_rounds=0,
+            fast_model="",
+            shard_size=0,
+            point_store=store,
+        ).extract("# 寄存器表")
+
+    first = run(DEV_MAPPING)
+    assert requests == [["RunSts", "TchwIn", "TchwOut"]]
+    assert [point["MeasuringPointName"] for point in first] == ["TchwOut", "TchwIn"]
+
+    second = run({"冷冻水出水温度": "TchwOut", "回水温度": "TchwIn", "运行状态": "RunSts"})
+    assert requests[1] == ["RunSts", "TchwOut"]
+    assert [point["MeasuringPointName"] for point in second] == ["TchwOut", "TchwIn"]
+    store.close()
+
+
+def test_parse_response_strict_then_repaired(extractor):
+    """合法JSON走严格解析；格式有误时用json_repair修复，并分别计入解析统计"""
+    strict = extractor._parse_response("```json\n" + json.dumps([_point("TchwOut", "3X0001")]) + "\n```")
+    repaired = extractor._parse_response('[{"MeasuringPointName": "RunSts", "Address": "1X0001",}')
+
+    assert strict == [_point("TchwOut", "3X0001")]
+    assert repaired == [{"MeasuringPointName": "RunSts", "Address": "1X0001"}]
+    assert extractor.decode_stats["strict"] == 1
+    assert extractor.decode_stats["repaired"] == 1
+
+
+def test_parse_response_validates_points(extractor):
+    """丢弃非对象或缺少点位名称的元素，统计未定义的字段"""
+    content = json.dumps([
+        _point("TchwOut", "3X0001"),
+        {"Address": "3X0002"},
+        "RunSts",
+        {**_point("TchwIn", "3X0002"), "Note": "?"},
+    ])
+
+    points = extractor._parse_response(content)
+
+    assert [point["MeasuringPointName"] for point in points] == ["TchwOut", "TchwIn"]
+    assert extractor.decode_stats["invalid"] == 2
+    assert extractor.decode_stats["unknown_fields"] == 3  # DataType、ReadWrite、Note不在输出字段中
+
+
+def test_parse_response_rejects_non_array(extractor):
+    with pytest.raises(ValueError, match="JSON"):
+        extractor._parse_response('"没有找到寄存器表"')
+    assert extractor.decode_stats["failed"] == 1
+
+
+def test_followup_requests_only_missing_points(extractor, monkeypatch):
+    """补充提取只针对缺失或不可信的点位发送请求，并把找到的点位合并回结果"""
+    prompts = []
+
+    def fake_call_model(self, user_prompt, temperature, max_tokens, prefix=None):
+        prompts.append(prefix)
+        return json.dumps([_point("RunSts", "1X0001")])
+
+    monkeypatch.setattr(AIExtractor, "_call_model", fake_call_model)
+    extractor.followup_rounds = 2
+    data_points = [_point("TchwOut", "3X0001"), {**_point("TchwIn", ""), "exist": False}]
+
+    points = extractor._followup("# 寄存器表", data_points, temperature=0.1, max_tokens=None)
+
+    assert len(prompts) == 2
+    assert "RunSts" in prompts[0] and "TchwIn" in prompts[0] and "TchwOut" not in prompts[0]
+    assert [point["MeasuringPointName"] for point in points] == ["TchwOut", "TchwIn", "RunSts"]
+    assert points[2]["Address"] == "1X0001"
+
+
+def test_cascade_escalates_only_uncertain_points(extractor):
+    """级联模式下置信度低于阈值的点位（原文中找不到地址）交由强模型复核"""
+    document = "| 地址 | 名称 |\n|---|---|\n| 30001 | 出水温度 |\n| 30002 | 回水温度 |"
+    data_points = [
+        {**_point("TchwOut", "3X0001"), "Description": "出水温度"},
+        {**_point("TchwIn", "3X0009"), "Description": "回水温度"},
+    ]
+    assert extractor._uncertain_points(data_points, document) == ["TchwIn"]
+
+
+def test_sharded_extraction_shares_prefix_and_merges(extractor, monkeypatch):
+    """点位数超过shard_size时分组提取：各组共享文档前缀，只保留本组的点位并合并结果"""
+    requests = []
+
+    def fake_call_model(self, user_prompt, temperature, max_tokens, prefix=None):
+        requests.append((prefix, user_prompt))
+        # 模型在每组都输出了全部点位，不属于本组的结果应被丢弃
+        return json.dumps([_point("TchwOut", "3X0001"), _point("TchwIn", "3X0002"), _point("RunSts", "1X0001")])
+
+    monkeypatch.setattr(AIExtractor, "_call_model", fake_call_model)
+    extractor.shard_size = 2
+    extractor.point_shards = extractor._build_point_shards()
+    assert [sorted(set(shard.values())) for shard in extractor.point_shards] == [["TchwIn", "TchwOut"], ["RunSts"]]
+
+    points = extractor._extract_single("# 寄存器表\n| 30001 | 出水温度 |", temperature=0.1, max_tokens=None)
+
+    assert len(requests) == 2
+    assert requests[0][0] == requests[1][0] and "30001" in requests[0][0]
+    assert sorted("RunSts" in user_prompt for _, user_prompt in requests) == [False, True]
+    assert sorted(point["MeasuringPointName"] for point in points) == ["RunSts", "TchwIn", "TchwOut"]
@@ -0,0 +1,69 @@
+"""回调接收器测试 - 在本地接收器上模拟MinerU的回调推送"""
+
+import hashlib
+import json
+import threading
+
+import pytest
+import requests
+
+from src.callback_server import CallbackReceiver
+
+
+UID = "test-uid"
+
+
+@pytest.fixture
+def receiver():
+    receiver = CallbackReceiver(host="127.0.0.1", port=0, uid=UID)
+    yield receiver
+    receiver.shutdown()
+
+
+def _notify(receiver: CallbackReceiver, data: dict, seed: str, checksum: str = None) -> int:
+    """按MinerU的格式推送一条回调，返回HTTP状态码"""
+    content = json.dumps(data)
+    if checksum is None:
+        checksum = hashlib.sha256(f"{UID}{seed}{content}".encode("utf-8")).hexdigest()
+    response = requests.post(receiver.public_url, json={"checksum": checksum, "content": content}, timeout=5)
+    return response.status_code
+
+
+def test_requires_uid():
+    """未提供UID时无法校验回调，拒绝启动"""
+    with pytest.raises(ValueError):
+        CallbackReceiver(host="127.0.0.1", port=0)
+
+
+def test_delivers_verified_result(receiver):
+    """校验通过的结束通知唤醒等待方，中间状态不唤醒"""
+    receiver.register("task-1", "seed-1")
+
+    assert _notify(receiver, {"task_id": "task-1", "state": "running"}, "seed-1") == 200
+    assert receiver.wait("task-1", timeout=0.2) is None
+
+    waiter_result = {}
+    waiter = threading.Thread(target=lambda: waiter_result.update(data=receiver.wait("task-1", timeout=5)))
+    waiter.start()
+    assert _notify(receiver, {"task_id": "task-1", "state": "done", "full_zip_url": "http://x/a.zip"}, "seed-1") == 200
+    waiter.join()
+    assert waiter_result["data"]["full_zip_url"] == "http://x/a.zip"
+
+
+def test_rejects_bad_checksum(receiver):
+    """checksum不正确的回调被拒绝，不会作为任务结果"""
+    receiver.register("task-2", "seed-2")
+
+    assert _notify(receiver, {"task_id": "task-2", "state": "done"}, "seed-2", checksum="forged") == 400
+    assert receiver.wait("task-2", timeout=0.2) is None
+
+
+def test_verifies_callback_received_before_register(receiver):
+    """登记之前到达的回调先暂存，登记时用seed校验：伪造的被丢弃，真实的被接受"""
+    assert _notify(receiver, {"task_id": "task-3", "state": "done", "full_zip_url": "forged"}, "x", "forged") == 200
+    receiver.register("task-3", "seed-3")
+    assert receiver.wait("task-3", timeout=0.2) is None
+
+    assert _notify(receiver, {"task_id": "task-4", "state": "done", "full_zip_url": "real"}, "seed-4") == 200
+    receiver.register("task-4", "seed-4")
+    assert receiver.wait("task-4", timeout=1)["full_zip_url"] == "real"
@@ -0,0 +1,90 @@
+"""磁盘缓存测试 - LRU淘汰、过期、孤立文件清理与多实例共享缓存目录"""
+
+import threading
+
+from src import disk_cache
+from src.disk_cache import DiskCache
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+def _cache(tmp_path, monkeypatch, **kwargs):
+    clock = FakeClock()
+    monkeypatch.setattr(disk_cache.time, "time", clock.time)
+    return DiskCache(tmp_path, **kwargs), clock
+
+
+def test_get_put_and_stats(tmp_path):
+    cache = DiskCache(tmp_path, max_size_bytes=1024)
+    assert cache.get("a") is None
+    cache.put("a", "出水温度")
+    assert cache.get("a") == "出水温度"
+    assert cache.stats() == {"hits": 1, "misses": 1, "hit_rate": 0.5, "entries": 1, "size_bytes": 12}
+
+
+def test_evicts_least_recently_used(tmp_path, monkeypatch):
+    """超过容量时淘汰最久未访问的条目，最近读过的条目保留"""
+    cache, clock = _cache(tmp_path, monkeypatch, max_size_bytes=20)
+    for key in ("a", "b"):
+        cache.put(key, key * 8)
+        clock.now += 1
+    assert cache.get("a") == "a" * 8
+    clock.now += 1
+
+    cache.put("c", "c" * 8)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "a" * 8 and cache.get("c") == "c" * 8
+    assert not (tmp_path / "b.txt").exists()
+
+
+def test_expired_entries_are_misses(tmp_path, monkeypatch):
+    cache, clock = _cache(tmp_path, monkeypatch, max_size_bytes=1024, max_age_seconds=60)
+    cache.put("a", "value")
+    clock.now += 61
+    assert cache.get("a") is None
+    assert not (tmp_path / "a.txt").exists()
+    assert cache.stats()["entries"] == 0
+
+
+def test_put_removes_orphan_files(tmp_path):
+    """索引中没有记录的条目文件（例如进程中途退出留下的）在写入时被清理"""
+    (tmp_path / "orphan.txt").write_text("stale", encoding="utf-8")
+    (tmp_path / "notes.md").write_text("not managed", encoding="utf-8")
+    cache = DiskCache(tmp_path, max_size_bytes=1024)
+    cache.put("a", "value")
+    assert not (tmp_path / "orphan.txt").exists()
+    assert (tmp_path / "notes.md").exists()
+
+
+def test_deleted_entry_file_is_a_miss(tmp_path):
+    cache = DiskCache(tmp_path, max_size_bytes=1024)
+    cache.put("a", "value")
+    (tmp_path / "a.txt").unlink()
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_instances_share_directory_without_losing_entries(tmp_path):
+    """多个实例（模拟多个进程）同时写入同一目录，索引的读-改-写在文件锁内完成，不会丢失条目"""
+    caches = [DiskCache(tmp_path, max_size_bytes=1024 * 1024) for _ in range(4)]
+
+    def writer(n, cache):
+        for i in range(10):
+            cache.put(f"{n}-{i}", f"value {n}-{i}")
+
+    threads = [threading.Thread(target=writer, args=(n, cache)) for n, cache in enumerate(caches)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    reader = DiskCache(tmp_path, max_size_bytes=1024 * 1024)
+    assert reader.stats()["entries"] == 40
+    assert all(reader.get(f"{n}-{i}") == f"value {n}-{i}" for n in range(4) for i in range(10))
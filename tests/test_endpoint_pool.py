@@ -0,0 +1,86 @@
+"""MinerU节点池测试 - 最少在途请求选择、连续失败摘除与健康检查恢复"""
+
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from src.endpoint_pool import EndpointPool
+
+
+A = "http://mineru-a:8000"
+B = "http://mineru-b:8000"
+
+
+class FakeSession:
+    """健康检查替身：按节点返回预设状态码，None表示连接失败"""
+
+    def __init__(self, statuses):
+        self.statuses = statuses
+
+    def get(self, url, timeout=None):
+        status = self.statuses[url.rsplit("/", 1)[0]]
+        if status is None:
+            raise requests.exceptions.ConnectionError(url)
+        return SimpleNamespace(status_code=status)
+
+
+@pytest.fixture
+def pool():
+    pool = EndpointPool(f"{A}/, {B}, {A}", session=FakeSession({A: 200, B: 200}), health_interval=3600)
+    yield pool
+    pool.stop()
+
+
+def test_parse_urls_normalizes_and_dedupes(pool):
+    assert pool.urls == [A, B]
+
+
+def test_acquire_prefers_least_outstanding(pool):
+    """在途请求多的节点不会被选中，归还后重新参与分配"""
+    first = pool.acquire()
+    second = pool.acquire()
+    assert {first, second} == {A, B}
+
+    pool.release(first, success=True, latency=0.1)
+    assert pool.acquire() == first
+    assert pool.stats()[second]["outstanding"] == 1
+
+
+def test_consecutive_failures_eject_endpoint(pool):
+    """连续失败达到阈值后节点被摘除，请求全部转到其余节点"""
+    for _ in range(2):
+        pool.release(A, success=False, latency=1.0)
+
+    stats = pool.stats()
+    assert stats[A]["failures"] == 2
+    assert not stats[A]["healthy"]
+    assert {pool.acquire() for _ in range(3)} == {B}
+
+
+def test_lease_records_failure_on_exception(pool):
+    """lease中抛出的异常记为该节点的一次失败，并归还在途请求"""
+    with pytest.raises(ConnectionError):
+        with pool.lease() as url:
+            raise ConnectionError(url)
+
+    assert pool.stats()[url]["failures"] == 1
+    assert pool.stats()[url]["outstanding"] == 0
+
+
+def test_single_failure_does_not_eject(pool):
+    pool.release(pool.acquire(), success=False, latency=1.0)
+    assert all(entry["healthy"] for entry in pool.stats().values())
+
+
+def test_health_check_ejects_and_restores(pool):
+    """健康检查失败的节点被摘除，恢复正常后重新可用"""
+    pool.session.statuses[B] = None
+    pool.check_health()
+    assert not pool.stats()[B]["healthy"]
+    assert {pool.acquire() for _ in range(3)} == {A}
+
+    pool.session.statuses[B] = 200
+    pool.check_health()
+    assert pool.stats()[B]["healthy"]
+    assert pool.acquire() == B
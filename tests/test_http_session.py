@@ -0,0 +1,110 @@
+"""HTTP会话测试 - 带请求体请求的重试与Retry-After、会话对幂等请求的自动重试与连接复用"""
+
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src import http_session
+from src.http_session import create_session, get_connection_stats, send_with_retry
+
+
+def _response(status: int, headers: dict = None) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers.update(headers or {})
+    response.raw = io.BytesIO(b"")
+    return response
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """记录退避等待时间而不真正等待"""
+    delays = []
+    monkeypatch.setattr(http_session.time, "sleep", delays.append)
+    return delays
+
+
+def test_retries_gateway_errors_until_success(sleeps):
+    """502/503时指数退避重试，成功后返回成功的响应"""
+    responses = iter([_response(502), _response(503), _response(200)])
+
+    response = send_with_retry(lambda: next(responses), backoff_factor=1, backoff_jitter=0)
+
+    assert response.status_code == 200
+    assert sleeps == [1, 2]
+
+
+def test_honors_retry_after(sleeps):
+    """429带Retry-After时按服务端给出的秒数等待"""
+    responses = iter([_response(429, {"Retry-After": "7"}), _response(200)])
+
+    assert send_with_retry(lambda: next(responses), backoff_jitter=0).status_code == 200
+    assert sleeps == [7]
+
+
+def test_returns_last_error_when_retries_exhausted(sleeps):
+    """重试用尽后返回最后一次的错误响应，由调用方决定是否抛出"""
+    calls = []
+
+    def send():
+        calls.append(1)
+        return _response(503)
+
+    assert send_with_retry(send, max_retries=2, backoff_jitter=0).status_code == 503
+    assert len(calls) == 3
+
+
+def test_does_not_retry_client_errors(sleeps):
+    """4xx（429除外）不重试"""
+    responses = iter([_response(400), _response(200)])
+
+    assert send_with_retry(lambda: next(responses)).status_code == 400
+    assert sleeps == []
+
+
+def test_reraises_connection_error_after_retries(sleeps):
+    """连接一直失败时重试用尽后抛出原异常"""
+    def send():
+        raise requests.exceptions.ConnectionError("refused")
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        send_with_retry(send, max_retries=1, backoff_jitter=0)
+    assert len(sleeps) == 1
+
+
+def test_session_retries_get_and_reuses_connection():
+    """会话对GET自动重试503，并在keep-alive连接上复用同一个TCP连接"""
+    hits = []
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            hits.append(self.path)
+            status = 503 if len(hits) == 1 else 200
+            self.send_response(status)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        session = create_session(backoff_factor=0, backoff_jitter=0)
+        url = f"http://127.0.0.1:{server.server_address[1]}/status"
+        assert session.get(url, timeout=5).status_code == 200
+        assert session.get(url, timeout=5).status_code == 200
+        stats = get_connection_stats(session)
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert len(hits) == 3
+    assert stats["connections"] == 1
+    assert stats["reused"] == 2
@@ -0,0 +1,57 @@
+"""增量JSON解析测试 - 流式片段中逐个取出已闭合的点位对象"""
+
+import json
+
+from src.json_stream import JsonArrayStreamParser
+
+
+POINTS = [
+    {"MeasuringPointName": "TchwOut", "Address": "3X0001", "Description": "出水温度 {℃}"},
+    {"MeasuringPointName": "RunSts", "Address": "1X0001", "Description": "运行状态 \"ON\"/[OFF]"},
+]
+
+
+def test_objects_emitted_as_soon_as_closed():
+    """对象闭合时立即返回，不等待整个数组结束"""
+    text = "```json\n" + json.dumps(POINTS, ensure_ascii=False) + "\n```"
+    first_end = text.index("}, {") + 1
+    parser = JsonArrayStreamParser()
+
+    assert parser.feed(text[:first_end - 1]) == []
+    assert parser.feed(text[first_end - 1:first_end]) == [POINTS[0]]
+    assert not parser.finished
+    assert parser.feed(text[first_end:]) == [POINTS[1]]
+    assert parser.finished
+    assert parser.count == 2
+    assert parser.tiers == {"strict": 2, "repaired": 0}
+
+
+def test_single_character_chunks():
+    """括号与引号出现在字符串内部时不影响对象边界"""
+    parser = JsonArrayStreamParser()
+    objects = []
+    for char in json.dumps(POINTS, ensure_ascii=False):
+        objects.extend(parser.feed(char))
+    assert objects == POINTS
+
+
+def test_malformed_object_is_repaired():
+    parser = JsonArrayStreamParser()
+    assert parser.feed('[{"MeasuringPointName": "TchwOut", "Address": "3X0001",}]') == [
+        {"MeasuringPointName": "TchwOut", "Address": "3X0001"}
+    ]
+    assert parser.tiers == {"strict": 0, "repaired": 1}
+
+
+def test_text_after_array_is_ignored():
+    parser = JsonArrayStreamParser()
+    assert parser.feed('[{"MeasuringPointName": "TchwOut"}] 以上为全部点位 {"x": 1}') == [{"MeasuringPointName": "TchwOut"}]
+    assert parser.finished
+
+
+def test_truncated_object_is_not_emitted():
+    """输出被截断时，未闭合的对象不会返回"""
+    parser = JsonArrayStreamParser()
+    objects = parser.feed('[{"MeasuringPointName": "TchwOut"}, {"MeasuringPointName": "Run')
+    assert objects == [{"MeasuringPointName": "TchwOut"}]
+    assert not parser.finished
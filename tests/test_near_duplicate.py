@@ -0,0 +1,72 @@
+"""近似重复文档检测测试 - MinHash相似度估计、LSH候选查找与有差异章节的定位"""
+
+import pytest
+
+from src.near_duplicate import DocumentIndex, DocumentSignature, changed_sections, estimate_jaccard, minhash
+
+
+def _manual(title: str, rows: int = 40, note: str = "出厂默认通讯参数为9600,8,N,1。") -> str:
+    table = "\n".join(f"| 3{i + 1:04d} | 第{i + 1}路温度传感器读数 | ℃ |" for i in range(rows))
+    return f"""# {title} 用户手册
+
+本控制器用于冷水机组的集中监控，支持Modbus RTU通讯。
+
+# 通讯设置
+
+{note}
+
+# 寄存器表
+
+| 地址 | 名称 | 单位 |
+|---|---|---|
+{table}
+"""
+
+
+BASE = _manual("KX-200")
+REBRANDED = _manual("KX-200S", note="出厂默认通讯参数为19200,8,N,1。")
+UNRELATED = "# 水泵变频器说明书\n\n" + "\n\n".join(f"参数P{i:02d}用于设置加速时间与减速时间" for i in range(60))
+
+
+def test_estimate_jaccard_tracks_true_similarity():
+    a = [f"feature-{i}" for i in range(1000)]
+    b = [f"feature-{i}" for i in range(100, 1100)]  # Jaccard = 900 / 1100
+    assert estimate_jaccard(minhash(a), minhash(b)) == pytest.approx(900 / 1100, abs=0.15)
+    assert estimate_jaccard(minhash(a), minhash(a)) == 1.0
+    assert estimate_jaccard(minhash(a), minhash(f"other-{i}" for i in range(1000))) < 0.1
+
+
+def test_empty_features_have_no_signature():
+    assert minhash([]) == []
+    assert estimate_jaccard([], minhash(["a"])) == 0.0
+
+
+def test_signature_similarity():
+    base = DocumentSignature.from_markdown(BASE, "base")
+    assert base.similarity(DocumentSignature.from_markdown(REBRANDED, "rebranded")) >= 0.8
+    assert base.similarity(DocumentSignature.from_markdown(UNRELATED, "unrelated")) < 0.2
+
+
+def test_find_similar_via_lsh(tmp_path):
+    """已处理文档中只有近似重复的文档被找到，当前文档本身不算在内"""
+    index = DocumentIndex(tmp_path / "documents.sqlite3")
+    base = DocumentSignature.from_markdown(BASE, "base")
+    index.add(base)
+    index.add(DocumentSignature.from_markdown(UNRELATED, "unrelated"))
+
+    matches = index.find_similar(DocumentSignature.from_markdown(REBRANDED, "rebranded"), threshold=0.8)
+    assert [signature.doc_hash for _, signature in matches] == ["base"]
+    assert matches[0][1].sections == base.sections
+
+    assert index.find_similar(base, threshold=0.8) == []
+    index.close()
+
+
+def test_changed_sections_between_revisions():
+    """只有内容有差异的章节需要重新提取，排版空白不算差异"""
+    previous = DocumentSignature.from_markdown(BASE, "base")
+
+    changed, unchanged = changed_sections(REBRANDED.replace("| ℃ |", "|  ℃  |"), previous)
+
+    assert [section.title for section in changed] == ["KX-200S 用户手册", "通讯设置"]
+    assert [section.title for section in unchanged] == ["寄存器表"]
@@ -0,0 +1,180 @@
+"""官方API上传流程测试 - 在进程内的MinerU替身服务上验证上传、批量轮询与回调"""
+
+import hashlib
+import io
+import json
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src import callback_server
+from src.callback_server import CallbackReceiver
+from src.config import config
+from src.pdf_parser import PDFParser
+
+
+UID = "test-uid"
+
+
+class StandInMinerU:
+    """
+    MinerU官方API替身：申请上传链接 -> PUT上传 -> 查询批量结果（前几次为running）-> 下载结果压缩包
+
+    请求中带callback时，全部文件上传完成后按MinerU的格式推送批量结果。
+    """
+
+    def __init__(self, running_polls: int = 1):
+        self.running_polls = running_polls
+        self.uploads = {}
+        self.result_polls = 0
+        self.batch_request = None
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self._server.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    def shutdown(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def batch_result(self, state: str) -> dict:
+        return {
+            "batch_id": "batch-1",
+            "extract_result": [
+                {
+                    "data_id": file["data_id"],
+                    "file_name": file["name"],
+                    "state": state,
+                    "full_zip_url": f"{self.base_url}/zip/{file['data_id']}" if state == "done" else "",
+                }
+                for file in self.batch_request["files"]
+            ],
+        }
+
+    def _send_callback(self):
+        content = json.dumps(self.batch_result("done"))
+        checksum = hashlib.sha256(f"{UID}{self.batch_request['seed']}{content}".encode("utf-8")).hexdigest()
+        requests.post(self.batch_request["callback"], json={"checksum": checksum, "content": content}, timeout=5)
+
+    def _make_handler(self):
+        stand_in = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def _reply(self, status: int, body: bytes = b"", content_type: str = "application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _body(self) -> bytes:
+                return self.rfile.read(int(self.headers.get("Content-Length") or 0))
+
+            def do_POST(self):
+                if self.path != "/api/v4/file-urls/batch":
+                    return self._reply(404)
+                stand_in.batch_request = json.loads(self._body())
+                file_urls = [f"{stand_in.base_url}/upload/{file['data_id']}" for file in stand_in.batch_request["files"]]
+                self._reply(200, json.dumps({"code": 0, "data": {"batch_id": "batch-1", "file_urls": file_urls}}).encode())
+
+            def do_PUT(self):
+                data_id = self.path.rsplit("/", 1)[-1]
+                stand_in.uploads[data_id] = self._body()
+                self._reply(200)
+                request = stand_in.batch_request
+                if request.get("callback") and len(stand_in.uploads) == len(request["files"]):
+                    threading.Thread(target=stand_in._send_callback, daemon=True).start()
+
+            def do_GET(self):
+                if self.path == "/api/v4/extract-results/batch/batch-1":
+                    stand_in.result_polls += 1
+                    state = "running" if stand_in.result_polls <= stand_in.running_polls else "done"
+                    return self._reply(200, json.dumps({"code": 0, "data": stand_in.batch_result(state)}).encode())
+                if self.path.startswith("/zip/"):
+                    data_id = self.path.rsplit("/", 1)[-1]
+                    buffer = io.BytesIO()
+                    with zipfile.ZipFile(buffer, "w") as zip_file:
+                        zip_file.writestr("full.md", f"# 文档 {data_id}\n\n| 地址 | 名称 |")
+                    return self._reply(200, buffer.getvalue(), "application/zip")
+                self._reply(404)
+
+            def log_message(self, format, *args):
+                pass
+
+        return _Handler
+
+
+@pytest.fixture
+def stand_in():
+    server = StandInMinerU()
+    yield server
+    server.shutdown()
+
+
+@pytest.fixture
+def pdf_files(tmp_path):
+    paths = []
+    for name in ("a.pdf", "b.pdf"):
+        path = tmp_path / name
+        path.write_bytes(b"%PDF-1.4\n1 0 obj << /Type /Page >> endobj\n%%EOF")
+        paths.append(path)
+    return paths
+
+
+def _parser(stand_in: StandInMinerU, tmp_path, callback_url: str = "") -> PDFParser:
+    parser = PDFParser(
+        output_dir=tmp_path,
+        parse_mode="official_api",
+        official_api_token="token",
+        use_cache=False,
+        official_api_base_url=f"{stand_in.base_url}/api/v4",
+        callback_url=callback_url,
+    )
+    parser.min_poll_interval = 0.05
+    parser.max_poll_interval = 0.2
+    return parser
+
+
+def test_upload_and_poll_single_file(stand_in, pdf_files, tmp_path):
+    """单个文件：上传文件内容，轮询到done后下载并提取Markdown"""
+    parser = _parser(stand_in, tmp_path)
+
+    md_content = parser._parse_via_official_api(pdf_files[0], page_ranges="1-1")
+
+    assert md_content.startswith("# 文档 0")
+    assert stand_in.uploads["0"] == pdf_files[0].read_bytes()
+    assert stand_in.batch_request["files"][0]["page_ranges"] == "1-1"
+    assert "callback" not in stand_in.batch_request
+    assert stand_in.result_polls == 2
+
+
+def test_upload_batch(stand_in, pdf_files, tmp_path):
+    """整批上传后用一个查询循环等待所有文件"""
+    parser = _parser(stand_in, tmp_path)
+
+    results = parser._parse_batch_via_official_api(pdf_files)
+
+    assert [results[path].splitlines()[0] for path in pdf_files] == ["# 文档 0", "# 文档 1"]
+    assert set(stand_in.uploads) == {"0", "1"}
+
+
+def test_upload_batch_with_callback(stand_in, pdf_files, tmp_path, monkeypatch):
+    """回调模式：请求携带callback与seed，结果由校验通过的回调送达，不再轮询"""
+    receiver = CallbackReceiver(host="127.0.0.1", port=0, uid=UID)
+    monkeypatch.setattr(callback_server, "_shared_receiver", receiver)
+    monkeypatch.setattr(config, "MINERU_UID", UID)
+    stand_in.running_polls = 100
+    parser = _parser(stand_in, tmp_path, callback_url=receiver.public_url)
+    parser.max_poll_interval = 5
+    try:
+        results = parser._parse_batch_via_official_api(pdf_files)
+    finally:
+        receiver.shutdown()
+
+    assert stand_in.batch_request["callback"] == receiver.public_url
+    assert stand_in.batch_request["seed"]
+    assert len(results) == 2
+    assert stand_in.result_polls == 0
@@ -0,0 +1,96 @@
+"""PDF解析器测试 - 分片并发解析的失败重试与按页块缓存的增量解析，不访问真实MinerU服务"""
+
+import hashlib
+import threading
+
+import pytest
+
+from src.pdf_parser import MarkdownCache, PDFParser
+
+
+class FlakyRanges:
+    """替身页码区间解析：记录每次请求的区间，指定区间前几次请求失败"""
+
+    def __init__(self, failures):
+        self.failures = dict(failures)
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def __call__(self, pdf_path, start_page=None, end_page=None, mode=None, **options):
+        with self._lock:
+            self.calls.append((start_page, end_page))
+            if self.failures.get(start_page, 0) > 0:
+                self.failures[start_page] -= 1
+                raise ConnectionError(f"第 {start_page + 1} 页起的分片请求失败")
+        return f"pages {start_page}-{end_page}"
+
+
+@pytest.fixture
+def parser():
+    return PDFParser(parse_mode="local_api", use_cache=False, shard_pages=10, max_workers=4, shard_retries=2)
+
+
+def test_sharded_parse_retries_only_failed_ranges(parser, tmp_path, monkeypatch):
+    """失败的分片在下一轮单独重试，已成功的分片不会重复请求，结果按页码顺序拼接"""
+    flaky = FlakyRanges({10: 1, 20: 2})
+    monkeypatch.setattr(parser, "_parse_page_range", flaky)
+
+    md_content = parser._parse_sharded(tmp_path / "manual.pdf", page_count=25)
+
+    assert md_content == "pages 0-9\n\npages 10-19\n\npages 20-24"
+    assert sorted(flaky.calls[:3]) == [(0, 9), (10, 19), (20, 24)]
+    assert sorted(flaky.calls[3:5]) == [(10, 19), (20, 24)]
+    assert flaky.calls[5:] == [(20, 24)]
+
+
+def test_sharded_parse_reports_ranges_that_keep_failing(parser, tmp_path, monkeypatch):
+    """重试用尽后抛出的错误列出仍然失败的页码区间"""
+    flaky = FlakyRanges({10: 99})
+    monkeypatch.setattr(parser, "_parse_page_range", flaky)
+
+    with pytest.raises(RuntimeError, match="11-20"):
+        parser._parse_sharded(tmp_path / "manual.pdf", page_count=25)
+    assert flaky.calls.count((10, 19)) == 3
+    assert flaky.calls.count((0, 9)) == 1
+
+
+def _page_hashes(pages):
+    return [hashlib.sha256(page.encode("utf-8")).hexdigest() for page in pages]
+
+
+def test_incremental_parse_reparses_only_changed_block(tmp_path, monkeypatch):
+    """修订版只改了一页时，只有该页所在的页块重新解析，其余页块直接复用缓存"""
+    parser = PDFParser(parse_mode="local_api", cache=MarkdownCache(tmp_path / "md"), page_cache=True, shard_pages=0)
+    requested = []
+
+    def fake_parse_ranges(pdf_path, ranges, mode=None, **options):
+        requested.append(list(ranges))
+        return {start: f"pages {start}-{end}" for start, end in ranges}
+
+    monkeypatch.setattr(parser, "_parse_ranges", fake_parse_ranges)
+    pages = [f"page {i}" for i in range(40)]
+    pdf_path = tmp_path / "manual.pdf"
+
+    original_blocks = parser._page_blocks(_page_hashes(pages))
+    original_contents = {tuple(pages[start:end + 1]) for start, end in original_blocks}
+    first = parser._parse_incremental(pdf_path, _page_hashes(pages), lang="ch")
+    assert requested == [original_blocks]
+    assert parser.last_page_report["reused_pages"] == 0
+
+    pages[20] = "page 20 (revised)"
+    revised_blocks = parser._page_blocks(_page_hashes(pages))
+    second = parser._parse_incremental(pdf_path, _page_hashes(pages), lang="ch")
+
+    changed = [(start, end) for start, end in revised_blocks if tuple(pages[start:end + 1]) not in original_contents]
+    assert requested[1] == changed
+    assert any(start <= 20 <= end for start, end in changed)
+    assert parser.last_page_report["parsed_pages"] == sum(end - start + 1 for start, end in changed)
+    assert parser.last_page_report["reused_pages"] >= 40 - 2 * PDFParser.PAGE_BLOCK_PAGES
+    assert len(changed) <= 2
+    assert second == "\n\n".join(f"pages {start}-{end}" for start, end in revised_blocks)
+    assert first.split("\n\n")[0] == second.split("\n\n")[0]
+
+    # 相同内容再次解析时全部命中缓存
+    parser._parse_incremental(pdf_path, _page_hashes(pages), lang="ch")
+    assert len(requested) == 2
+    assert parser.last_page_report["parsed_pages"] == 0
@@ -0,0 +1,50 @@
+"""点位置信度测试 - 地址格式、功能区一致性与原文证据打分，以及级联复核阈值"""
+
+import pytest
+
+from src.config import config
+from src.point_confidence import score_point, score_points
+from src.section_index import tokenize
+
+
+DOCUMENT = """| 地址 | 名称 | 单位 |
+|---|---|---|
+| 30001 | 冷冻水出水温度 | ℃ |
+| 10001 | 压缩机运行状态 | |"""
+
+TERMS = set(tokenize(DOCUMENT))
+
+
+def _point(address, description, **fields):
+    point = {"MeasuringPointName": "TchwOut", "exist": True, "Address": address, "Description": description,
+             "DataType": "WORD", "ReadWrite": "ro"}
+    point.update(fields)
+    return point
+
+
+def test_full_evidence_scores_one():
+    assert score_point(_point("3X0001", "冷冻水出水温度"), TERMS) == (1.0, [])
+
+
+def test_address_absent_from_document_is_below_threshold():
+    """原文中找不到地址时最高0.6，低于级联复核阈值"""
+    score, reasons = score_point(_point("3X0002", "冷冻水出水温度"), TERMS)
+    assert score == pytest.approx(0.6)
+    assert score < config.CASCADE_MIN_CONFIDENCE
+    assert reasons == ["原文中未找到地址"]
+
+
+@pytest.mark.parametrize("point, expected", [
+    (_point("3X0001", "冷冻水出水温度", ReadWrite="rw"), 0.8),
+    (_point("1X0001", "压缩机运行状态"), 0.8),
+    (_point("3X0001", "室外机风扇转速"), 0.8),
+    (_point("3X00-1", "冷冻水出水温度"), 0.0),
+    (_point("3X0001", "冷冻水出水温度", exist=False), 0.0),
+])
+def test_deductions(point, expected):
+    assert score_point(point, TERMS)[0] == pytest.approx(expected)
+
+
+def test_score_points_by_name():
+    scores = score_points([_point("3X0001", "冷冻水出水温度"), {"Address": "3X0001"}], DOCUMENT)
+    assert list(scores) == ["TchwOut"]
@@ -0,0 +1,39 @@
+"""点位字段推导测试 - 地址解析与十六进制地址"""
+
+from src.point_confidence import address_in_document
+from src.point_derivation import derive_point, parse_address
+from src.point_merger import is_confident
+from src.register_tables import extract_register_rows
+from src.section_index import tokenize
+
+
+HEX_TABLE = """| 地址 | 名称 | 单位 |
+|---|---|---|
+| 0x00A0 | 出水温度 | ℃ |
+| 0x00a1 | 回水温度 | ℃ |"""
+
+
+def test_parse_decimal_address():
+    """十进制地址与bit位"""
+    assert parse_address("3X0014.1") == {"zone": "3", "address": "0014", "bit": "1"}
+    assert parse_address("4x 0001") == {"zone": "4", "address": "0001", "bit": ""}
+    assert parse_address("5X0001") is None
+
+
+def test_parse_hex_address():
+    """十六进制地址主体可以包含A-F，统一为大写"""
+    assert parse_address("3X00A0") == {"zone": "3", "address": "00A0", "bit": ""}
+    assert parse_address("4x00ff.3") == {"zone": "4", "address": "00FF", "bit": "3"}
+    assert parse_address("3X00G0") is None
+
+
+def test_hex_register_row_derives_point():
+    """寄存器表中的十六进制地址能推导出点位，且判定为可信、在原文中有证据"""
+    rows = extract_register_rows(HEX_TABLE)
+    assert [row.address for row in rows] == ["00A0", "00A1"]
+
+    point = derive_point({"code": "TchwOut", "addr": f"3X{rows[1].address}", "unit": rows[1].unit})
+    assert point["Address"] == "3X00A1"
+    assert point["DataType"] == "WORD"
+    assert is_confident(point)
+    assert address_in_document(point, set(tokenize(HEX_TABLE)))
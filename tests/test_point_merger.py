@@ -0,0 +1,62 @@
+"""点位合并测试 - 分块结果按MeasuringPointName去重、地址投票与字段补全，补充提取结果的合并"""
+
+from src.point_merger import merge_followup, merge_points, normalize_address
+
+
+def _point(name, address, exist=True, **fields):
+    return {"MeasuringPointName": name, "exist": exist, "Address": address, **fields}
+
+
+def test_merge_keeps_first_seen_order():
+    merged = merge_points([[_point("TchwOut", "3X0001")], [_point("RunSts", "1X0001"), _point("TchwOut", "3X0001")]])
+    assert [point["MeasuringPointName"] for point in merged] == ["TchwOut", "RunSts"]
+
+
+def test_found_point_wins_over_missing():
+    """一个分块没找到、另一个分块给出地址时，采用给出地址的结果"""
+    merged = merge_points([[_point("TchwOut", "", exist=False)], [_point("TchwOut", "3X0001")]])
+    assert merged == [_point("TchwOut", "3X0001")]
+
+
+def test_conflicting_addresses_resolved_by_vote():
+    """多个分块地址不一致时取出现次数最多的地址，大小写与空白不影响比较"""
+    merged = merge_points([
+        [_point("TchwOut", "3X0001")],
+        [_point("TchwOut", "3x 0001")],
+        [_point("TchwOut", "3X0009", Unit="℃", Gain="0.1")],
+    ])
+    assert normalize_address(merged[0]["Address"]) == "3X0001"
+
+
+def test_same_address_fills_missing_fields():
+    """同一地址的其它结果补全选中结果的空字段"""
+    merged = merge_points([
+        [_point("TchwOut", "3X0001", Unit="", Gain="0.1")],
+        [_point("TchwOut", "3X0001", Unit="℃", Gain="")],
+    ])
+    assert merged[0]["Unit"] == "℃" and merged[0]["Gain"] == "0.1"
+
+
+def test_string_exist_and_unnamed_points():
+    merged = merge_points([[_point("RunSts", "1X0001", exist="false"), {"Address": "3X0002"}, "not a point"]])
+    assert merged == [_point("RunSts", "1X0001", exist="false")]
+
+
+def test_merge_followup_replaces_only_confident_requested_points():
+    """补充结果中可信的点位替换原结果，不可信或不在本次补充范围内的结果忽略"""
+    points = [_point("TchwOut", "3X0001"), _point("TchwIn", "", exist=False), _point("RunSts", "1X01?")]
+    followup = [
+        _point("TchwIn", "3X0002"),
+        _point("RunSts", "not found", exist=False),
+        _point("TchwOut", "3X0009"),
+        _point("AlarmSts", "1X0002"),
+    ]
+
+    merged = merge_followup(points, followup, codes=["TchwIn", "RunSts", "AlarmSts"])
+
+    assert merged == [
+        _point("TchwOut", "3X0001"),
+        _point("TchwIn", "3X0002"),
+        _point("RunSts", "1X01?"),
+        _point("AlarmSts", "1X0002"),
+    ]
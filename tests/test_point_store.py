@@ -0,0 +1,44 @@
+"""点位结果存储测试 - 按文档、点位描述、元数据与提示词版本读写点位结果"""
+
+import pytest
+
+from src.point_store import PointStore, content_hash
+
+
+DESC_HASHES = {"TchwOut": content_hash(["出水温度"]), "TchwIn": content_hash(["回水温度"])}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PointStore(tmp_path / "points.sqlite3")
+    yield store
+    store.close()
+
+
+def test_put_and_get_many(store):
+    """写入的点位按相同的键读回，其它文档、元数据或提示词版本不命中"""
+    point = {"MeasuringPointName": "TchwOut", "exist": True, "Address": "3X0001"}
+    store.put_many("doc", {"TchwOut": point}, DESC_HASHES, "meta", "v1")
+
+    assert store.get_many("doc", DESC_HASHES, "meta", "v1") == {"TchwOut": point}
+    assert store.get_many("other-doc", DESC_HASHES, "meta", "v1") == {}
+    assert store.get_many("doc", DESC_HASHES, "other-meta", "v1") == {}
+    assert store.get_many("doc", DESC_HASHES, "meta", "v2") == {}
+    assert store.stats()["hits"] == 1
+
+
+def test_changed_description_misses(store):
+    """点位描述变化后该点位不再命中"""
+    point = {"MeasuringPointName": "TchwOut", "exist": True, "Address": "3X0001"}
+    store.put_many("doc", {"TchwOut": point}, DESC_HASHES, "meta", "v1")
+
+    changed = dict(DESC_HASHES, TchwOut=content_hash(["冷冻水出水温度"]))
+    assert store.get_many("doc", changed, "meta", "v1") == {}
+
+
+def test_missing_points_are_not_stored(store):
+    """没有找到的点位（None）不写入，下次会重新提取"""
+    store.put_many("doc", {"TchwOut": None}, DESC_HASHES, "meta", "v1")
+
+    assert store.get_many("doc", DESC_HASHES, "meta", "v1") == {}
+    assert store.stats()["points"] == 0
@@ -0,0 +1,106 @@
+"""模型调用限流测试 - 令牌桶配额、429时并发减半与连续成功后的恢复（AIMD）"""
+
+import pytest
+
+from src import rate_limiter
+from src.rate_limiter import RateLimiter, parse_retry_after
+
+
+class FakeClock:
+    """替身时钟：sleep只推进时间，不真正等待"""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.time, "sleep", clock.sleep)
+    return clock
+
+
+def test_rate_limited_halves_concurrency_once_per_wave(clock):
+    """同一波并发请求收到的多个429只减半一次，并暂停到Retry-After之后"""
+    limiter = RateLimiter(rpm=0, tpm=0, max_concurrency=8)
+    for _ in range(3):
+        limiter.acquire(100)
+    for _ in range(3):
+        limiter.release(100, rate_limited=True, retry_after=5)
+
+    assert limiter.stats() == {"concurrency": 4, "in_flight": 0, "throttled": 3}
+    assert limiter._try_reserve(100) == pytest.approx(5)
+
+    clock.now += 5
+    limiter.acquire(100)
+    limiter.release(100, rate_limited=True, retry_after=2)
+    assert limiter.stats()["concurrency"] == 2
+
+
+def test_concurrency_never_below_minimum(clock):
+    limiter = RateLimiter(rpm=0, tpm=0, max_concurrency=4, min_concurrency=2)
+    for _ in range(3):
+        limiter.release(0, rate_limited=True, retry_after=0)
+        clock.now += 1
+    assert limiter.stats()["concurrency"] == 2
+
+
+def test_successes_increase_concurrency_additively(clock):
+    """每连续成功“当前并发数”次，并发上限加1，直到最大并发数"""
+    limiter = RateLimiter(rpm=0, tpm=0, max_concurrency=4)
+    limiter.concurrency = 2
+
+    for expected in (2, 3):
+        limiter.release(0)
+        assert limiter.stats()["concurrency"] == expected
+    for _ in range(3):
+        limiter.release(0)
+    assert limiter.stats()["concurrency"] == 4
+    for _ in range(10):
+        limiter.release(0)
+    assert limiter.stats()["concurrency"] == 4
+
+
+def test_in_flight_limited_by_concurrency(clock):
+    limiter = RateLimiter(rpm=0, tpm=0, max_concurrency=2)
+    limiter.acquire(0)
+    limiter.acquire(0)
+    assert limiter._try_reserve(0) > 0
+    limiter.release(0)
+    assert limiter._try_reserve(0) == 0
+
+
+def test_token_bucket_waits_and_refunds(clock):
+    """超出每分钟token配额时等待补充；实际用量小于预扣时退还差额"""
+    limiter = RateLimiter(rpm=0, tpm=600, max_concurrency=8)
+    limiter.acquire(600)
+    limiter.release(600, used_tokens=300)
+
+    limiter.acquire(300)
+    assert clock.sleeps == []
+
+    limiter.acquire(60)
+    assert sum(clock.sleeps) == pytest.approx(6)
+
+
+def test_requests_per_minute(clock):
+    limiter = RateLimiter(rpm=2, tpm=0, max_concurrency=8)
+    for _ in range(3):
+        limiter.acquire(0)
+    assert sum(clock.sleeps) == pytest.approx(30)
+
+
+def test_parse_retry_after():
+    assert parse_retry_after({"retry-after": "3"}) == 3.0
+    assert parse_retry_after({"retry-after-ms": "1500", "retry-after": "3"}) == 1.5
+    assert parse_retry_after({"retry-after": "Wed, 21 Oct 2026 07:28:00 GMT"}) is None
+    assert parse_retry_after(None) is None
@@ -0,0 +1,107 @@
+"""文档分段检索测试 - 章节切分、BM25挑选寄存器表章节、按预算裁剪与分块切分"""
+
+from src.section_index import (
+    SectionIndex, estimate_tokens, mapping_queries, split_chunks, split_sections, tokenize, trim_markdown
+)
+
+
+FILLER = "本设备适用于商业建筑的中央空调系统，安装前请阅读安全须知并由专业人员操作。" * 20
+
+MANUAL = f"""# 产品简介
+
+{FILLER}
+
+# 安装说明
+
+{FILLER}
+
+# 通讯协议
+
+| 地址 | 名称 | 单位 |
+|---|---|---|
+| 3X0001 | 冷冻水出水温度 | ℃ |
+| 3X0002 | 冷冻水回水温度 | ℃ |
+
+# 报警代码
+
+| 代码 | 含义 |
+|---|---|
+| E01 | 高压报警 |
+| E02 | 低压报警 |
+
+# 维护保养
+
+{FILLER}
+"""
+
+DEV_MAPPING = {"冷冻水出水温度": "TchwOut", "冷冻水回水温度": "TchwIn", "高压报警": "HighPressAlm"}
+
+
+def test_tokenize_uses_cjk_bigrams_and_words():
+    assert tokenize("出水温度 Addr 0x01") == ["出", "水", "温", "度", "出水", "水温", "温度", "addr", "0x01"]
+
+
+def test_split_sections_by_heading():
+    sections = split_sections(MANUAL)
+    assert [section.title for section in sections] == ["产品简介", "安装说明", "通讯协议", "报警代码", "维护保养"]
+    assert [section.has_table for section in sections] == [False, False, True, True, False]
+
+
+def test_long_section_is_split_and_keeps_title():
+    content = f"# 安装说明\n\n{FILLER}\n\n{FILLER}\n\n{FILLER}"
+    sections = split_sections(content, max_section_tokens=estimate_tokens(FILLER) + 10)
+    assert len(sections) == 3
+    assert all(section.title == "安装说明" for section in sections)
+    assert sections[1].text.startswith("# 安装说明（续）")
+
+
+def test_select_prefers_best_section_per_query():
+    """每个点位的最佳章节优先入选，与点位无关的长章节在预算内被舍弃"""
+    index = SectionIndex(MANUAL)
+    budget = sum(section.tokens for section in index.sections if section.has_table) + 10
+
+    selected = index.select(mapping_queries(DEV_MAPPING), token_budget=budget)
+
+    assert [section.title for section in selected] == ["通讯协议", "报警代码"]
+
+
+def test_select_keeps_document_order_and_budget():
+    index = SectionIndex(MANUAL)
+    table = next(section for section in index.sections if section.title == "通讯协议")
+
+    selected = index.select(["出水温度 TchwOut"], token_budget=table.tokens)
+
+    assert selected == [table]
+
+
+def test_trim_markdown_reports_cut_tokens():
+    report = trim_markdown(MANUAL, mapping_queries(DEV_MAPPING), token_budget=200)
+
+    assert "3X0001" in report["content"] and "E01" in report["content"]
+    assert FILLER not in report["content"]
+    assert report["kept_sections"] == 2 < report["total_sections"]
+    assert report["cut_tokens"] == report["original_tokens"] - report["kept_tokens"] > 0
+
+
+def test_trim_markdown_within_budget_is_unchanged():
+    report = trim_markdown(MANUAL, mapping_queries(DEV_MAPPING), token_budget=0)
+    assert report["content"] == MANUAL and report["cut_tokens"] == 0
+
+
+def test_split_chunks_respects_budget_and_overlap():
+    """分块不超过token上限，相邻分块重复上一块末尾的章节，所有章节都被覆盖"""
+    sections = [section.text for section in split_sections(MANUAL)]
+    chunk_tokens = max(estimate_tokens(text) for text in sections) * 2
+
+    chunks = split_chunks(MANUAL, chunk_tokens=chunk_tokens, overlap_tokens=chunk_tokens // 2)
+
+    assert len(chunks) > 1
+    assert all(estimate_tokens(chunk) <= chunk_tokens + 2 for chunk in chunks)
+    assert all(any(text in chunk for chunk in chunks) for text in sections)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert previous.split("\n\n# ")[-1] in chunk
+
+
+def test_split_chunks_without_overlap_partitions_document():
+    chunks = split_chunks(MANUAL, chunk_tokens=estimate_tokens(FILLER) + 20)
+    assert "\n\n".join(chunks) == "\n\n".join(section.text for section in split_sections(MANUAL))